@@ -0,0 +1,103 @@
+"""Measure compression ratio and CPU cost of the codecs available for STORAGE_COMPRESSION.
+
+Compresses and decompresses a corpus in the same part sizes the upload path
+uses and reports, per codec and level, the size ratio and the CPU seconds
+spent per MiB of original text. Pass real documents to get representative
+numbers; without arguments a synthetic Markdown/JSON corpus is used:
+
+    python -m benchmarks.storage_compression docs/*.md data/*.json --levels 1 3 6 9
+"""
+
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from src.services.compression import (
+    GZIP,
+    SUPPORTED_ENCODINGS,
+    ZSTD,
+    decompress_iter,
+    is_available,
+    new_compressor,
+)
+
+MIB = 1024 * 1024
+
+
+def synthetic_corpus(size: int) -> bytes:
+    """Mix of prose-like Markdown and JSON records, roughly like an ingested knowledge base."""
+
+    rng = random.Random(42)
+    words = [rng.choice("abcdefghijklmnopqrstuvwxyz") * rng.randint(1, 3) + str(i) for i in range(5000)]
+    chunks: List[bytes] = []
+    total = 0
+    while total < size:
+        if rng.random() < 0.7:
+            paragraph = " ".join(rng.choice(words) for _ in range(rng.randint(40, 120)))
+            chunk = f"## Section {total}\n\n{paragraph}\n\n".encode("utf-8")
+        else:
+            record = {"id": total, "title": rng.choice(words), "tags": rng.sample(words, 5), "score": rng.random()}
+            chunk = (json.dumps(record) + "\n").encode("utf-8")
+        chunks.append(chunk)
+        total += len(chunk)
+    return b"".join(chunks)[:size]
+
+
+def parts(data: bytes, part_size: int) -> Iterable[bytes]:
+    for start in range(0, len(data), part_size):
+        yield data[start : start + part_size]
+
+
+def benchmark_codec(data: bytes, encoding: str, level: Optional[int], part_size: int) -> dict:
+    started = time.process_time()
+    compressor = new_compressor(encoding, level)
+    compressed = [compressor.compress(part) for part in parts(data, part_size)]
+    compressed.append(compressor.flush())
+    compress_seconds = time.process_time() - started
+
+    payload = b"".join(compressed)
+    started = time.process_time()
+    restored = b"".join(decompress_iter(parts(payload, part_size), encoding))
+    decompress_seconds = time.process_time() - started
+    assert restored == data, f"{encoding} no reproduce el contenido original"
+
+    mib = len(data) / MIB
+    return {
+        "codec": f"{encoding}-{level}",
+        "ratio": len(data) / max(len(payload), 1),
+        "stored_pct": 100 * len(payload) / len(data),
+        "compress_ms_per_mib": 1000 * compress_seconds / mib,
+        "decompress_ms_per_mib": 1000 * decompress_seconds / mib,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", type=Path, help="documents to use as corpus")
+    parser.add_argument("--size", type=int, default=32 * MIB, help="synthetic corpus size in bytes")
+    parser.add_argument("--part-size", type=int, default=8 * MIB)
+    parser.add_argument("--levels", type=int, nargs="+", default=None, help="levels to try for every codec")
+    args = parser.parse_args()
+
+    data = b"".join(path.read_bytes() for path in args.files) if args.files else synthetic_corpus(args.size)
+    default_levels = {GZIP: [1, 6, 9], ZSTD: [1, 3, 9, 19]}
+
+    print(f"corpus: {len(data) / MIB:.1f} MiB")
+    print(f"{'codec':<10}{'ratio':>8}{'stored %':>10}{'compress ms/MiB':>18}{'decompress ms/MiB':>20}")
+    for encoding in SUPPORTED_ENCODINGS:
+        if not is_available(encoding):
+            print(f"{encoding:<10}  (no disponible: instala el paquete zstandard)")
+            continue
+        for level in args.levels or default_levels[encoding]:
+            result = benchmark_codec(data, encoding, level, args.part_size)
+            print(
+                f"{result['codec']:<10}{result['ratio']:>8.2f}{result['stored_pct']:>10.1f}"
+                f"{result['compress_ms_per_mib']:>18.1f}{result['decompress_ms_per_mib']:>20.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
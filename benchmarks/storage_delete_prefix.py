@@ -0,0 +1,91 @@
+"""Compare the sequential and pipelined strategies of ObjectStorageService.delete_prefix.
+
+Fills a scratch prefix with empty objects, then deletes it with the previous
+algorithm (list a page, delete it, list again) and with the pipelined deleter
+at several concurrency levels, refilling the prefix before every run.
+Uses the storage settings from the environment/.env; point R2_ENDPOINT_URL at a
+local S3 stand-in (moto_server, MinIO) rather than a real bucket, or run it
+offline against a local directory with STORAGE_BACKEND=filesystem:
+
+    python -m benchmarks.storage_delete_prefix --objects 100000 --concurrency 1 4 8
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Awaitable, Callable, Tuple
+
+from src.core.config import settings
+from src.services.object_storage import ObjectStorageDeleteResult, ObjectStorageService
+
+
+async def populate(service: ObjectStorageService, prefix: str, total: int, concurrency: int) -> None:
+    slots = asyncio.Semaphore(concurrency)
+
+    async def put(index: int) -> None:
+        async with slots:
+            await service.put_object(f"{prefix}/{uuid.uuid4()}/{index}.txt", b"")
+
+    await asyncio.gather(*(put(index) for index in range(total)))
+
+
+async def sequential_delete(service: ObjectStorageService, prefix: str) -> ObjectStorageDeleteResult:
+    """The previous delete_prefix: one listing page, then its deletion, strictly in turn."""
+
+    result = ObjectStorageDeleteResult()
+    while True:
+        objects = await service.list_objects(prefix=prefix, max_keys=1000)
+        if not objects:
+            break
+        result.add(await service.delete_objects(obj.key for obj in objects))
+        if len(objects) < 1000:
+            break
+    return result
+
+
+async def timed(
+    service: ObjectStorageService,
+    total: int,
+    fill_concurrency: int,
+    delete: Callable[[str], Awaitable[ObjectStorageDeleteResult]],
+) -> Tuple[float, ObjectStorageDeleteResult]:
+    prefix = f"benchmarks/delete-{uuid.uuid4().hex}"
+    await populate(service, prefix, total, fill_concurrency)
+
+    started = time.perf_counter()
+    result = await delete(prefix)
+    return time.perf_counter() - started, result
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=100_000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--fill-concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    # Listings must reach the bucket on every page for the baseline to be meaningful.
+    settings.LIST_CACHE_TTL = 0
+    service = ObjectStorageService()
+
+    runs = [("sequential", lambda prefix: sequential_delete(service, prefix))]
+    for concurrency in args.concurrency:
+        runs.append(
+            (
+                f"pipelined x{concurrency}",
+                lambda prefix, concurrency=concurrency: service.delete_prefix(prefix, concurrency=concurrency),
+            )
+        )
+
+    print(f"{'strategy':<16}{'seconds':>10}{'objects/s':>12}{'deleted':>10}{'failed':>8}")
+    try:
+        for name, delete in runs:
+            elapsed, result = await timed(service, args.objects, args.fill_concurrency, delete)
+            print(f"{name:<16}{elapsed:>10.2f}{result.deleted / elapsed:>12.0f}{result.deleted:>10}{result.failed:>8}")
+    finally:
+        await service.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,141 @@
+"""Measure how the storage layer copes with a slow or flaky bucket, fully offline.
+
+Runs three scenarios through ObjectStorageService on the in-memory backend
+(STORAGE_BACKEND=memory), which injects the latency, SlowDown error rates and
+bandwidth cap given on the command line, and reports per-call p50/p99 latency,
+failures, retries and throughput:
+
+- upload burst: concurrent upload_file calls
+- list storm: concurrent list_objects calls over the uploaded prefix (listing cache off)
+- mass delete: concurrent delete_objects batches of the uploaded keys
+
+Latencies and error rates use the STORAGE_MEMORY_* syntax, per operation with "*"
+as the default:
+
+    python -m benchmarks.storage_fault_scenarios --latency "*=0.02/0.25" --error-rates "*=0.02" --objects 2000
+"""
+
+import argparse
+import asyncio
+import io
+import math
+import time
+from collections import Counter
+from typing import Awaitable, Callable, List, Tuple
+
+from starlette.datastructures import Headers, UploadFile
+
+from src.core.config import settings
+from src.services import storage_metrics
+from src.services.object_storage import ObjectStorageError, ObjectStorageService
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile."""
+
+    ordered = sorted(samples)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))]
+
+
+def retries_total() -> float:
+    return sum(
+        sample.value
+        for metric in storage_metrics.OPERATION_RETRIES.collect()
+        for sample in metric.samples
+        if sample.name.endswith("_total")
+    )
+
+
+async def run_scenario(
+    total: int, concurrency: int, call: Callable[[int], Awaitable[object]]
+) -> Tuple[List[float], Counter, float]:
+    """Run total calls, concurrency at a time; returns per-call latencies, failures by type and wall time."""
+
+    slots = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures: Counter = Counter()
+
+    async def worker(index: int) -> None:
+        async with slots:
+            started = time.perf_counter()
+            try:
+                await call(index)
+            except ObjectStorageError as exc:
+                failures[type(exc).__name__] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(total)))
+    return latencies, failures, time.perf_counter() - started
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=2000, help="documents uploaded by the burst")
+    parser.add_argument("--lists", type=int, default=500, help="list_objects calls in the storm")
+    parser.add_argument("--delete-batch", type=int, default=100, help="keys per delete_objects call")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--payload-size", type=int, default=64 * 1024)
+    parser.add_argument("--latency", default="*=0.02/0.25", help='e.g. "*=0.02/0.25,list_objects_v2=0.05/1"')
+    parser.add_argument("--error-rates", default="*=0.01", help='e.g. "*=0.01,put_object=0.05"')
+    parser.add_argument("--bandwidth", type=int, default=0, help="bytes per second, 0 for unlimited")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    settings.STORAGE_BACKEND = "memory"
+    settings.STORAGE_MEMORY_LATENCY = args.latency
+    settings.STORAGE_MEMORY_ERROR_RATES = args.error_rates
+    settings.STORAGE_MEMORY_BANDWIDTH = args.bandwidth
+    settings.STORAGE_MEMORY_SEED = args.seed
+    # Every listing must reach the backend for the storm to mean anything.
+    settings.LIST_CACHE_TTL = 0
+    service = ObjectStorageService()
+
+    prefix = "benchmarks/faults"
+    payload = b"x" * args.payload_size
+    keys = [f"{prefix}/{index}.bin" for index in range(args.objects)]
+    batches = [keys[start : start + args.delete_batch] for start in range(0, len(keys), args.delete_batch)]
+
+    async def upload(index: int) -> object:
+        file = UploadFile(
+            io.BytesIO(payload),
+            filename=f"{index}.bin",
+            headers=Headers({"content-type": "application/octet-stream"}),
+        )
+        return await service.upload_file(file, destination_path=keys[index])
+
+    async def list_page(index: int) -> object:
+        return await service.list_objects(prefix=prefix, max_keys=1000)
+
+    async def delete_batch(index: int) -> object:
+        result = await service.delete_objects(batches[index])
+        if result.failed:
+            raise ObjectStorageError(f"{result.failed} claves sin eliminar")
+        return result
+
+    scenarios = [
+        ("upload burst", len(keys), upload),
+        ("list storm", args.lists, list_page),
+        ("mass delete", len(batches), delete_batch),
+    ]
+
+    print(f"latency={args.latency!r} error_rates={args.error_rates!r} bandwidth={args.bandwidth or 'unlimited'}")
+    print(f"{'scenario':<14}{'calls':>8}{'failed':>8}{'retries':>9}{'p50 ms':>10}{'p99 ms':>10}{'calls/s':>10}")
+    try:
+        for name, total, call in scenarios:
+            retries_before = retries_total()
+            latencies, failures, elapsed = await run_scenario(total, args.concurrency, call)
+            print(
+                f"{name:<14}{total:>8}{sum(failures.values()):>8}{retries_total() - retries_before:>9.0f}"
+                f"{1000 * percentile(latencies, 50):>10.1f}{1000 * percentile(latencies, 99):>10.1f}"
+                f"{total / elapsed:>10.1f}"
+            )
+            for failure, count in failures.most_common():
+                print(f"{'':<14}{failure}: {count}")
+        print(f"circuit: {service.circuit_state()}")
+    finally:
+        await service.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,400 @@
+"""Size and format checks on upload bodies, applied while the body streams in.
+
+The endpoints only see an UploadFile once Starlette has spooled the whole
+multipart body, so an oversized or bogus file would cost its full transfer
+(and a temporary file) before being rejected. UploadLimitMiddleware parses
+the multipart stream alongside the app instead: each file part's real type is
+sniffed from its first bytes with filetype, its size is checked against the
+limit of that type as it grows, and the request is answered with 413/415/400
+and the connection closed as soon as a limit is crossed.
+
+Batch endpoints report failures per file, so on their paths a bad file part
+does not end the request: it is recorded in the request state for the endpoint
+to report, and the rest of its data is dropped before it reaches the app.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import filetype
+from prometheus_client import Counter
+from python_multipart.multipart import MultipartParseError, MultipartParser, parse_options_header
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# filetype never looks past this many bytes
+SNIFF_BYTES = 8192
+
+# Request state key holding the per-file rejections of batch uploads
+REJECTIONS_STATE_KEY = "upload_rejections"
+
+REJECTED_TOO_LARGE = "too_large"
+REJECTED_UNSUPPORTED = "unsupported_type"
+REJECTED_EMPTY = "empty"
+
+REJECTIONS = Counter(
+    "upload_limit_rejections_total",
+    "Upload requests aborted or batch files rejected while streaming, by reason (too_large, unsupported_type, empty)",
+    ["reason"],
+)
+
+# Bytes found in text files; anything else (NUL and most C0 controls) means binary
+_TEXT_BYTES = bytes({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)) - {0x7F})
+
+# Text formats declared under application/; they have no magic bytes either
+_TEXT_APPLICATION_TYPES = frozenset({"application/json", "application/xml"})
+
+# filetype tells these apart from a plain ZIP only if the marker entry is in the first bytes
+_ZIP_CONTAINERS = frozenset(
+    {
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "application/vnd.oasis.opendocument.text",
+        "application/epub+zip",
+    }
+)
+
+
+class UploadLimitError(Exception):
+    """An upload violates the limits; status_code and detail form the response."""
+
+    def __init__(self, status_code: int, detail: str, *, reason: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.reason = reason
+
+
+def parse_size_limits(value: str) -> Dict[str, int]:
+    """Parse "type=bytes" pairs separated by commas, e.g. "application/pdf=104857600,text/*=20971520"."""
+
+    limits: Dict[str, int] = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        media_type, separator, size = item.partition("=")
+        media_type = media_type.strip().lower()
+        if not separator or "/" not in media_type:
+            raise ValueError(f"Límite de tamaño inválido '{item.strip()}'; se esperaba tipo=bytes")
+        try:
+            limits[media_type] = int(size)
+        except ValueError:
+            raise ValueError(f"Tamaño inválido para '{media_type}': '{size.strip()}'") from None
+    return limits
+
+
+def _media_type(content_type: Optional[str]) -> Optional[str]:
+    if not content_type:
+        return None
+    return content_type.split(";", 1)[0].strip().lower() or None
+
+
+def _looks_like_text(sample: bytes) -> bool:
+    return not sample.translate(None, _TEXT_BYTES)
+
+
+@dataclass(frozen=True)
+class UploadPolicy:
+    """Accepted upload formats and the size limit of each."""
+
+    limits: Dict[str, int]
+
+    @classmethod
+    def from_settings(cls) -> "UploadPolicy":
+        return cls(parse_size_limits(settings.UPLOAD_SIZE_LIMITS))
+
+    def limit_for(self, media_type: Optional[str]) -> Optional[int]:
+        if not media_type:
+            return None
+        if media_type in self.limits:
+            return self.limits[media_type]
+        return self.limits.get(media_type.split("/", 1)[0] + "/*")
+
+    def classify(self, sample: bytes, declared: Optional[str]) -> Tuple[str, int]:
+        """Return the media type of a file from its first bytes, and its size limit.
+
+        The sniffed type wins over the declared one; files without magic bytes are
+        accepted as text (keeping a declared text type) if they look like text.
+        """
+
+        declared = _media_type(declared)
+        sniffed = filetype.guess_mime(sample)
+        if sniffed == "application/zip" and declared in _ZIP_CONTAINERS:
+            sniffed = declared
+        if sniffed is None and _looks_like_text(sample):
+            text_like = declared is not None and (declared.startswith("text/") or declared in _TEXT_APPLICATION_TYPES)
+            sniffed = declared if text_like and self.limit_for(declared) is not None else "text/plain"
+
+        limit = self.limit_for(sniffed)
+        if limit is None:
+            raise UploadLimitError(
+                415,
+                f"Unsupported file type: {sniffed or 'unknown binary format'}",
+                reason=REJECTED_UNSUPPORTED,
+            )
+        return sniffed, limit
+
+
+class _FilePart:
+    def __init__(self, index: int, filename: str, declared: Optional[str]) -> None:
+        self.index = index
+        self.filename = filename
+        self.declared = declared
+        self.size = 0
+        self.sample = bytearray()
+        self.media_type: Optional[str] = None
+        self.limit: Optional[int] = None
+        self.rejected = False
+
+
+class _MultipartInspector:
+    """Follows a multipart body chunk by chunk, checking every file part against the policy.
+
+    Violations raise UploadLimitError, unless per_file is set: then they are kept
+    in `rejections`, keyed by the position of the file among the request's file
+    parts, and the data of rejected parts is cut from the chunks `feed` returns.
+    """
+
+    def __init__(self, boundary: bytes, policy: UploadPolicy, *, per_file: bool = False) -> None:
+        self.policy = policy
+        self.per_file = per_file
+        self.rejections: Dict[int, UploadLimitError] = {}
+        self.part: Optional[_FilePart] = None
+        self._files = 0
+        self._chunk = b""
+        self._dropped: List[Tuple[int, int]] = []
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+        self._headers: List[Tuple[bytes, bytes]] = []
+        self._malformed = False
+        self._parser = MultipartParser(
+            boundary,
+            {
+                "on_part_begin": self._on_part_begin,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+            },
+        )
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Check the next chunk of the body and return what of it should reach the app."""
+
+        if self._malformed:
+            return chunk
+        self._chunk = chunk
+        self._dropped = []
+        try:
+            self._parser.write(chunk)
+        except MultipartParseError:
+            # The app's own parser reports malformed bodies; only the request size is still enforced
+            self._malformed = True
+            return chunk
+        finally:
+            self._chunk = b""
+        if not self._dropped:
+            return chunk
+        kept = []
+        position = 0
+        for start, end in self._dropped:
+            kept.append(chunk[position:start])
+            position = end
+        kept.append(chunk[position:])
+        return b"".join(kept)
+
+    def _on_part_begin(self) -> None:
+        self.part = None
+        self._headers = []
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers.append((bytes(self._header_field).lower(), bytes(self._header_value)))
+        self._header_field.clear()
+        self._header_value.clear()
+
+    def _on_headers_finished(self) -> None:
+        headers = dict(self._headers)
+        _, options = parse_options_header(headers.get(b"content-disposition", b""))
+        # Plain form fields are small and left to the app
+        if b"filename" in options:
+            declared = headers.get(b"content-type")
+            self.part = _FilePart(
+                self._files,
+                options[b"filename"].decode("utf-8", "replace"),
+                declared.decode("latin-1") if declared else None,
+            )
+            self._files += 1
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        part = self.part
+        if part is None:
+            return
+        if not part.rejected:
+            try:
+                self._check_data(part, data, start, end)
+            except UploadLimitError as exc:
+                self._reject(part, exc)
+        # Only ranges of the current chunk can be cut; the parser may also replay a
+        # few held-back bytes of an earlier chunk, which the app has already seen
+        if part.rejected and data is self._chunk:
+            self._dropped.append((start, end))
+
+    def _on_part_end(self) -> None:
+        part = self.part
+        if part is None:
+            return
+        self.part = None
+        if part.rejected:
+            return
+        try:
+            if part.size == 0:
+                raise UploadLimitError(400, f"File '{part.filename}' is empty", reason=REJECTED_EMPTY)
+            if part.media_type is None:
+                self._classify(part)
+        except UploadLimitError as exc:
+            self._reject(part, exc)
+
+    def _check_data(self, part: _FilePart, data: bytes, start: int, end: int) -> None:
+        part.size += end - start
+        if part.media_type is None:
+            part.sample += data[start : min(end, start + SNIFF_BYTES - len(part.sample))]
+            if len(part.sample) < SNIFF_BYTES:
+                return
+            self._classify(part)
+        if part.size > part.limit:
+            raise UploadLimitError(
+                413,
+                f"File '{part.filename}' exceeds the {part.limit} byte limit for {part.media_type}",
+                reason=REJECTED_TOO_LARGE,
+            )
+
+    def _classify(self, part: _FilePart) -> None:
+        part.media_type, part.limit = self.policy.classify(bytes(part.sample), part.declared)
+        part.sample = bytearray()
+
+    def _reject(self, part: _FilePart, exc: UploadLimitError) -> None:
+        if not self.per_file:
+            raise exc
+        part.rejected = True
+        part.sample = bytearray()
+        self.rejections[part.index] = exc
+        REJECTIONS.labels(exc.reason).inc()
+        logger.warning("Archivo '%s' rechazado en la subida por lotes (%d): %s", part.filename, exc.status_code, exc.detail)
+
+
+class UploadLimitMiddleware:
+    """Enforce UploadPolicy and UPLOAD_MAX_REQUEST_SIZE on POSTs to the given paths.
+
+    Violations stop the app's read of the body (it sees a client disconnect), any
+    response it produces is dropped, and the client gets the error response with
+    "Connection: close" so the rest of the body is never read.
+
+    On per_file_paths, file parts that break the policy are not fatal: the request
+    goes on without their data, and request.state.upload_rejections maps the
+    position of each rejected file part to its UploadLimitError. The request size
+    limit still applies to the whole body.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        paths: Iterable[str],
+        per_file_paths: Iterable[str] = (),
+        policy: Optional[UploadPolicy] = None,
+    ) -> None:
+        self.app = app
+        self.per_file_paths = frozenset(per_file_paths)
+        self.paths = frozenset(paths) | self.per_file_paths
+        self.policy = policy or UploadPolicy.from_settings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        max_size = settings.UPLOAD_MAX_REQUEST_SIZE
+        content_length = headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > max_size:
+            await self._reject(
+                scope,
+                receive,
+                send,
+                UploadLimitError(
+                    413, f"Request body exceeds the {max_size} byte limit", reason=REJECTED_TOO_LARGE
+                ),
+            )
+            return
+
+        content_type, options = parse_options_header(headers.get("content-type", ""))
+        inspector = None
+        if content_type == b"multipart/form-data" and b"boundary" in options:
+            per_file = scope["path"] in self.per_file_paths
+            inspector = _MultipartInspector(options[b"boundary"], self.policy, per_file=per_file)
+            if per_file:
+                scope.setdefault("state", {})[REJECTIONS_STATE_KEY] = inspector.rejections
+
+        received = 0
+        rejection: Optional[UploadLimitError] = None
+        response_started = False
+
+        async def checked_receive() -> Message:
+            nonlocal received, rejection
+            if rejection is not None:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] != "http.request":
+                return message
+            body = message.get("body", b"")
+            received += len(body)
+            try:
+                if received > max_size:
+                    raise UploadLimitError(
+                        413, f"Request body exceeds the {max_size} byte limit", reason=REJECTED_TOO_LARGE
+                    )
+                if inspector is not None and body:
+                    forwarded = inspector.feed(body)
+                    if forwarded is not body:
+                        message = {**message, "body": forwarded}
+            except UploadLimitError as exc:
+                rejection = exc
+                return {"type": "http.disconnect"}
+            return message
+
+        async def checked_send(message: Message) -> None:
+            nonlocal response_started
+            if rejection is not None:
+                return
+            response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, checked_receive, checked_send)
+        except Exception:
+            if rejection is None:
+                raise
+        if rejection is not None and not response_started:
+            await self._reject(scope, receive, send, rejection)
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send, exc: UploadLimitError) -> None:
+        REJECTIONS.labels(exc.reason).inc()
+        logger.warning("Subida rechazada en %s (%d): %s", scope["path"], exc.status_code, exc.detail)
+        response = JSONResponse(
+            {"detail": exc.detail}, status_code=exc.status_code, headers={"Connection": "close"}
+        )
+        await response(scope, receive, send)
@@ -1,36 +1,180 @@
-from typing import List
+from typing import Dict, List, Optional
 
-from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi import APIRouter, File, Form, Header, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
 
-from src.models.responses import DocumentInfo, DocumentListResponse, DocumentUploadResponse
-from src.services.object_storage import ObjectStorageError, get_object_storage_service
+from src.api.upload_limits import REJECTIONS_STATE_KEY
+from src.core.config import settings
+from src.models.requests import DocumentBatchDeleteRequest, DocumentUploadCompleteRequest, DocumentUploadRequest
+from src.models.responses import (
+    DocumentBatchDeleteResponse,
+    DocumentBatchDeleteResult,
+    DocumentBatchUploadResponse,
+    DocumentBatchUploadResult,
+    DocumentDeletionJobResponse,
+    DocumentInfo,
+    DocumentListResponse,
+    DocumentPresignedUploadResponse,
+    DocumentUploadResponse,
+)
+from src.services.document_blobs import get_document_blob_store, is_link_key
+from src.services.document_catalog import (
+    DOCUMENTS_PREFIX,
+    CatalogDocument,
+    JOB_FAILED,
+    JOB_SUCCEEDED,
+    DeletionJob,
+    InvalidCursorError,
+    get_document_catalog,
+)
+from src.services.document_deletion import get_document_deletion_worker
+from src.services.object_storage import (
+    ObjectStorageError,
+    ObjectStorageInvalidRangeError,
+    ObjectStorageNotFoundError,
+    ObjectStorageUnavailableError,
+    ObjectStorageUnsupportedError,
+    ObjectStorageUploadResult,
+    get_object_storage_service,
+)
+from src.services.upload_admission import UploadRejectedError, get_upload_admission_controller
+from src.utils.concurrency import ByteSemaphore
 
+from datetime import datetime, timezone
+import asyncio
+import logging
+import math
 import uuid
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Process-wide budget of bytes being uploaded by batch requests
+_batch_upload_budget = ByteSemaphore(settings.UPLOAD_BATCH_MAX_INFLIGHT_BYTES)
 
 
 def _document_prefix(document_id: str) -> str:
-    return f"documents/{document_id}"
+    return f"{DOCUMENTS_PREFIX}/{document_id}"
 
-@router.post("/upload", response_model=DocumentUploadResponse)
-async def upload_document(file: UploadFile = File(...)):
-    """Upload a document for RAG processing"""
+def _parse_document_id(document_id: str) -> str:
     try:
-        storage_service = get_object_storage_service()
+        return str(uuid.UUID(document_id))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid document ID")
 
-        # Generate unique document ID
-        document_id = str(uuid.uuid4())
-        prefix = _document_prefix(document_id)
+def _storage_error(exc: Exception, headers: Optional[Dict[str, str]] = None) -> HTTPException:
+    # Throttling and an open circuit become 503 + Retry-After so clients back off instead of hammering
+    if isinstance(exc, ObjectStorageUnavailableError):
+        return HTTPException(
+            status_code=503,
+            detail="Storage is temporarily unavailable",
+            headers={**(headers or {}), "Retry-After": str(math.ceil(exc.retry_after))},
+        )
+    if isinstance(exc, ObjectStorageUnsupportedError):
+        return HTTPException(status_code=501, detail=str(exc), headers=headers)
+    return HTTPException(status_code=500, detail=str(exc), headers=headers)
+
+def _upload_rejected(exc: UploadRejectedError, headers: Optional[Dict[str, str]] = None) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Too many uploads in progress, retry later",
+        headers={**(headers or {}), "Retry-After": str(math.ceil(exc.retry_after))},
+    )
 
-        storage_key = storage_service.build_key(file.filename or "file", prefix=prefix)
-        upload_result = await storage_service.upload_file(
-            file,
-            destination_path=storage_key,
-            metadata={"document_id": document_id},
+def _single_byte_range(range_header: Optional[str]) -> Optional[str]:
+    # R2 serves a single range; anything else is ignored and the full body is sent (RFC 9110)
+    if not range_header:
+        return None
+    value = range_header.strip()
+    if not value.lower().startswith("bytes=") or "," in value:
+        return None
+    return value
+
+async def _record_document(
+    document_id: str,
+    key: str,
+    *,
+    size: Optional[int],
+    content_type: Optional[str],
+    etag: Optional[str],
+    url: Optional[str],
+    content_key: Optional[str] = None,
+    digests: Optional[Dict[str, Optional[str]]] = None,
+) -> None:
+    # The bucket is the source of truth: a failed catalog write is repaired by the reconciler
+    try:
+        await get_document_catalog().upsert(
+            CatalogDocument(
+                document_id=document_id,
+                key=key,
+                filename=key[len(_document_prefix(document_id)) + 1 :],
+                size=size,
+                last_modified=datetime.now(timezone.utc),
+                content_type=content_type,
+                etag=etag,
+                url=url,
+                content_key=content_key or key,
+                **(digests or {}),
+            )
         )
+    except Exception:
+        logger.exception("No se pudo registrar el documento '%s' en el catálogo", document_id)
 
-        # TODO: Process document with LlamaIndex usando el archivo en R2
+def _deletion_job_response(job: DeletionJob) -> DocumentDeletionJobResponse:
+    return DocumentDeletionJobResponse(
+        job_id=job.job_id,
+        document_id=job.document_id,
+        status=job.status,
+        attempts=job.attempts,
+        deleted_objects=job.deleted_objects,
+        failed_objects=job.failed_objects,
+        error=job.error,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+    )
+
+async def _store_document(file: UploadFile, document_id: str) -> ObjectStorageUploadResult:
+    storage_service = get_object_storage_service()
+    prefix = _document_prefix(document_id)
+
+    storage_key = storage_service.build_key(file.filename or "file", prefix=prefix)
+    upload_result = await get_document_blob_store().store(
+        file,
+        document_id=document_id,
+        document_key=storage_key,
+        metadata={"document_id": document_id},
+    )
+    await _record_document(
+        document_id,
+        storage_key,
+        size=upload_result.size,
+        content_type=file.content_type,
+        etag=upload_result.etag,
+        url=upload_result.url,
+        content_key=upload_result.content_key,
+        digests={"sha256": upload_result.sha256, "md5": upload_result.md5, "crc32c": upload_result.crc32c},
+    )
+
+    # TODO: Process document with LlamaIndex usando el archivo en R2
+
+    return upload_result
+
+@router.post("/upload", response_model=DocumentUploadResponse)
+async def upload_document(
+    file: UploadFile = File(...),
+    document_id: Optional[str] = Form(
+        None,
+        description="ID returned by a previously interrupted upload; large files resume from the first missing part",
+    ),
+):
+    """Upload a document for RAG processing"""
+    # Generate unique document ID unless the client is resuming an interrupted upload
+    document_id = _parse_document_id(document_id) if document_id else str(uuid.uuid4())
+
+    try:
+        # Bounds the uploads (and their buffers and bucket connections) this worker runs at once
+        async with get_upload_admission_controller().admit(file.size or 0):
+            upload_result = await _store_document(file, document_id)
 
         return DocumentUploadResponse(
             message="Document uploaded successfully",
@@ -38,65 +182,348 @@ async def upload_document(file: UploadFile = File(...)):
             filename=file.filename,
             url=upload_result.url,
         )
+    except UploadRejectedError as exc:
+        raise _upload_rejected(exc, headers={"X-Document-Id": document_id})
     except ObjectStorageError as exc:
-        raise HTTPException(status_code=500, detail=str(exc))
+        # Expose the ID so the client can retry and resume the multipart upload
+        raise _storage_error(exc, headers={"X-Document-Id": document_id})
     except Exception as exc:
-        raise HTTPException(status_code=500, detail=str(exc))
+        raise _storage_error(exc, headers={"X-Document-Id": document_id})
+
+@router.post("/upload-batch", response_model=DocumentBatchUploadResponse)
+async def upload_documents_batch(request: Request, files: List[UploadFile] = File(...)):
+    """Upload many documents in one request, storing them concurrently"""
+    if len(files) > settings.UPLOAD_BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many files in one batch (max {settings.UPLOAD_BATCH_MAX_FILES})",
+        )
+
+    # Files the upload limits rejected while streaming; their data never reached us
+    rejections = getattr(request.state, REJECTIONS_STATE_KEY, {})
+    # At most as many files in flight as the worker admits at once, so the rest of the batch waits
+    # here instead of filling the admission queue, which is meant for competing requests
+    batch_slots = asyncio.Semaphore(settings.UPLOAD_MAX_CONCURRENT)
+
+    async def upload_one(index: int, file: UploadFile) -> DocumentBatchUploadResult:
+        filename = file.filename or "file"
+        if index in rejections:
+            return DocumentBatchUploadResult(filename=filename, error=f"rejected: {rejections[index].detail}")
+        # Wait for a batch slot and room in the batch byte budget, then go through the same admission
+        # as single uploads
+        async with batch_slots, _batch_upload_budget.reserve(file.size or 0):
+            try:
+                document_id = str(uuid.uuid4())
+                async with get_upload_admission_controller().admit(file.size or 0):
+                    upload_result = await _store_document(file, document_id)
+            except UploadRejectedError:
+                return DocumentBatchUploadResult(filename=filename, error="Too many uploads in progress, retry later")
+            except Exception as exc:
+                return DocumentBatchUploadResult(filename=filename, error=str(exc))
+
+        return DocumentBatchUploadResult(
+            filename=filename,
+            document_id=document_id,
+            url=upload_result.url,
+        )
+
+    results = await asyncio.gather(*(upload_one(index, file) for index, file in enumerate(files)))
+    failed = sum(1 for result in results if result.error)
+
+    return DocumentBatchUploadResponse(
+        results=list(results),
+        uploaded=len(results) - failed,
+        failed=failed,
+    )
+
+@router.post("/presign-upload", response_model=DocumentPresignedUploadResponse)
+async def presign_document_upload(request: DocumentUploadRequest):
+    """Issue a presigned URL so the client uploads the document straight to the bucket"""
+    if request.size is not None and request.size > settings.R2_PRESIGNED_UPLOAD_MAX_SIZE:
+        raise HTTPException(status_code=413, detail="Document exceeds the maximum upload size")
 
-@router.get("/", response_model=DocumentListResponse)
-async def list_documents():
-    """List all uploaded documents"""
     try:
         storage_service = get_object_storage_service()
-        objects = await storage_service.list_objects(prefix="documents", max_keys=1000)
-
-        documents: List[DocumentInfo] = []
-        for obj in objects:
-            parts = obj.key.split("/")
-            if len(parts) < 3:
-                # Skip objects that do not follow the documents/<id>/<filename> structure
-                continue
-
-            _, document_id, *filename_parts = parts
-            filename = "/".join(filename_parts) if filename_parts else obj.filename
-
-            documents.append(
-                DocumentInfo(
-                    id=document_id,
-                    filename=filename,
-                    url=obj.url,
-                    size=obj.size,
-                    last_modified=obj.last_modified,
-                )
+
+        document_id = str(uuid.uuid4())
+        storage_key = storage_service.build_key(request.filename, prefix=_document_prefix(document_id))
+        expires_in = settings.R2_PRESIGNED_UPLOAD_EXPIRES_IN
+
+        if request.method == "POST":
+            presigned_post = await storage_service.generate_presigned_post(
+                storage_key,
+                expires_in=expires_in,
+                max_size=settings.R2_PRESIGNED_UPLOAD_MAX_SIZE,
+                content_type=request.content_type,
+            )
+            return DocumentPresignedUploadResponse(
+                document_id=document_id,
+                key=storage_key,
+                method="POST",
+                url=presigned_post["url"],
+                fields=presigned_post["fields"],
+                expires_in=expires_in,
             )
 
-        documents.sort(
-            key=lambda doc: doc.last_modified.timestamp() if doc.last_modified else float("-inf"),
-            reverse=True,
+        url = await storage_service.generate_presigned_url(
+            storage_key,
+            expires_in,
+            client_method="put_object",
+        )
+        return DocumentPresignedUploadResponse(
+            document_id=document_id,
+            key=storage_key,
+            method="PUT",
+            url=url,
+            headers={"Content-Type": request.content_type},
+            expires_in=expires_in,
         )
-
-        return DocumentListResponse(documents=documents, total=len(documents))
     except ObjectStorageError as exc:
-        raise HTTPException(status_code=500, detail=str(exc))
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=str(exc))
+        raise _storage_error(exc)
+
+@router.post("/{document_id}/complete", response_model=DocumentUploadResponse)
+async def complete_document_upload(document_id: str, request: DocumentUploadCompleteRequest):
+    """Register a document uploaded directly to the bucket through a presigned URL"""
+    document_id = _parse_document_id(document_id)
+    prefix = _document_prefix(document_id)
+    if not request.key.startswith(f"{prefix}/") or is_link_key(request.key):
+        raise HTTPException(status_code=400, detail="Key does not belong to this document")
 
-@router.delete("/{document_id}")
-async def delete_document(document_id: str):
-    """Delete a document"""
     try:
         storage_service = get_object_storage_service()
+        uploaded = await storage_service.head_object(request.key)
+        if uploaded is None:
+            raise HTTPException(status_code=404, detail="Uploaded object not found")
 
-        prefix = _document_prefix(document_id)
-        deleted_count = await storage_service.delete_prefix(prefix)
+        if uploaded.size == 0 or uploaded.size > settings.R2_PRESIGNED_UPLOAD_MAX_SIZE:
+            await storage_service.delete_objects([request.key])
+            raise HTTPException(status_code=400, detail="Uploaded object is empty or exceeds the maximum size")
 
-        if deleted_count == 0:
+        await _record_document(
+            document_id,
+            request.key,
+            size=uploaded.size,
+            content_type=uploaded.content_type,
+            etag=uploaded.etag,
+            url=uploaded.url,
+        )
+
+        # TODO: Process document with LlamaIndex usando el archivo en R2
+
+        return DocumentUploadResponse(
+            message="Document upload completed",
+            document_id=document_id,
+            filename=uploaded.filename,
+            url=uploaded.url,
+        )
+    except ObjectStorageError as exc:
+        raise _storage_error(exc)
+
+@router.get("/", response_model=DocumentListResponse)
+async def list_documents(
+    limit: int = Query(50, ge=1, le=1000, description="Maximum number of documents to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor returned by the previous page"),
+):
+    """List uploaded documents, newest first, one page at a time"""
+    try:
+        catalog = get_document_catalog()
+        page = await catalog.list_documents(limit=limit, cursor=cursor)
+
+        # One batch call signs the whole page, mostly from the presign cache
+        download_urls = {}
+        if settings.DOCUMENT_DOWNLOAD_URL_EXPIRES_IN > 0:
+            download_urls = await get_object_storage_service().generate_presigned_urls(
+                [document.content_key for document in page.documents if document.content_key],
+                settings.DOCUMENT_DOWNLOAD_URL_EXPIRES_IN,
+            )
+
+        documents = [
+            DocumentInfo(
+                id=document.document_id,
+                filename=document.filename,
+                url=document.url,
+                download_url=download_urls.get(document.content_key),
+                size=document.size,
+                last_modified=document.last_modified,
+            )
+            for document in page.documents
+        ]
+
+        return DocumentListResponse(
+            documents=documents,
+            total=await catalog.count(),
+            next_cursor=page.next_cursor,
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    except Exception as exc:
+        raise _storage_error(exc)
+
+@router.get("/{document_id}/content")
+async def download_document(
+    document_id: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+):
+    """Stream the document bytes, honouring Range and If-None-Match"""
+    document_id = _parse_document_id(document_id)
+
+    try:
+        entry = await get_document_catalog().get(document_id)
+        if entry is not None and entry.deleted_at is not None:
+            raise HTTPException(status_code=404, detail="Document not found")
+
+        document = await get_document_blob_store().locate(f"{_document_prefix(document_id)}/")
+        if document is None:
             raise HTTPException(status_code=404, detail="Document not found")
 
-        return {"message": "Document deleted successfully"}
+        stream = await get_object_storage_service().stream_object(
+            get_document_blob_store().content_key(document),
+            byte_range=_single_byte_range(range_header),
+            if_none_match=if_none_match,
+        )
+    except ObjectStorageNotFoundError:
+        raise HTTPException(status_code=404, detail="Document not found")
+    except ObjectStorageInvalidRangeError:
+        return Response(
+            status_code=416,
+            headers={"Content-Range": f"bytes */{document.size}", "Accept-Ranges": "bytes"},
+        )
     except ObjectStorageError as exc:
-        raise HTTPException(status_code=500, detail=str(exc))
+        raise _storage_error(exc)
+
+    headers = {"Accept-Ranges": "bytes"}
+    if stream.etag:
+        headers["ETag"] = stream.etag
+    if stream.status == 304:
+        return Response(status_code=304, headers=headers)
+
+    if stream.content_length is not None:
+        headers["Content-Length"] = str(stream.content_length)
+    headers["Content-Disposition"] = f'inline; filename="{document.filename}"'
+    if stream.content_range:
+        headers["Content-Range"] = stream.content_range
+    if stream.last_modified:
+        headers["Last-Modified"] = stream.last_modified.strftime("%a, %d %b %Y %H:%M:%S GMT")
+
+    # Chunks are passed through as they arrive from the bucket, never buffered whole
+    return StreamingResponse(
+        stream.chunks,
+        status_code=stream.status,
+        headers=headers,
+        media_type=document.content_type or stream.content_type or "application/octet-stream",
+    )
+
+@router.delete("/{document_id}", status_code=202, response_model=DocumentDeletionJobResponse)
+async def delete_document(document_id: str, request: Request, response: Response):
+    """Hide a document at once and queue the purge of its storage and caches"""
+    document_id = _parse_document_id(document_id)
+
+    try:
+        catalog = get_document_catalog()
+        document = await catalog.get(document_id)
+        if document is None:
+            # Not catalogued yet (e.g. a presigned upload never completed): check the bucket
+            objects = await get_object_storage_service().list_objects(
+                prefix=f"{_document_prefix(document_id)}/", max_keys=1, use_cache=False
+            )
+            if not objects:
+                raise HTTPException(status_code=404, detail="Document not found")
+
+        job = await catalog.tombstone(document_id)
+        get_document_deletion_worker().notify()
+    except ObjectStorageError as exc:
+        raise _storage_error(exc)
     except HTTPException:
         raise
     except Exception as exc:
-        raise HTTPException(status_code=500, detail=str(exc))
\ No newline at end of file
+        raise _storage_error(exc)
+
+    response.headers["Location"] = str(request.url_for("get_deletion_job", job_id=job.job_id))
+    return _deletion_job_response(job)
+
+@router.post("/delete-batch", response_model=DocumentBatchDeleteResponse)
+async def delete_documents_batch(request: DocumentBatchDeleteRequest):
+    """Delete many documents at once, packing their objects into shared delete requests"""
+    if len(request.document_ids) > settings.DELETE_BATCH_MAX_DOCUMENTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many documents in one batch (max {settings.DELETE_BATCH_MAX_DOCUMENTS})",
+        )
+
+    results = {
+        document_id: DocumentBatchDeleteResult(document_id=document_id, status="invalid", error="Invalid document ID")
+        for document_id in request.document_ids
+    }
+    ids: Dict[str, str] = {}
+    for document_id in request.document_ids:
+        try:
+            ids[document_id] = str(uuid.UUID(document_id))
+        except ValueError:
+            continue
+
+    try:
+        catalog = get_document_catalog()
+        catalogued = await catalog.get_many(list(ids.values()))
+
+        # Documents missing from the catalog may still be in the bucket (e.g. uncompleted presigned uploads)
+        storage_service = get_object_storage_service()
+        slots = asyncio.Semaphore(settings.R2_LIST_CONCURRENCY)
+
+        async def in_bucket(document_id: str) -> bool:
+            async with slots:
+                return bool(
+                    await storage_service.list_objects(
+                        prefix=f"{_document_prefix(document_id)}/", max_keys=1, use_cache=False
+                    )
+                )
+
+        unknown = [document_id for document_id in dict.fromkeys(ids.values()) if document_id not in catalogued]
+        found = await asyncio.gather(*(in_bucket(document_id) for document_id in unknown))
+        existing = [*catalogued, *(document_id for document_id, hit in zip(unknown, found) if hit)]
+
+        jobs = await catalog.tombstone_many(existing)
+        # Run the jobs inline; any the background worker already took are reported as pending
+        worker = get_document_deletion_worker()
+        for job in await worker.process_many(await worker.claim([job.job_id for job in jobs.values()])):
+            jobs[job.document_id] = job
+    except ObjectStorageError as exc:
+        raise _storage_error(exc)
+    except Exception as exc:
+        raise _storage_error(exc)
+
+    for original_id, document_id in ids.items():
+        job = jobs.get(document_id)
+        if job is None:
+            results[original_id] = DocumentBatchDeleteResult(
+                document_id=original_id, status="not_found", error="Document not found"
+            )
+            continue
+        if job.status == JOB_SUCCEEDED:
+            status = "deleted"
+        elif job.status == JOB_FAILED:
+            status = "failed"
+        else:
+            status = "pending"
+        results[original_id] = DocumentBatchDeleteResult(
+            document_id=original_id,
+            status=status,
+            job_id=job.job_id,
+            deleted_objects=job.deleted_objects,
+            error=job.error,
+        )
+
+    ordered = [results[document_id] for document_id in request.document_ids]
+    deleted = sum(1 for result in ordered if result.status == "deleted")
+    return DocumentBatchDeleteResponse(results=ordered, deleted=deleted, failed=len(ordered) - deleted)
+
+@router.get("/deletion-jobs/{job_id}", response_model=DocumentDeletionJobResponse)
+async def get_deletion_job(job_id: str):
+    """Report the progress of an asynchronous document deletion"""
+    try:
+        job = await get_document_catalog().get_deletion_job(job_id)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Deletion job not found")
+    return _deletion_job_response(job)
@@ -1,5 +1,14 @@
-from fastapi import APIRouter
-from src.models.responses import HealthResponse
+from dataclasses import asdict
+
+from fastapi import APIRouter, HTTPException
+from src.models.responses import (
+    HealthResponse,
+    ListingCacheStatsResponse,
+    PresignCacheStatsResponse,
+    StorageExecutorStatsResponse,
+    StorageHealthResponse,
+)
+from src.services.object_storage import ObjectStorageError, get_object_storage_service
 from datetime import datetime
 
 router = APIRouter()
@@ -11,4 +20,23 @@ async def health_check():
         status="healthy",
         timestamp=datetime.now(),
         version="1.0.0"
-    )
\ No newline at end of file
+    )
+
+@router.get("/storage", response_model=StorageHealthResponse)
+async def storage_health():
+    """Storage client and thread pool status"""
+    try:
+        storage_service = get_object_storage_service()
+    except ObjectStorageError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+
+    stats = storage_service.executor_stats()
+    circuit = storage_service.circuit_state()
+    return StorageHealthResponse(
+        status="healthy" if circuit == "closed" else "degraded",
+        backend=storage_service.backend,
+        circuit=circuit,
+        executor=StorageExecutorStatsResponse(**asdict(stats)) if stats else None,
+        listing_cache=ListingCacheStatsResponse(**asdict(storage_service.listing_cache_stats())),
+        presign_cache=PresignCacheStatsResponse(**asdict(storage_service.presign_cache_stats())),
+    )
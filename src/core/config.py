@@ -24,6 +24,20 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Object storage backend: "r2" (Cloudflare R2), "filesystem" (a local directory, no network)
+    # or "memory" (process memory with injected faults, for load tests; one worker only)
+    STORAGE_BACKEND: str = "r2"
+    # Root directory of the filesystem backend; each bucket is a subdirectory
+    STORAGE_FILESYSTEM_PATH: str = "./data/storage"
+    # Faults of the memory backend: "operation=median/p99" latencies in seconds and
+    # "operation=probability" SlowDown error rates, comma separated; "*" covers the other operations
+    STORAGE_MEMORY_LATENCY: str = ""
+    STORAGE_MEMORY_ERROR_RATES: str = ""
+    # Bytes per second shared by all memory backend transfers (0 = unlimited)
+    STORAGE_MEMORY_BANDWIDTH: int = 0
+    # Seed of the injected faults, for reproducible runs
+    STORAGE_MEMORY_SEED: Optional[int] = None
+
     # Object Storage (Cloudflare R2)
     R2_ACCOUNT_ID: Optional[str] = None
     R2_ACCESS_KEY_ID: Optional[str] = None
@@ -31,6 +45,102 @@ class Settings(BaseSettings):
     R2_BUCKET_NAME: Optional[str] = None
     R2_PUBLIC_BASE_URL: Optional[str] = None
     R2_ENDPOINT_URL: Optional[str] = None
+    # "boto3" runs the SDK in worker threads; "aiohttp" uses the native asyncio client
+    R2_CLIENT_BACKEND: str = "boto3"
+    R2_MAX_POOL_CONNECTIONS: int = 50
+    # Key ranges listed at once by full (sharded) bucket listings
+    R2_LIST_CONCURRENCY: int = 8
+    # DeleteObjects batches (1000 keys each) in flight while deleting a prefix
+    R2_DELETE_CONCURRENCY: int = 4
+    # Retries of throttled (429/503 SlowDown) and failed calls, with decorrelated jitter;
+    # each operation may retry at most BUDGET_RATIO of its calls (plus MIN_PER_SECOND)
+    R2_RETRY_MAX_ATTEMPTS: int = 4
+    R2_RETRY_BASE_DELAY: float = 0.1
+    R2_RETRY_MAX_DELAY: float = 5.0
+    R2_RETRY_BUDGET_RATIO: float = 0.2
+    R2_RETRY_BUDGET_MIN_PER_SECOND: float = 5.0
+    # Consecutive transient failures that open the circuit breaker, and how long it stays open
+    R2_CIRCUIT_FAILURE_THRESHOLD: int = 10
+    R2_CIRCUIT_RESET_TIMEOUT: float = 30.0
+    # Uploads above the threshold are streamed to R2 as multipart uploads
+    R2_MULTIPART_THRESHOLD: int = 16 * 1024 * 1024
+    R2_MULTIPART_PART_SIZE: int = 8 * 1024 * 1024
+    R2_MULTIPART_CONCURRENCY: int = 4
+    R2_UPLOAD_SESSION_DIR: str = "./data/uploads"
+
+    # Documents with identical content share one content-addressed blob
+    STORAGE_DEDUPLICATION_ENABLED: bool = True
+
+    # Digests computed while streaming an upload ("md5", "sha256", "crc32c"; sha256 is always
+    # computed, crc32c needs the google-crc32c package). With md5, every PUT and multipart part
+    # carries Content-MD5 so the bucket verifies it. They are kept in the object metadata and the catalog
+    STORAGE_UPLOAD_CHECKSUMS: str = "md5,sha256"
+
+    # Compression of text-like uploads: "none", "gzip" or "zstd" (needs the zstandard package)
+    STORAGE_COMPRESSION: str = "none"
+    STORAGE_COMPRESSION_LEVEL: Optional[int] = None
+    STORAGE_COMPRESSION_CONTENT_TYPES: str = "text/plain,text/markdown,text/html,application/json"
+
+    # Direct-to-bucket uploads through presigned URLs
+    R2_PRESIGNED_UPLOAD_EXPIRES_IN: int = 900
+    R2_PRESIGNED_UPLOAD_MAX_SIZE: int = 5 * 1024 * 1024 * 1024
+
+    # Download URLs are signed in-process and reused within a window of this many
+    # seconds (0 disables the cache); listings include them when the expiry is > 0
+    R2_PRESIGN_CACHE_WINDOW: int = 300
+    R2_PRESIGN_CACHE_MAX_ENTRIES: int = 10000
+    DOCUMENT_DOWNLOAD_URL_EXPIRES_IN: int = 3600
+
+    # Cache of list_objects results per prefix (0 disables it); the generation file is
+    # shared by the workers on a host so a write in one invalidates the others. Only listings
+    # shown to clients use it; reference counts, deletions and existence checks always list the bucket
+    LIST_CACHE_TTL: float = 5.0
+    LIST_CACHE_GENERATION_PATH: str = "./data/list_cache.generation"
+
+    # SQLite catalog of documents, reconciled against the bucket in the background (0 disables it)
+    DOCUMENT_CATALOG_PATH: str = "./data/catalog.db"
+    DOCUMENT_CATALOG_RECONCILE_INTERVAL: float = 300.0
+
+    # Background purge of deleted documents (seconds between polls of the job queue)
+    DOCUMENT_DELETION_POLL_INTERVAL: float = 5.0
+    DOCUMENT_DELETION_MAX_ATTEMPTS: int = 5
+
+    # Local disk cache for objects read back from storage; the workers of a host may share the
+    # directory, and OBJECT_CACHE_MAX_BYTES bounds all of it
+    OBJECT_CACHE_DIR: str = "./data/object_cache"
+    OBJECT_CACHE_MAX_BYTES: int = 2 * 1024 * 1024 * 1024
+    OBJECT_CACHE_VALIDATE_AFTER: float = 30.0
+
+    # Upload admission per worker: uploads storing at once and the total bytes they declare;
+    # the rest wait in a queue of UPLOAD_ADMISSION_MAX_QUEUE for up to UPLOAD_ADMISSION_TIMEOUT
+    # seconds and are then rejected with 503 + Retry-After
+    UPLOAD_MAX_CONCURRENT: int = 32
+    UPLOAD_MAX_INFLIGHT_BYTES: int = 512 * 1024 * 1024
+    UPLOAD_ADMISSION_MAX_QUEUE: int = 64
+    UPLOAD_ADMISSION_TIMEOUT: float = 10.0
+
+    # Uploads through the API are checked while the body streams in: each file's type is sniffed
+    # from its magic bytes and must appear in UPLOAD_SIZE_LIMITS ("type=bytes" pairs, "text/*"
+    # matches any text type); a file over its type's limit, an unsupported or empty file, or a body
+    # over UPLOAD_MAX_REQUEST_SIZE aborts the request with 413/415/400 before the rest is read
+    UPLOAD_SIZE_LIMITS: str = (
+        "application/pdf=104857600,"
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document=52428800,"
+        "application/vnd.openxmlformats-officedocument.presentationml.presentation=104857600,"
+        "application/msword=52428800,"
+        "application/epub+zip=52428800,"
+        "application/rtf=20971520,"
+        "application/json=20971520,"
+        "text/*=20971520"
+    )
+    UPLOAD_MAX_REQUEST_SIZE: int = 1024 * 1024 * 1024
+
+    # Batch uploads
+    UPLOAD_BATCH_MAX_FILES: int = 500
+    UPLOAD_BATCH_MAX_INFLIGHT_BYTES: int = 256 * 1024 * 1024
+
+    # Batch deletes
+    DELETE_BATCH_MAX_DOCUMENTS: int = 1000
 
     class Config:
         env_file = ".env"
@@ -1,18 +1,55 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from src.api.upload_limits import UploadLimitMiddleware
 from src.api.v1.api import api_router
 from src.core.config import settings
+from src.services.document_catalog import (
+    DocumentCatalogReconciler,
+    close_document_catalog,
+    get_document_catalog,
+)
+from src.services.document_deletion import get_document_deletion_worker
+from src.services.object_storage import close_object_storage_service
 from src.utils.logger import setup_logging
 
 # Setup logging
 setup_logging()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    reconciler = None
+    if settings.DOCUMENT_CATALOG_RECONCILE_INTERVAL > 0:
+        reconciler = DocumentCatalogReconciler(
+            get_document_catalog(), settings.DOCUMENT_CATALOG_RECONCILE_INTERVAL
+        )
+        reconciler.start()
+    deletion_worker = get_document_deletion_worker()
+    deletion_worker.start()
+    yield
+    await deletion_worker.stop()
+    if reconciler is not None:
+        await reconciler.stop()
+    await close_document_catalog()
+    await close_object_storage_service()
+
 app = FastAPI(
     title=settings.APP_NAME,
     description="RAG application with LlamaIndex and FastAPI",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
+)
+
+# Size and format limits on upload bodies, enforced while they stream in (inside CORS so
+# rejections carry its headers)
+app.add_middleware(
+    UploadLimitMiddleware,
+    paths=("/api/v1/documents/upload",),
+    per_file_paths=("/api/v1/documents/upload-batch",),
 )
 
 # CORS middleware
@@ -31,6 +68,11 @@ app.include_router(api_router, prefix="/api/v1")
 async def root():
     return {"message": f"{settings.APP_NAME} is running"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics of this worker process"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Literal, Optional, List
 
 class ChatRequest(BaseModel):
     message: str = Field(..., description="User message")
@@ -8,6 +8,14 @@ class ChatRequest(BaseModel):
 class DocumentUploadRequest(BaseModel):
     filename: str = Field(..., description="Document filename")
     content_type: str = Field(..., description="Document content type")
+    size: Optional[int] = Field(None, gt=0, description="Expected document size in bytes")
+    method: Literal["PUT", "POST"] = Field("PUT", description="Presigned PUT URL or presigned POST policy")
+
+class DocumentUploadCompleteRequest(BaseModel):
+    key: str = Field(..., description="Storage key returned when the upload was presigned")
 
 class DocumentDeleteRequest(BaseModel):
-    document_id: str = Field(..., description="Document ID to delete")
\ No newline at end of file
+    document_id: str = Field(..., description="Document ID to delete")
+
+class DocumentBatchDeleteRequest(BaseModel):
+    document_ids: List[str] = Field(..., min_length=1, description="Document IDs to delete")
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 class ChatResponse(BaseModel):
@@ -12,6 +12,7 @@ class DocumentInfo(BaseModel):
     id: str = Field(..., description="Document identifier")
     filename: str = Field(..., description="Original filename")
     url: Optional[str] = Field(None, description="Public URL for the stored document")
+    download_url: Optional[str] = Field(None, description="Presigned URL to download the document")
     size: Optional[int] = Field(None, description="Document size in bytes")
     last_modified: Optional[datetime] = Field(None, description="Last modification timestamp in storage")
 
@@ -22,11 +23,83 @@ class DocumentUploadResponse(BaseModel):
     filename: str = Field(..., description="Original filename")
     url: Optional[str] = Field(None, description="Public URL for the uploaded document")
 
+class DocumentPresignedUploadResponse(BaseModel):
+    document_id: str = Field(..., description="Generated document ID")
+    key: str = Field(..., description="Storage key the client must upload to")
+    method: str = Field(..., description="HTTP method to use against the URL (PUT or POST)")
+    url: str = Field(..., description="Presigned upload URL")
+    headers: Dict[str, str] = Field(default_factory=dict, description="Headers to send with a PUT upload")
+    fields: Optional[Dict[str, str]] = Field(None, description="Form fields to send with a POST upload")
+    expires_in: int = Field(..., description="Seconds until the presigned URL expires")
+
+class DocumentBatchUploadResult(BaseModel):
+    filename: str = Field(..., description="Original filename")
+    document_id: Optional[str] = Field(None, description="Generated document ID when the upload succeeded")
+    url: Optional[str] = Field(None, description="Public URL for the uploaded document")
+    error: Optional[str] = Field(None, description="Reason the upload failed")
+
+class DocumentBatchUploadResponse(BaseModel):
+    results: List[DocumentBatchUploadResult] = Field(..., description="Per-file results, in request order")
+    uploaded: int = Field(..., description="Number of files uploaded successfully")
+    failed: int = Field(..., description="Number of files that failed")
+
 class HealthResponse(BaseModel):
     status: str = Field(..., description="Service status")
     timestamp: datetime = Field(..., description="Check timestamp")
     version: str = Field(..., description="API version")
 
+class StorageExecutorStatsResponse(BaseModel):
+    max_workers: int = Field(..., description="Size of the storage thread pool and botocore connection pool")
+    active_threads: int = Field(..., description="Threads currently running a storage call")
+    queued_calls: int = Field(..., description="Calls waiting for a free thread")
+    submitted_total: int = Field(..., description="Storage calls submitted since startup")
+    exhausted_total: int = Field(..., description="Calls submitted while every thread was busy")
+    queue_wait_seconds_total: float = Field(..., description="Accumulated time calls spent waiting for a thread")
+    queue_wait_seconds_max: float = Field(..., description="Longest time a call waited for a thread")
+
+class ListingCacheStatsResponse(BaseModel):
+    entries: int = Field(..., description="Listings currently cached")
+    hits: int = Field(..., description="list_objects calls served from the cache")
+    misses: int = Field(..., description="list_objects calls that went to the bucket")
+    invalidations: int = Field(..., description="Writes that invalidated cached listings")
+
+class PresignCacheStatsResponse(BaseModel):
+    entries: int = Field(..., description="Presigned URLs currently cached")
+    hits: int = Field(..., description="URLs served from the cache")
+    misses: int = Field(..., description="URLs that had to be signed")
+
+class StorageHealthResponse(BaseModel):
+    status: str = Field(..., description="Storage service status")
+    backend: str = Field(..., description="Storage backend in use (boto3, aiohttp, filesystem or memory)")
+    circuit: str = Field(..., description="Circuit breaker state: closed, open or half_open")
+    executor: Optional[StorageExecutorStatsResponse] = Field(None, description="Thread pool counters (blocking backends: boto3, filesystem)")
+    listing_cache: ListingCacheStatsResponse = Field(..., description="Prefix listing cache counters")
+    presign_cache: PresignCacheStatsResponse = Field(..., description="Presigned URL cache counters")
+
 class DocumentListResponse(BaseModel):
     documents: List[DocumentInfo] = Field(..., description="List of documents")
-    total: int = Field(..., description="Total number of documents")
\ No newline at end of file
+    total: int = Field(..., description="Total number of documents")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page; absent on the last page")
+
+class DocumentDeletionJobResponse(BaseModel):
+    job_id: str = Field(..., description="Deletion job ID")
+    document_id: str = Field(..., description="Document being deleted")
+    status: str = Field(..., description="pending, running, succeeded or failed")
+    attempts: int = Field(..., description="Attempts made so far")
+    deleted_objects: int = Field(..., description="Storage objects deleted so far")
+    failed_objects: int = Field(..., description="Storage objects that failed to delete in the last attempt")
+    error: Optional[str] = Field(None, description="Error of the last failed attempt")
+    created_at: datetime = Field(..., description="When the deletion was requested")
+    updated_at: datetime = Field(..., description="Last status change")
+
+class DocumentBatchDeleteResult(BaseModel):
+    document_id: str = Field(..., description="Document ID as sent in the request")
+    status: str = Field(..., description="deleted, pending (retried in the background), failed, not_found or invalid")
+    job_id: Optional[str] = Field(None, description="Deletion job ID, when one was created")
+    deleted_objects: int = Field(0, description="Storage objects deleted for this document")
+    error: Optional[str] = Field(None, description="Error message if the deletion did not complete")
+
+class DocumentBatchDeleteResponse(BaseModel):
+    results: List[DocumentBatchDeleteResult] = Field(..., description="Per-document results, in request order")
+    deleted: int = Field(..., description="Number of documents deleted")
+    failed: int = Field(..., description="Number of documents not deleted yet (pending, failed, not found or invalid)")
\ No newline at end of file
@@ -1,15 +1,34 @@
+from .document_blobs import DocumentBlobStore, get_document_blob_store
 from .object_storage import (
+	ObjectStorageDeleteResult,
 	ObjectStorageError,
+	ObjectStorageInvalidRangeError,
+	ObjectStorageNotFoundError,
 	ObjectStorageObject,
+	ObjectStorageReader,
 	ObjectStorageService,
+	ObjectStorageStream,
+	ObjectStorageUnavailableError,
+	ObjectStorageUnsupportedError,
 	ObjectStorageUploadResult,
+	close_object_storage_service,
 	get_object_storage_service,
 )
 
 __all__ = [
+	"DocumentBlobStore",
+	"ObjectStorageDeleteResult",
 	"ObjectStorageError",
+	"ObjectStorageInvalidRangeError",
+	"ObjectStorageNotFoundError",
 	"ObjectStorageObject",
+	"ObjectStorageReader",
 	"ObjectStorageService",
+	"ObjectStorageStream",
+	"ObjectStorageUnavailableError",
+	"ObjectStorageUnsupportedError",
 	"ObjectStorageUploadResult",
+	"close_object_storage_service",
+	"get_document_blob_store",
 	"get_object_storage_service",
 ]
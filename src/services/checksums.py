@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+from typing import Dict, Iterable, Optional
+
+try:
+	import google_crc32c
+except ImportError:  # crc32c support is optional
+	google_crc32c = None
+
+MD5 = "md5"
+SHA256 = "sha256"
+CRC32C = "crc32c"
+SUPPORTED_ALGORITHMS = (MD5, SHA256, CRC32C)
+
+# SHA-256 addresses deduplicated blobs, so it is computed whatever the settings say.
+REQUIRED_ALGORITHMS = frozenset({SHA256})
+
+
+def is_available(algorithm: str) -> bool:
+	if algorithm == CRC32C:
+		return google_crc32c is not None
+	return algorithm in SUPPORTED_ALGORITHMS
+
+
+def parse_algorithms(value: str) -> frozenset:
+	"""Parse a comma-separated list of checksum algorithms, e.g. from settings."""
+
+	return REQUIRED_ALGORITHMS | {item.strip().lower() for item in value.split(",") if item.strip()}
+
+
+def content_md5(data: bytes) -> str:
+	"""Value of a Content-MD5 header for data: its base64-encoded MD5."""
+
+	return base64.b64encode(hashlib.md5(data).digest()).decode("ascii")
+
+
+class StreamDigests:
+	"""Digests of a byte stream, all updated from the same chunks as they stream past.
+
+	hashlib and google_crc32c release the GIL for large buffers, so one `update`
+	call can run the whole set in a worker thread.
+	"""
+
+	def __init__(self, algorithms: Iterable[str]) -> None:
+		algorithms = set(algorithms)
+		self._md5 = hashlib.md5() if MD5 in algorithms else None
+		self._sha256 = hashlib.sha256() if SHA256 in algorithms else None
+		self._crc32c = google_crc32c.Checksum() if CRC32C in algorithms and google_crc32c is not None else None
+
+	def update(self, data: bytes) -> None:
+		for digest in (self._md5, self._sha256, self._crc32c):
+			if digest is not None:
+				digest.update(data)
+
+	@property
+	def md5(self) -> Optional[str]:
+		return self._md5.hexdigest() if self._md5 is not None else None
+
+	@property
+	def sha256(self) -> Optional[str]:
+		return self._sha256.hexdigest() if self._sha256 is not None else None
+
+	@property
+	def crc32c(self) -> Optional[str]:
+		return self._crc32c.digest().hex() if self._crc32c is not None else None
+
+	@property
+	def content_md5(self) -> Optional[str]:
+		"""Content-MD5 header of the whole stream, when MD5 is computed."""
+
+		return base64.b64encode(self._md5.digest()).decode("ascii") if self._md5 is not None else None
+
+	def metadata(self) -> Dict[str, str]:
+		"""Hex digests keyed by algorithm, as stored in object metadata."""
+
+		digests = {MD5: self.md5, SHA256: self.sha256, CRC32C: self.crc32c}
+		return {algorithm: value for algorithm, value in digests.items() if value is not None}
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+import zlib
+from typing import AsyncIterator, Iterable, Iterator, Optional, Protocol
+
+try:
+	import zstandard
+except ImportError:  # zstd support is optional
+	zstandard = None
+
+GZIP = "gzip"
+ZSTD = "zstd"
+SUPPORTED_ENCODINGS = (GZIP, ZSTD)
+
+# User metadata entry marking objects this service compressed; the read path
+# only decompresses objects carrying it.
+COMPRESSION_METADATA_KEY = "compression"
+# Size of the original bytes of a compressed object, when it was known at write time.
+UNCOMPRESSED_SIZE_METADATA_KEY = "uncompressed_size"
+
+DEFAULT_LEVELS = {GZIP: 6, ZSTD: 3}
+
+# zlib and zstandard release the GIL, so large chunks are (de)compressed in a worker thread.
+OFFLOAD_THRESHOLD = 1024 * 1024
+
+
+class _Compressor(Protocol):
+	def compress(self, data: bytes) -> bytes: ...
+
+	def flush(self) -> bytes: ...
+
+
+class _Decompressor(Protocol):
+	def decompress(self, data: bytes) -> bytes: ...
+
+
+def is_available(encoding: str) -> bool:
+	if encoding == GZIP:
+		return True
+	if encoding == ZSTD:
+		return zstandard is not None
+	return False
+
+
+def parse_content_types(value: str) -> frozenset:
+	"""Parse a comma-separated list of media types, e.g. from settings."""
+
+	return frozenset(item.strip().lower() for item in value.split(",") if item.strip())
+
+
+def matches_content_type(content_type: Optional[str], content_types: Iterable[str]) -> bool:
+	"""Whether a Content-Type value (parameters such as charset ignored) is in content_types."""
+
+	if not content_type:
+		return False
+	return content_type.split(";", 1)[0].strip().lower() in content_types
+
+
+def new_compressor(encoding: str, level: Optional[int] = None) -> _Compressor:
+	level = DEFAULT_LEVELS[encoding] if level is None else level
+	if encoding == GZIP:
+		# wbits=31 writes a gzip container with a zeroed mtime, so equal input gives equal output.
+		return zlib.compressobj(level, zlib.DEFLATED, 31)
+	if encoding == ZSTD and zstandard is not None:
+		return zstandard.ZstdCompressor(level=level).compressobj()
+	raise ValueError(f"Unsupported compression encoding: {encoding}")
+
+
+def new_decompressor(encoding: str) -> _Decompressor:
+	if encoding == GZIP:
+		return zlib.decompressobj(31)
+	if encoding == ZSTD and zstandard is not None:
+		return zstandard.ZstdDecompressor().decompressobj()
+	raise ValueError(f"Unsupported compression encoding: {encoding}")
+
+
+def decompress_bytes(data: bytes, encoding: str) -> bytes:
+	decompressor = new_decompressor(encoding)
+	return decompressor.decompress(data) + _flush(decompressor)
+
+
+def decompress_iter(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+	"""Synchronous counterpart of `decompress_chunks`, for bodies read in a worker thread."""
+
+	decompressor = new_decompressor(encoding)
+	for chunk in chunks:
+		output = decompressor.decompress(chunk)
+		if output:
+			yield output
+	tail = _flush(decompressor)
+	if tail:
+		yield tail
+
+
+async def decompress_chunks(chunks: AsyncIterator[bytes], encoding: str) -> AsyncIterator[bytes]:
+	"""Decompress a stream of chunks as they arrive."""
+
+	decompressor = new_decompressor(encoding)
+	async for chunk in chunks:
+		output = await _run(decompressor.decompress, chunk)
+		if output:
+			yield output
+	tail = _flush(decompressor)
+	if tail:
+		yield tail
+
+
+class StreamCompressor:
+	"""Compress a stream of upload parts, re-chunking the output to a fixed part size.
+
+	Output parts (except the last) are at least `part_size` bytes, so the result
+	can still be sent as a multipart upload. `bytes_in` and `bytes_out` hold the
+	uncompressed and compressed sizes once the stream is exhausted.
+	"""
+
+	def __init__(self, encoding: str, *, level: Optional[int] = None) -> None:
+		self.encoding = encoding
+		self.bytes_in = 0
+		self.bytes_out = 0
+		self._compressor = new_compressor(encoding, level)
+
+	async def compress_parts(self, parts: AsyncIterator[bytes], part_size: int) -> AsyncIterator[bytes]:
+		buffer = bytearray()
+		async for part in parts:
+			self.bytes_in += len(part)
+			buffer.extend(await _run(self._compressor.compress, part))
+			while len(buffer) >= part_size:
+				yield self._take(buffer, part_size)
+
+		buffer.extend(self._compressor.flush())
+		while buffer:
+			yield self._take(buffer, part_size)
+
+	def _take(self, buffer: bytearray, size: int) -> bytes:
+		chunk = bytes(buffer[:size])
+		del buffer[:size]
+		self.bytes_out += len(chunk)
+		return chunk
+
+
+async def _run(func, data: bytes) -> bytes:
+	if len(data) >= OFFLOAD_THRESHOLD:
+		return await asyncio.to_thread(func, data)
+	return func(data)
+
+
+def _flush(decompressor: _Decompressor) -> bytes:
+	# zlib decompressors return buffered output on flush(); zstandard ones have nothing to flush.
+	flush = getattr(decompressor, "flush", None)
+	return flush() if flush is not None else b""
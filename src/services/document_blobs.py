@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from dataclasses import replace
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Set
+
+from fastapi import UploadFile
+
+from src.core.config import settings
+from src.services import checksums
+from src.services.object_storage import (
+	ObjectStorageDeleteResult,
+	ObjectStorageError,
+	ObjectStorageObject,
+	ObjectStorageService,
+	ObjectStorageUploadResult,
+	get_object_storage_service,
+)
+
+logger = logging.getLogger(__name__)
+
+BLOB_PREFIX = "blobs/sha256"
+BLOB_REFS_PREFIX = "blobs/refs"
+BLOB_STAGING_PREFIX = "blobs/staging"
+LINK_SUFFIX = ".blobref"
+LINK_CONTENT_TYPE = "application/vnd.nexus.blobref+json"
+
+# Bound on concurrent manifest reads when resolving a listing.
+RESOLVE_CONCURRENCY = 16
+
+
+def is_link_key(key: str) -> bool:
+	return key.endswith(LINK_SUFFIX)
+
+
+class DocumentBlobStore:
+	"""Content-addressed storage of document bytes with per-document links.
+
+	Each distinct content is stored once as `blobs/sha256/<digest>`. A document
+	key `documents/<id>/<filename>` becomes a small JSON manifest at
+	`<key>.blobref` pointing to that blob, and `blobs/refs/<digest>/<id>` records
+	the reference so the blob is only deleted once no document links to it.
+
+	The bucket offers no locks, so a store and the release of the last other
+	reference can interleave. A store writes its reference before checking whether
+	the blob exists, so a release that lists references afterwards keeps the blob.
+	A release that listed before that write may still delete the blob, so the
+	store checks again once done and uploads the bytes again if the blob is gone.
+	This holds only if reference and deletion listings reflect the bucket, so they
+	always bypass the listing cache.
+	"""
+
+	def __init__(self, storage: ObjectStorageService) -> None:
+		self.storage = storage
+
+	async def store(
+		self,
+		file: UploadFile,
+		*,
+		document_id: str,
+		document_key: str,
+		metadata: Optional[Dict[str, str]] = None,
+	) -> ObjectStorageUploadResult:
+		"""Upload a document, linking it to an existing blob when the content is already stored."""
+
+		if not settings.STORAGE_DEDUPLICATION_ENABLED:
+			return await self.storage.upload_file(file, destination_path=document_key, metadata=metadata)
+
+		ref_keys: List[str] = []
+
+		async def add_ref(sha256: str) -> None:
+			# Written before the dedupe decision, so a concurrent release sees this document.
+			ref_keys.append(self._ref_key(sha256, document_id))
+			await self.storage.put_object(ref_keys[-1], b"")
+
+		staging_key = f"{BLOB_STAGING_PREFIX}/{document_id}"
+		try:
+			result = await self.storage.upload_content_addressed(
+				file, prefix=BLOB_PREFIX, staging_key=staging_key, metadata=metadata, on_digest=add_ref
+			)
+			if result.deduplicated and await self.storage.head_object(result.key) is None:
+				logger.warning("El blob '%s' se eliminó mientras se enlazaba; se sube de nuevo", result.sha256)
+				await file.seek(0)
+				result = await self.storage.upload_content_addressed(
+					file, prefix=BLOB_PREFIX, staging_key=staging_key, metadata=metadata
+				)
+		except BaseException:
+			if ref_keys:
+				await self.storage.delete_objects(ref_keys)
+			raise
+
+		manifest = {
+			"document_id": document_id,
+			"sha256": result.sha256,
+			"md5": result.md5,
+			"crc32c": result.crc32c,
+			"blob_key": result.key,
+			"size": result.size,
+			"etag": result.etag,
+			"content_type": file.content_type or "application/octet-stream",
+			"original_filename": file.filename,
+		}
+		# The reference was written before the manifest, so a link never exists without it.
+		await self.storage.put_object(
+			document_key + LINK_SUFFIX,
+			json.dumps(manifest).encode("utf-8"),
+			content_type=LINK_CONTENT_TYPE,
+			metadata={"document_id": document_id, "blob_sha256": result.sha256},
+		)
+
+		return replace(result, key=document_key, content_key=result.key)
+
+	async def resolve(self, objects: List[ObjectStorageObject]) -> List[ObjectStorageObject]:
+		"""Replace link manifests in a listing by the document they represent."""
+
+		slots = asyncio.Semaphore(RESOLVE_CONCURRENCY)
+
+		async def resolve_one(obj: ObjectStorageObject) -> Optional[ObjectStorageObject]:
+			if not is_link_key(obj.key):
+				return obj
+			async with slots:
+				manifest = await self._read_manifest(obj.key)
+			if manifest is None:
+				return None
+			return ObjectStorageObject(
+				key=obj.key[: -len(LINK_SUFFIX)],
+				size=manifest.get("size", 0),
+				last_modified=obj.last_modified,
+				url=self.storage.build_public_url(manifest["blob_key"]),
+				etag=manifest.get("etag"),
+				content_type=manifest.get("content_type"),
+				metadata={
+					"blob_key": manifest["blob_key"],
+					# Manifests written before md5/crc32c were recorded only carry sha256.
+					**{key: manifest[key] for key in checksums.SUPPORTED_ALGORITHMS if manifest.get(key)},
+				},
+			)
+
+		resolved = await asyncio.gather(*(resolve_one(obj) for obj in objects))
+		return [obj for obj in resolved if obj is not None]
+
+	async def locate(self, prefix: str) -> Optional[ObjectStorageObject]:
+		"""Return the document stored under prefix, resolved to its blob when it is a link."""
+
+		objects = await self.storage.list_objects(prefix=prefix, max_keys=1000, use_cache=False)
+		objects = await self.resolve(objects)
+		return objects[0] if objects else None
+
+	@staticmethod
+	def content_key(obj: ObjectStorageObject) -> str:
+		"""Key holding the bytes of a (possibly resolved) document object."""
+
+		return obj.metadata.get("blob_key", obj.key)
+
+	async def delete_prefixes(self, prefixes: Sequence[str]) -> Dict[str, ObjectStorageDeleteResult]:
+		"""Delete several documents at once, returning the outcome per prefix.
+
+		The prefixes are listed concurrently and all their keys, together with the
+		blob references their links hold, are pooled into full 1000-key
+		DeleteObjects requests, sent concurrently, instead of one small request
+		per document. Blobs left without references are then deleted together.
+		"""
+
+		slots = asyncio.Semaphore(settings.R2_LIST_CONCURRENCY)
+
+		async def list_one(prefix: str) -> List[ObjectStorageObject]:
+			async with slots:
+				return await self.storage.list_objects(prefix=prefix, max_keys=1000, use_cache=False)
+
+		listings = await asyncio.gather(*(list_one(prefix) for prefix in prefixes))
+
+		owners: Dict[str, str] = {}
+		for prefix, objects in zip(prefixes, listings):
+			for obj in objects:
+				owners.setdefault(obj.key, prefix)
+
+		async def read_one(link_key: str) -> Optional[Dict[str, object]]:
+			async with slots:
+				return await self._read_manifest(link_key)
+
+		manifests = await asyncio.gather(*(read_one(key) for key in owners if is_link_key(key)))
+		refs = {
+			self._ref_key(manifest["sha256"], manifest["document_id"]): manifest["sha256"]
+			for manifest in manifests
+			if manifest is not None
+		}
+
+		deleted = await self.storage.delete_objects([*owners, *refs])
+		await self._delete_unreferenced(
+			{sha256 for ref_key, sha256 in refs.items() if ref_key not in deleted.errors}, slots
+		)
+		results = {prefix: ObjectStorageDeleteResult() for prefix in prefixes}
+		for key, prefix in owners.items():
+			if key in deleted.errors:
+				results[prefix].errors[key] = deleted.errors[key]
+			else:
+				results[prefix].deleted += 1
+
+		# A full first page means the prefix may hold more objects than were listed.
+		for prefix, objects in zip(prefixes, listings):
+			if len(objects) >= 1000:
+				results[prefix].add(await self.storage.delete_prefix(prefix))
+		return results
+
+	async def _delete_unreferenced(self, digests: Set[str], slots: asyncio.Semaphore) -> None:
+		# A store that links one of these blobs meanwhile re-uploads it if needed (see the class docstring).
+		async def unreferenced(sha256: str) -> bool:
+			async with slots:
+				return not await self.storage.list_objects(
+					prefix=f"{BLOB_REFS_PREFIX}/{sha256}", max_keys=1, use_cache=False
+				)
+
+		digests = sorted(digests)
+		orphans = [
+			sha256
+			for sha256, orphan in zip(digests, await asyncio.gather(*(unreferenced(d) for d in digests)))
+			if orphan
+		]
+		if not orphans:
+			return
+
+		result = await self.storage.delete_objects(f"{BLOB_PREFIX}/{sha256}" for sha256 in orphans)
+		if result.failed:
+			logger.warning("No se pudieron eliminar %d blobs sin referencias", result.failed)
+		logger.info("%d blobs eliminados: ya no los referencia ningún documento", result.deleted)
+
+	async def _read_manifest(self, link_key: str) -> Optional[Dict[str, object]]:
+		try:
+			return json.loads(await self.storage.read_object(link_key))
+		except (ObjectStorageError, ValueError):
+			logger.warning("No se pudo leer el manifiesto '%s'", link_key)
+			return None
+
+	@staticmethod
+	def _ref_key(sha256: str, document_id: str) -> str:
+		return f"{BLOB_REFS_PREFIX}/{sha256}/{document_id}"
+
+
+@lru_cache(maxsize=1)
+def get_document_blob_store() -> DocumentBlobStore:
+	"""Return a singleton instance of the document blob store."""
+
+	return DocumentBlobStore(get_object_storage_service())
@@ -0,0 +1,730 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import logging
+import os
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+import aiosqlite
+
+from src.core.config import settings
+from src.services.document_blobs import DocumentBlobStore, get_document_blob_store
+from src.services.compression import COMPRESSION_METADATA_KEY, UNCOMPRESSED_SIZE_METADATA_KEY
+from src.services.object_storage import ObjectStorageObject, ObjectStorageService
+
+logger = logging.getLogger(__name__)
+
+# Schema migrations, applied in order; PRAGMA user_version records how many ran.
+MIGRATIONS = (
+	(
+		"""CREATE TABLE IF NOT EXISTS documents (
+			document_id TEXT PRIMARY KEY,
+			key TEXT NOT NULL,
+			filename TEXT NOT NULL,
+			size INTEGER,
+			content_type TEXT,
+			etag TEXT,
+			url TEXT,
+			last_modified TEXT NOT NULL
+		)""",
+		"""CREATE INDEX IF NOT EXISTS documents_last_modified
+			ON documents (last_modified DESC, document_id DESC)""",
+		# Row count kept by triggers, so the listing total does not scan the table.
+		"""CREATE TABLE IF NOT EXISTS document_stats (
+			id INTEGER PRIMARY KEY CHECK (id = 1),
+			total INTEGER NOT NULL
+		)""",
+		"INSERT OR IGNORE INTO document_stats (id, total) SELECT 1, COUNT(*) FROM documents",
+		"""CREATE TRIGGER IF NOT EXISTS documents_count_insert AFTER INSERT ON documents
+		BEGIN
+			UPDATE document_stats SET total = total + 1 WHERE id = 1;
+		END""",
+		"""CREATE TRIGGER IF NOT EXISTS documents_count_delete AFTER DELETE ON documents
+		BEGIN
+			UPDATE document_stats SET total = total - 1 WHERE id = 1;
+		END""",
+	),
+	(
+		# Tombstones: a deleted document is hidden at once and purged by a deletion job.
+		"ALTER TABLE documents ADD COLUMN deleted_at TEXT",
+		"DROP INDEX IF EXISTS documents_last_modified",
+		"""CREATE INDEX documents_live_last_modified
+			ON documents (last_modified DESC, document_id DESC) WHERE deleted_at IS NULL""",
+		"DROP TRIGGER IF EXISTS documents_count_insert",
+		"DROP TRIGGER IF EXISTS documents_count_delete",
+		"""CREATE TRIGGER documents_count_insert AFTER INSERT ON documents WHEN NEW.deleted_at IS NULL
+		BEGIN
+			UPDATE document_stats SET total = total + 1 WHERE id = 1;
+		END""",
+		"""CREATE TRIGGER documents_count_delete AFTER DELETE ON documents WHEN OLD.deleted_at IS NULL
+		BEGIN
+			UPDATE document_stats SET total = total - 1 WHERE id = 1;
+		END""",
+		"""CREATE TRIGGER documents_count_tombstone AFTER UPDATE OF deleted_at ON documents
+		WHEN OLD.deleted_at IS NULL AND NEW.deleted_at IS NOT NULL
+		BEGIN
+			UPDATE document_stats SET total = total - 1 WHERE id = 1;
+		END""",
+		"UPDATE document_stats SET total = (SELECT COUNT(*) FROM documents WHERE deleted_at IS NULL)",
+		"""CREATE TABLE deletion_jobs (
+			job_id TEXT PRIMARY KEY,
+			document_id TEXT NOT NULL,
+			status TEXT NOT NULL,
+			attempts INTEGER NOT NULL DEFAULT 0,
+			deleted_objects INTEGER NOT NULL DEFAULT 0,
+			failed_objects INTEGER NOT NULL DEFAULT 0,
+			error TEXT,
+			created_at TEXT NOT NULL,
+			updated_at TEXT NOT NULL,
+			next_attempt_at TEXT NOT NULL
+		)""",
+		"CREATE INDEX deletion_jobs_due ON deletion_jobs (status, next_attempt_at)",
+		"CREATE INDEX deletion_jobs_document ON deletion_jobs (document_id, status)",
+	),
+	(
+		# Key of the stored bytes, so listings can presign downloads of deduplicated documents.
+		"ALTER TABLE documents ADD COLUMN content_key TEXT",
+	),
+	(
+		# Digests computed while uploading, so later stages never read the bytes again to get them.
+		"ALTER TABLE documents ADD COLUMN sha256 TEXT",
+		"ALTER TABLE documents ADD COLUMN md5 TEXT",
+		"ALTER TABLE documents ADD COLUMN crc32c TEXT",
+	),
+)
+
+DOCUMENTS_PREFIX = "documents"
+
+COLUMNS = (
+	"document_id",
+	"key",
+	"filename",
+	"size",
+	"content_type",
+	"etag",
+	"url",
+	"last_modified",
+	"content_key",
+	"sha256",
+	"md5",
+	"crc32c",
+)
+# A listing of the bucket does not carry the digests, so the reconciler keeps the recorded ones.
+DIGEST_COLUMNS = ("sha256", "md5", "crc32c")
+# A listing has no content type and reports the stored (possibly compressed) size, so when
+# reconciling, the values recorded at upload time win over the listed ones.
+RECORDED_COLUMNS = ("size", "content_type")
+# deleted_at is only set through tombstone(), never by upserts.
+READ_COLUMNS = (*COLUMNS, "deleted_at")
+JOB_COLUMNS = (
+	"job_id",
+	"document_id",
+	"status",
+	"attempts",
+	"deleted_objects",
+	"failed_objects",
+	"error",
+	"created_at",
+	"updated_at",
+	"next_attempt_at",
+)
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class InvalidCursorError(ValueError):
+	"""Raised when a listing cursor was not issued by `DocumentCatalog.list_documents`."""
+
+
+@dataclass(slots=True)
+class CatalogDocument:
+	"""A document as recorded in the catalog."""
+
+	document_id: str
+	key: str
+	filename: str
+	size: Optional[int]
+	last_modified: datetime
+	content_type: Optional[str] = None
+	etag: Optional[str] = None
+	url: Optional[str] = None
+	content_key: Optional[str] = None
+	sha256: Optional[str] = None
+	md5: Optional[str] = None
+	crc32c: Optional[str] = None
+	deleted_at: Optional[datetime] = None
+
+
+@dataclass(slots=True)
+class DeletionJob:
+	"""Progress of the background purge of a tombstoned document."""
+
+	job_id: str
+	document_id: str
+	status: str
+	attempts: int
+	deleted_objects: int
+	failed_objects: int
+	error: Optional[str]
+	created_at: datetime
+	updated_at: datetime
+	next_attempt_at: datetime
+
+
+@dataclass(slots=True)
+class CatalogPage:
+	"""One page of the catalog and the cursor of the next one, if any."""
+
+	documents: List[CatalogDocument]
+	next_cursor: Optional[str]
+
+
+class DocumentCatalog:
+	"""SQLite index of the stored documents, so listing never scans the bucket.
+
+	Uploads and deletions write through to the catalog; `DocumentCatalogReconciler`
+	repairs any drift against the bucket, which stays the source of truth.
+	Timestamps are stored as UTC ISO-8601 strings so they sort lexicographically.
+	"""
+
+	def __init__(self, path: str) -> None:
+		self.path = path
+		self._connection: Optional[aiosqlite.Connection] = None
+		self._loop: Optional[asyncio.AbstractEventLoop] = None
+		self._lock: Optional[asyncio.Lock] = None
+
+	async def upsert(self, document: CatalogDocument) -> None:
+		connection = await self._connect()
+		await connection.execute(self._upsert_sql(), self._row(document))
+		await connection.commit()
+
+	async def delete_many(self, document_ids: Sequence[str]) -> None:
+		connection = await self._connect()
+		await connection.executemany(
+			"DELETE FROM documents WHERE document_id = ?", [(document_id,) for document_id in document_ids]
+		)
+		await connection.commit()
+
+	async def get(self, document_id: str) -> Optional[CatalogDocument]:
+		connection = await self._connect()
+		async with connection.execute(
+			f"SELECT {', '.join(READ_COLUMNS)} FROM documents WHERE document_id = ?", (document_id,)
+		) as cursor:
+			row = await cursor.fetchone()
+		return self._document(row) if row is not None else None
+
+	async def get_many(self, document_ids: Sequence[str]) -> Dict[str, CatalogDocument]:
+		connection = await self._connect()
+		documents: Dict[str, CatalogDocument] = {}
+		for chunk in self._chunks(list(dict.fromkeys(document_ids))):
+			async with connection.execute(
+				f"SELECT {', '.join(READ_COLUMNS)} FROM documents "
+				f"WHERE document_id IN ({', '.join('?' for _ in chunk)})",
+				chunk,
+			) as cursor:
+				for row in await cursor.fetchall():
+					document = self._document(row)
+					documents[document.document_id] = document
+		return documents
+
+	async def list_documents(self, *, limit: int, cursor: Optional[str] = None) -> CatalogPage:
+		"""Return a page of documents, newest first, walking the last_modified index.
+
+		Pagination is keyset-based: the cursor holds the (last_modified, document_id)
+		of the last row served, so a page costs O(limit) and documents uploaded
+		meanwhile never shift later pages. Raises ValueError for a malformed cursor.
+		"""
+
+		query = f"SELECT {', '.join(READ_COLUMNS)} FROM documents WHERE deleted_at IS NULL"
+		params: List[object] = []
+		if cursor:
+			query += " AND (last_modified, document_id) < (?, ?)"
+			params.extend(self._decode_cursor(cursor))
+		query += " ORDER BY last_modified DESC, document_id DESC LIMIT ?"
+		# One extra row tells whether another page follows.
+		params.append(limit + 1)
+
+		connection = await self._connect()
+		async with connection.execute(query, params) as db_cursor:
+			rows = await db_cursor.fetchall()
+
+		documents = [self._document(row) for row in rows[:limit]]
+		next_cursor = None
+		if len(rows) > limit:
+			last = documents[-1]
+			next_cursor = self._encode_cursor(self._timestamp(last.last_modified), last.document_id)
+		return CatalogPage(documents=documents, next_cursor=next_cursor)
+
+	async def count(self) -> int:
+		connection = await self._connect()
+		async with connection.execute("SELECT total FROM document_stats WHERE id = 1") as cursor:
+			(total,) = await cursor.fetchone()
+		return total
+
+	async def tombstone(self, document_id: str) -> DeletionJob:
+		"""Hide a document from listings and queue the job that purges it.
+
+		Returns the document's pending or running job when there already is one.
+		"""
+
+		return (await self.tombstone_many([document_id]))[document_id]
+
+	async def tombstone_many(self, document_ids: Sequence[str]) -> Dict[str, DeletionJob]:
+		"""Tombstone several documents in one transaction; returns each document's job."""
+
+		connection = await self._connect()
+		jobs: Dict[str, DeletionJob] = {}
+		for chunk in self._chunks(list(dict.fromkeys(document_ids))):
+			async with connection.execute(
+				f"SELECT {', '.join(JOB_COLUMNS)} FROM deletion_jobs "
+				f"WHERE document_id IN ({', '.join('?' for _ in chunk)}) AND status IN (?, ?) "
+				"ORDER BY created_at",
+				(*chunk, JOB_PENDING, JOB_RUNNING),
+			) as cursor:
+				for row in await cursor.fetchall():
+					job = self._job(row)
+					jobs.setdefault(job.document_id, job)
+
+		now = datetime.now(timezone.utc)
+		created = [
+			DeletionJob(
+				job_id=str(uuid.uuid4()),
+				document_id=document_id,
+				status=JOB_PENDING,
+				attempts=0,
+				deleted_objects=0,
+				failed_objects=0,
+				error=None,
+				created_at=now,
+				updated_at=now,
+				next_attempt_at=now,
+			)
+			for document_id in dict.fromkeys(document_ids)
+			if document_id not in jobs
+		]
+		if created:
+			await connection.executemany(
+				"UPDATE documents SET deleted_at = ? WHERE document_id = ? AND deleted_at IS NULL",
+				[(self._timestamp(now), job.document_id) for job in created],
+			)
+			await connection.executemany(
+				f"INSERT INTO deletion_jobs ({', '.join(JOB_COLUMNS)}) VALUES ({', '.join('?' for _ in JOB_COLUMNS)})",
+				[self._job_row(job) for job in created],
+			)
+			await connection.commit()
+		jobs.update((job.document_id, job) for job in created)
+		return jobs
+
+	async def get_deletion_job(self, job_id: str) -> Optional[DeletionJob]:
+		connection = await self._connect()
+		async with connection.execute(
+			f"SELECT {', '.join(JOB_COLUMNS)} FROM deletion_jobs WHERE job_id = ?", (job_id,)
+		) as cursor:
+			row = await cursor.fetchone()
+		return self._job(row) if row is not None else None
+
+	async def claim_deletion_jobs(
+		self,
+		*,
+		lease: float,
+		limit: int = 1,
+		job_ids: Optional[Sequence[str]] = None,
+	) -> List[DeletionJob]:
+		"""Atomically take up to `limit` due jobs, or running ones whose worker stopped renewing them.
+
+		The single UPDATE ... RETURNING makes the claim safe across processes.
+		With `job_ids`, only those jobs are considered.
+		"""
+
+		now = datetime.now(timezone.utc)
+		params: List[object] = [
+			JOB_RUNNING,
+			self._timestamp(now),
+			JOB_PENDING,
+			self._timestamp(now),
+			JOB_RUNNING,
+			self._timestamp(now - timedelta(seconds=lease)),
+		]
+		only = ""
+		if job_ids is not None:
+			only = f" AND job_id IN ({', '.join('?' for _ in job_ids)})"
+			params.extend(job_ids)
+		params.append(limit)
+
+		connection = await self._connect()
+		async with connection.execute(
+			f"""UPDATE deletion_jobs SET status = ?, attempts = attempts + 1, updated_at = ?
+			WHERE job_id IN (
+				SELECT job_id FROM deletion_jobs
+				WHERE ((status = ? AND next_attempt_at <= ?) OR (status = ? AND updated_at < ?)){only}
+				ORDER BY next_attempt_at LIMIT ?
+			)
+			RETURNING {', '.join(JOB_COLUMNS)}""",
+			params,
+		) as cursor:
+			rows = await cursor.fetchall()
+		await connection.commit()
+		return [self._job(row) for row in rows]
+
+	async def save_deletion_jobs(self, jobs: Sequence[DeletionJob]) -> None:
+		now = datetime.now(timezone.utc)
+		for job in jobs:
+			job.updated_at = now
+		connection = await self._connect()
+		await connection.executemany(
+			"""UPDATE deletion_jobs SET status = ?, attempts = ?, deleted_objects = ?, failed_objects = ?,
+			error = ?, updated_at = ?, next_attempt_at = ? WHERE job_id = ?""",
+			[
+				(
+					job.status,
+					job.attempts,
+					job.deleted_objects,
+					job.failed_objects,
+					job.error,
+					self._timestamp(job.updated_at),
+					self._timestamp(job.next_attempt_at),
+					job.job_id,
+				)
+				for job in jobs
+			],
+		)
+		await connection.commit()
+
+	async def synchronize(self, documents: List[CatalogDocument], *, listed_since: datetime) -> Dict[str, int]:
+		"""Make the catalog match a full listing of the bucket.
+
+		Rows missing from the listing are deleted only when they were written before
+		`listed_since`, so documents uploaded while the bucket was being listed survive.
+		Returns how many rows were upserted and deleted.
+		"""
+
+		connection = await self._connect()
+		listed = {document.document_id for document in documents}
+		async with connection.execute(
+			"SELECT document_id FROM documents WHERE last_modified < ?",
+			(self._timestamp(listed_since),),
+		) as cursor:
+			stale = [document_id for (document_id,) in await cursor.fetchall() if document_id not in listed]
+
+		await connection.executemany(
+			self._upsert_sql(keep_recorded=RECORDED_COLUMNS), [self._row(document) for document in documents]
+		)
+		await connection.executemany("DELETE FROM documents WHERE document_id = ?", [(doc_id,) for doc_id in stale])
+		await connection.commit()
+		return {"upserted": len(documents), "deleted": len(stale)}
+
+	async def close(self) -> None:
+		if self._connection is not None:
+			await self._connection.close()
+		self._connection = None
+
+	async def _connect(self) -> aiosqlite.Connection:
+		loop = asyncio.get_running_loop()
+		if self._connection is not None and self._loop is loop:
+			return self._connection
+
+		if self._lock is None or self._loop is not loop:
+			# The connection thread reports back to the loop that opened it.
+			self._loop = loop
+			self._lock = asyncio.Lock()
+			self._connection = None
+
+		async with self._lock:
+			if self._connection is None:
+				directory = os.path.dirname(self.path)
+				if directory:
+					os.makedirs(directory, exist_ok=True)
+				connection = await aiosqlite.connect(self.path)
+				# WAL lets several workers read while one of them writes.
+				await connection.execute("PRAGMA journal_mode=WAL")
+				await connection.execute("PRAGMA busy_timeout=5000")
+				await self._migrate(connection)
+				self._connection = connection
+		return self._connection
+
+	@staticmethod
+	async def _migrate(connection: aiosqlite.Connection) -> None:
+		# BEGIN IMMEDIATE takes the write lock first, so concurrent workers migrate one at a time.
+		await connection.execute("BEGIN IMMEDIATE")
+		try:
+			async with connection.execute("PRAGMA user_version") as cursor:
+				(version,) = await cursor.fetchone()
+			for statements in MIGRATIONS[version:]:
+				for statement in statements:
+					await connection.execute(statement)
+			await connection.execute(f"PRAGMA user_version = {len(MIGRATIONS)}")
+			await connection.commit()
+		except BaseException:
+			await connection.rollback()
+			raise
+
+	@staticmethod
+	def _upsert_sql(keep_recorded: Sequence[str] = ()) -> str:
+		def update(column: str) -> str:
+			if column in keep_recorded:
+				return f"{column} = COALESCE(documents.{column}, excluded.{column})"
+			if column in DIGEST_COLUMNS:
+				return f"{column} = COALESCE(excluded.{column}, documents.{column})"
+			return f"{column} = excluded.{column}"
+
+		placeholders = ", ".join("?" for _ in COLUMNS)
+		updates = ", ".join(update(column) for column in COLUMNS[1:])
+		return (
+			f"INSERT INTO documents ({', '.join(COLUMNS)}) VALUES ({placeholders}) "
+			f"ON CONFLICT(document_id) DO UPDATE SET {updates}"
+		)
+
+	@classmethod
+	def _row(cls, document: CatalogDocument) -> tuple:
+		return (
+			document.document_id,
+			document.key,
+			document.filename,
+			document.size,
+			document.content_type,
+			document.etag,
+			document.url,
+			cls._timestamp(document.last_modified),
+			document.content_key,
+			document.sha256,
+			document.md5,
+			document.crc32c,
+		)
+
+	@staticmethod
+	def _document(row: tuple) -> CatalogDocument:
+		(
+			document_id,
+			key,
+			filename,
+			size,
+			content_type,
+			etag,
+			url,
+			last_modified,
+			content_key,
+			sha256,
+			md5,
+			crc32c,
+			deleted_at,
+		) = row
+		return CatalogDocument(
+			document_id=document_id,
+			key=key,
+			filename=filename,
+			size=size,
+			last_modified=datetime.fromisoformat(last_modified),
+			content_type=content_type,
+			etag=etag,
+			url=url,
+			content_key=content_key,
+			sha256=sha256,
+			md5=md5,
+			crc32c=crc32c,
+			deleted_at=datetime.fromisoformat(deleted_at) if deleted_at else None,
+		)
+
+	@classmethod
+	def _job_row(cls, job: DeletionJob) -> tuple:
+		return (
+			job.job_id,
+			job.document_id,
+			job.status,
+			job.attempts,
+			job.deleted_objects,
+			job.failed_objects,
+			job.error,
+			cls._timestamp(job.created_at),
+			cls._timestamp(job.updated_at),
+			cls._timestamp(job.next_attempt_at),
+		)
+
+	@staticmethod
+	def _job(row: tuple) -> DeletionJob:
+		(
+			job_id,
+			document_id,
+			status,
+			attempts,
+			deleted_objects,
+			failed_objects,
+			error,
+			created_at,
+			updated_at,
+			next_attempt_at,
+		) = row
+		return DeletionJob(
+			job_id=job_id,
+			document_id=document_id,
+			status=status,
+			attempts=attempts,
+			deleted_objects=deleted_objects,
+			failed_objects=failed_objects,
+			error=error,
+			created_at=datetime.fromisoformat(created_at),
+			updated_at=datetime.fromisoformat(updated_at),
+			next_attempt_at=datetime.fromisoformat(next_attempt_at),
+		)
+
+	@staticmethod
+	def _chunks(values: List[str], size: int = 500) -> List[List[str]]:
+		# Stay well below SQLite's limit on bound parameters per statement.
+		return [values[start : start + size] for start in range(0, len(values), size)]
+
+	@staticmethod
+	def _encode_cursor(last_modified: str, document_id: str) -> str:
+		raw = json.dumps([last_modified, document_id], separators=(",", ":")).encode("utf-8")
+		return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+	@staticmethod
+	def _decode_cursor(cursor: str) -> List[str]:
+		try:
+			raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+			last_modified, document_id = json.loads(raw)
+		except (ValueError, TypeError) as exc:
+			raise InvalidCursorError("Invalid cursor") from exc
+		if not isinstance(last_modified, str) or not isinstance(document_id, str):
+			raise InvalidCursorError("Invalid cursor")
+		return [last_modified, document_id]
+
+	@staticmethod
+	def _timestamp(value: datetime) -> str:
+		if value.tzinfo is None:
+			value = value.replace(tzinfo=timezone.utc)
+		# Fixed-width microseconds keep the strings in chronological order.
+		return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f+00:00")
+
+
+class DocumentCatalogReconciler:
+	"""Background task that periodically rebuilds the catalog from a bucket listing.
+
+	It repairs drift left by failed catalog writes, objects changed outside the API
+	and documents registered by other processes. A document deleted while the
+	bucket is being listed may reappear until the next pass.
+	"""
+
+	def __init__(self, catalog: DocumentCatalog, interval: float) -> None:
+		self.catalog = catalog
+		self.interval = interval
+		self._task: Optional[asyncio.Task] = None
+
+	def start(self) -> None:
+		if self._task is None or self._task.done():
+			self._task = asyncio.create_task(self._run(), name="document-catalog-reconciler")
+
+	async def stop(self) -> None:
+		if self._task is None:
+			return
+		self._task.cancel()
+		try:
+			await self._task
+		except asyncio.CancelledError:
+			pass
+		self._task = None
+
+	async def reconcile(self) -> Dict[str, int]:
+		listed_since = datetime.now(timezone.utc)
+		blob_store = get_document_blob_store()
+		objects = [obj async for obj in blob_store.storage.iter_objects(prefix=DOCUMENTS_PREFIX)]
+
+		documents: Dict[str, CatalogDocument] = {}
+		for obj in await blob_store.resolve(objects):
+			document = document_from_object(obj)
+			if document is not None:
+				documents.setdefault(document.document_id, document)
+		await self._describe_unrecorded(blob_store.storage, documents)
+
+		stats = await self.catalog.synchronize(list(documents.values()), listed_since=listed_since)
+		logger.info(
+			"Catálogo de documentos reconciliado: %d documentos en el bucket, %d entradas eliminadas",
+			stats["upserted"],
+			stats["deleted"],
+		)
+		return stats
+
+	async def _describe_unrecorded(self, storage: ObjectStorageService, documents: Dict[str, CatalogDocument]) -> None:
+		"""Fill in, from a HEAD, what the listing lacks for documents the catalog has never recorded.
+
+		Recorded documents keep their upload-time size and content type (see RECORDED_COLUMNS);
+		deduplicated documents already got both from their manifest.
+		"""
+
+		recorded = await self.catalog.get_many(list(documents))
+		pending = [
+			document
+			for document_id, document in documents.items()
+			if document_id not in recorded and document.content_type is None
+		]
+		slots = asyncio.Semaphore(settings.R2_LIST_CONCURRENCY)
+
+		async def describe(document: CatalogDocument) -> None:
+			async with slots:
+				head = await storage.head_object(document.key)
+			if head is None:
+				return
+			document.content_type = head.content_type
+			for algorithm in DIGEST_COLUMNS:
+				setattr(document, algorithm, head.metadata.get(algorithm))
+			if COMPRESSION_METADATA_KEY in head.metadata:
+				# The listed size is the compressed one; without the original, leave it unknown.
+				original = head.metadata.get(UNCOMPRESSED_SIZE_METADATA_KEY)
+				document.size = int(original) if original and original.isdigit() else None
+
+		await asyncio.gather(*(describe(document) for document in pending))
+
+	async def _run(self) -> None:
+		while True:
+			try:
+				await self.reconcile()
+			except asyncio.CancelledError:
+				raise
+			except Exception:
+				logger.exception("No se pudo reconciliar el catálogo de documentos con el bucket")
+			await asyncio.sleep(self.interval)
+
+
+def document_from_object(obj: ObjectStorageObject) -> Optional[CatalogDocument]:
+	"""Build a catalog entry from an object following the documents/<id>/<filename> layout."""
+
+	parts = obj.key.split("/")
+	if len(parts) < 3 or parts[0] != DOCUMENTS_PREFIX:
+		return None
+
+	_, document_id, *filename_parts = parts
+	return CatalogDocument(
+		document_id=document_id,
+		key=obj.key,
+		filename="/".join(filename_parts),
+		size=obj.size,
+		last_modified=obj.last_modified or datetime.now(timezone.utc),
+		content_type=obj.content_type,
+		etag=obj.etag,
+		url=obj.url,
+		content_key=DocumentBlobStore.content_key(obj),
+		sha256=obj.metadata.get("sha256"),
+		md5=obj.metadata.get("md5"),
+		crc32c=obj.metadata.get("crc32c"),
+	)
+
+
+@lru_cache(maxsize=1)
+def get_document_catalog() -> DocumentCatalog:
+	"""Return a singleton instance of the document catalog."""
+
+	return DocumentCatalog(settings.DOCUMENT_CATALOG_PATH)
+
+
+async def close_document_catalog() -> None:
+	"""Close the singleton catalog connection if it was ever opened."""
+
+	if get_document_catalog.cache_info().currsize:
+		await get_document_catalog().close()
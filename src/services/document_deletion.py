@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import List, Optional, Sequence
+
+from src.core.config import settings
+from src.services.document_blobs import get_document_blob_store
+from src.services.document_catalog import (
+	DOCUMENTS_PREFIX,
+	JOB_FAILED,
+	JOB_PENDING,
+	JOB_SUCCEEDED,
+	DeletionJob,
+	DocumentCatalog,
+	get_document_catalog,
+)
+
+logger = logging.getLogger(__name__)
+
+# Backoff between attempts of a failing job: 2s, 4s, 8s... capped at five minutes.
+RETRY_BASE_DELAY = 2.0
+RETRY_MAX_DELAY = 300.0
+
+# Jobs claimed at once, so their objects are deleted in shared 1000-key requests.
+CLAIM_BATCH_SIZE = 100
+
+
+class DocumentDeletionWorker:
+	"""Background task that purges tombstoned documents queued by `DocumentCatalog.tombstone`.
+
+	Each job deletes the document's objects (releasing deduplicated blobs) and
+	its catalog row; the object and listing caches are invalidated
+	by the storage deletes themselves. Failed attempts are retried with
+	exponential backoff up to `max_attempts`. Jobs are processed in batches whose
+	objects share DeleteObjects requests. Jobs are claimed with a lease, so
+	several workers can share the queue and a job left `running` by a crashed
+	worker is picked up again once the lease expires.
+	"""
+
+	def __init__(
+		self,
+		catalog: DocumentCatalog,
+		*,
+		poll_interval: float,
+		max_attempts: int,
+		lease: float = 600.0,
+	) -> None:
+		self.catalog = catalog
+		self.poll_interval = poll_interval
+		self.max_attempts = max(1, max_attempts)
+		self.lease = lease
+		self._wakeup = asyncio.Event()
+		self._task: Optional[asyncio.Task] = None
+
+	def start(self) -> None:
+		if self._task is None or self._task.done():
+			self._task = asyncio.create_task(self._run(), name="document-deletion-worker")
+
+	async def stop(self) -> None:
+		if self._task is None:
+			return
+		self._task.cancel()
+		try:
+			await self._task
+		except asyncio.CancelledError:
+			pass
+		self._task = None
+
+	def notify(self) -> None:
+		"""Wake the worker up so a freshly queued job does not wait for the next poll."""
+
+		self._wakeup.set()
+
+	async def drain(self) -> int:
+		"""Process every job that is due now; returns how many were processed."""
+
+		processed = 0
+		while True:
+			jobs = await self.catalog.claim_deletion_jobs(lease=self.lease, limit=CLAIM_BATCH_SIZE)
+			if not jobs:
+				return processed
+			await self.process_many(jobs)
+			processed += len(jobs)
+
+	async def claim(self, job_ids: Sequence[str]) -> List[DeletionJob]:
+		"""Claim specific jobs, e.g. to process them inline; jobs already taken are skipped."""
+
+		if not job_ids:
+			return []
+		return await self.catalog.claim_deletion_jobs(lease=self.lease, limit=len(job_ids), job_ids=job_ids)
+
+	async def process_many(self, jobs: Sequence[DeletionJob]) -> List[DeletionJob]:
+		"""Run one attempt of several claimed jobs and persist their new status."""
+
+		prefixes = {job.job_id: f"{DOCUMENTS_PREFIX}/{job.document_id}/" for job in jobs}
+		try:
+			results = await get_document_blob_store().delete_prefixes(list(prefixes.values()))
+		except asyncio.CancelledError:
+			raise
+		except Exception as exc:
+			for job in jobs:
+				self._retry_later(job, exc)
+			await self.catalog.save_deletion_jobs(jobs)
+			return list(jobs)
+
+		purged: List[DeletionJob] = []
+		for job in jobs:
+			result = results[prefixes[job.job_id]]
+			job.deleted_objects += result.deleted
+			job.failed_objects = result.failed
+			if result.failed:
+				self._retry_later(job, RuntimeError(f"{result.failed} objects of the document could not be deleted"))
+			else:
+				purged.append(job)
+
+		try:
+			await self.catalog.delete_many([job.document_id for job in purged])
+		except asyncio.CancelledError:
+			raise
+		except Exception as exc:
+			for job in purged:
+				self._retry_later(job, exc)
+		else:
+			for job in purged:
+				job.status = JOB_SUCCEEDED
+				job.error = None
+				logger.info(
+					"Documento '%s' eliminado: %d objetos borrados", job.document_id, job.deleted_objects
+				)
+
+		await self.catalog.save_deletion_jobs(jobs)
+		return list(jobs)
+
+	def _retry_later(self, job: DeletionJob, exc: Exception) -> None:
+		job.error = str(exc) or type(exc).__name__
+		if job.attempts >= self.max_attempts:
+			job.status = JOB_FAILED
+			logger.error(
+				"Eliminación del documento '%s' abandonada tras %d intentos: %s",
+				job.document_id,
+				job.attempts,
+				job.error,
+			)
+			return
+
+		delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (job.attempts - 1))
+		job.status = JOB_PENDING
+		job.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+		logger.warning(
+			"Intento %d de eliminar el documento '%s' fallido, reintento en %.0fs: %s",
+			job.attempts,
+			job.document_id,
+			delay,
+			job.error,
+		)
+
+	async def _run(self) -> None:
+		while True:
+			try:
+				await self.drain()
+			except asyncio.CancelledError:
+				raise
+			except Exception:
+				logger.exception("No se pudo procesar la cola de eliminación de documentos")
+
+			try:
+				await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+			except asyncio.TimeoutError:
+				pass
+			self._wakeup.clear()
+
+
+@lru_cache(maxsize=1)
+def get_document_deletion_worker() -> DocumentDeletionWorker:
+	"""Return a singleton instance of the document deletion worker."""
+
+	return DocumentDeletionWorker(
+		get_document_catalog(),
+		poll_interval=settings.DOCUMENT_DELETION_POLL_INTERVAL,
+		max_attempts=settings.DOCUMENT_DELETION_MAX_ATTEMPTS,
+	)
@@ -0,0 +1,637 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "index.sqlite3"
+COPY_CHUNK_SIZE = 1024 * 1024
+MAX_LIST_PARTS = 1000
+# Staging files older than this were left behind by a crashed writer; younger ones may still be in use.
+STALE_STAGING_AGE = 24 * 60 * 60
+# Upper bound for prefix scans: sorts after every key that starts with the prefix.
+PREFIX_SENTINEL = chr(0x10FFFF)
+
+SCHEMA = (
+	"""
+	CREATE TABLE IF NOT EXISTS objects (
+		key TEXT PRIMARY KEY,
+		path TEXT NOT NULL,
+		size INTEGER NOT NULL,
+		etag TEXT NOT NULL,
+		content_type TEXT,
+		content_encoding TEXT,
+		metadata TEXT NOT NULL,
+		last_modified TEXT NOT NULL
+	)
+	""",
+	"""
+	CREATE TABLE IF NOT EXISTS uploads (
+		upload_id TEXT PRIMARY KEY,
+		key TEXT NOT NULL,
+		content_type TEXT,
+		content_encoding TEXT,
+		metadata TEXT NOT NULL
+	)
+	""",
+	"""
+	CREATE TABLE IF NOT EXISTS parts (
+		upload_id TEXT NOT NULL,
+		part_number INTEGER NOT NULL,
+		path TEXT NOT NULL,
+		size INTEGER NOT NULL,
+		etag TEXT NOT NULL,
+		PRIMARY KEY (upload_id, part_number)
+	)
+	""",
+)
+
+
+def client_error(operation: str, code: str, status: int, message: str = "") -> ClientError:
+	return ClientError(
+		{
+			"Error": {"Code": code, "Message": message},
+			"ResponseMetadata": {"HTTPStatusCode": status, "HTTPHeaders": {}},
+		},
+		operation,
+	)
+
+
+def verify_content_md5(operation: str, md5: bytes, content_md5: Optional[str]) -> None:
+	"""Raise BadDigest, like S3, when a Content-MD5 header does not match the received bytes."""
+
+	if content_md5 is not None and base64.b64encode(md5).decode("ascii") != content_md5:
+		raise client_error(operation, "BadDigest", 400, "The Content-MD5 you specified did not match what we received.")
+
+
+def utc_now() -> datetime:
+	# S3 timestamps have second precision.
+	return datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def parse_range(value: str, size: int) -> Optional[Tuple[int, int]]:
+	"""Resolve a single "bytes=" range like S3: malformed ranges are ignored, unsatisfiable ones raise."""
+
+	unit, _, spec = value.partition("=")
+	first, dash, last = spec.strip().partition("-")
+	if unit.strip().lower() != "bytes" or not dash or "," in spec:
+		return None
+	try:
+		if not first:
+			suffix = int(last)
+			if suffix <= 0 or size == 0:
+				raise client_error("GetObject", "InvalidRange", 416, "The requested range is not satisfiable")
+			return max(0, size - suffix), size - 1
+		start = int(first)
+		end = int(last) if last else size - 1
+	except ValueError:
+		return None
+	if end < start and last:
+		return None
+	if start >= size:
+		raise client_error("GetObject", "InvalidRange", 416, "The requested range is not satisfiable")
+	return start, min(end, size - 1)
+
+
+class FileStreamingBody:
+	"""Blocking body over a slice of a stored file, shaped like botocore's StreamingBody."""
+
+	def __init__(self, file: BinaryIO, length: int) -> None:
+		self._file = file
+		self._remaining = length
+
+	def read(self, amt: Optional[int] = None) -> bytes:
+		size = self._remaining if amt is None or amt < 0 else min(amt, self._remaining)
+		chunk = self._file.read(size) if size else b""
+		self._remaining -= len(chunk)
+		if amt is None:
+			self.close()
+		return chunk
+
+	def iter_chunks(self, chunk_size: int = COPY_CHUNK_SIZE) -> Iterator[bytes]:
+		try:
+			while True:
+				chunk = self.read(chunk_size)
+				if not chunk:
+					break
+				yield chunk
+		finally:
+			self.close()
+
+	def close(self) -> None:
+		self._file.close()
+
+
+class FilesystemStorageClient:
+	"""Blocking S3-style client that stores a bucket in a local directory.
+
+	Implements the subset of the boto3 S3 client used by ObjectStorageService, with
+	the same parameter names, response shapes and ClientError codes, so the service
+	runs it on its thread pool like boto3. Object bytes live in immutable files
+	under `objects/`, written to `staging/` first and renamed into place; which
+	file holds each key, plus its ETag, type and metadata, is kept in a SQLite
+	index next to them. A key changes content only when its index row is replaced,
+	so readers never see a partially written object, and several processes can
+	share the directory.
+	"""
+
+	def __init__(self, root: str, bucket: str) -> None:
+		self.bucket = bucket
+		self.root = os.path.join(os.path.abspath(root), bucket)
+		self.objects_dir = os.path.join(self.root, "objects")
+		self.staging_dir = os.path.join(self.root, "staging")
+		for directory in (self.objects_dir, self.staging_dir):
+			os.makedirs(directory, exist_ok=True)
+
+		self._lock = threading.Lock()
+		self._db = sqlite3.connect(
+			os.path.join(self.root, INDEX_FILENAME),
+			timeout=30,
+			isolation_level=None,
+			check_same_thread=False,
+		)
+		self._db.execute("PRAGMA journal_mode=WAL")
+		self._db.execute("PRAGMA synchronous=NORMAL")
+		for statement in SCHEMA:
+			self._db.execute(statement)
+		self._remove_stale_staging()
+
+	def close(self) -> None:
+		with self._lock:
+			self._db.close()
+
+	def put_object(
+		self,
+		*,
+		Bucket: str,
+		Key: str,
+		Body: bytes,
+		ContentType: Optional[str] = None,
+		Metadata: Optional[Dict[str, str]] = None,
+		ContentEncoding: Optional[str] = None,
+		ContentMD5: Optional[str] = None,
+	) -> Dict[str, Any]:
+		self._check_bucket("PutObject", Bucket)
+		path, size, digest = self._write([Body], "PutObject", ContentMD5)
+		etag = f'"{digest.hexdigest()}"'
+		self._store(Key, path, size, etag, ContentType, ContentEncoding, Metadata)
+		return {"ETag": etag}
+
+	def create_multipart_upload(
+		self,
+		*,
+		Bucket: str,
+		Key: str,
+		ContentType: Optional[str] = None,
+		Metadata: Optional[Dict[str, str]] = None,
+		ContentEncoding: Optional[str] = None,
+	) -> Dict[str, Any]:
+		self._check_bucket("CreateMultipartUpload", Bucket)
+		upload_id = uuid.uuid4().hex
+		with self._lock:
+			self._db.execute(
+				"INSERT INTO uploads (upload_id, key, content_type, content_encoding, metadata) VALUES (?, ?, ?, ?, ?)",
+				(upload_id, Key, ContentType, ContentEncoding, json.dumps(Metadata or {})),
+			)
+		return {"Bucket": Bucket, "Key": Key, "UploadId": upload_id}
+
+	def upload_part(
+		self,
+		*,
+		Bucket: str,
+		Key: str,
+		UploadId: str,
+		PartNumber: int,
+		Body: bytes,
+		ContentMD5: Optional[str] = None,
+	) -> Dict[str, Any]:
+		self._check_upload("UploadPart", Bucket, Key, UploadId)
+		path, size, digest = self._write([Body], "UploadPart", ContentMD5)
+		etag = f'"{digest.hexdigest()}"'
+		self._store_part(UploadId, PartNumber, path, size, etag)
+		return {"ETag": etag}
+
+	def upload_part_copy(
+		self,
+		*,
+		Bucket: str,
+		Key: str,
+		UploadId: str,
+		PartNumber: int,
+		CopySource: Dict[str, str],
+		CopySourceRange: str,
+	) -> Dict[str, Any]:
+		self._check_upload("UploadPartCopy", Bucket, Key, UploadId)
+		self._check_bucket("UploadPartCopy", CopySource["Bucket"])
+		row, file = self._open("UploadPartCopy", CopySource["Key"], "NoSuchKey")
+		with file:
+			start, end = parse_range(CopySourceRange, row["size"]) or (0, row["size"] - 1)
+			file.seek(start)
+			path, size, digest = self._write(FileStreamingBody(file, end - start + 1).iter_chunks())
+		etag = f'"{digest.hexdigest()}"'
+		self._store_part(UploadId, PartNumber, path, size, etag)
+		return {"CopyPartResult": {"ETag": etag, "LastModified": utc_now()}}
+
+	def complete_multipart_upload(
+		self,
+		*,
+		Bucket: str,
+		Key: str,
+		UploadId: str,
+		MultipartUpload: Dict[str, Any],
+	) -> Dict[str, Any]:
+		upload = self._check_upload("CompleteMultipartUpload", Bucket, Key, UploadId)
+		with self._lock:
+			stored = {
+				number: (path, etag)
+				for number, path, etag in self._db.execute(
+					"SELECT part_number, path, etag FROM parts WHERE upload_id = ?", (UploadId,)
+				)
+			}
+
+		requested = MultipartUpload.get("Parts", [])
+		numbers = [part["PartNumber"] for part in requested]
+		if not requested or numbers != sorted(set(numbers)):
+			raise client_error("CompleteMultipartUpload", "InvalidPartOrder", 400, "Parts must be in ascending order")
+		for part in requested:
+			entry = stored.get(part["PartNumber"])
+			if entry is None or entry[1].strip('"') != str(part["ETag"]).strip('"'):
+				raise client_error("CompleteMultipartUpload", "InvalidPart", 400, f"Part {part['PartNumber']} not found")
+
+		def chunks() -> Iterator[bytes]:
+			for number in numbers:
+				with open(self._absolute(stored[number][0]), "rb") as handle:
+					while True:
+						chunk = handle.read(COPY_CHUNK_SIZE)
+						if not chunk:
+							break
+						yield chunk
+
+		path, size, _ = self._write(chunks())
+		# Same ETag as S3: MD5 of the concatenated part MD5s, suffixed with the part count.
+		combined = hashlib.md5(b"".join(bytes.fromhex(stored[number][1].strip('"')) for number in numbers))
+		etag = f'"{combined.hexdigest()}-{len(numbers)}"'
+		self._store(
+			Key,
+			path,
+			size,
+			etag,
+			upload["content_type"],
+			upload["content_encoding"],
+			json.loads(upload["metadata"]),
+		)
+		self._drop_upload(UploadId)
+		return {"Bucket": Bucket, "Key": Key, "ETag": etag}
+
+	def abort_multipart_upload(self, *, Bucket: str, Key: str, UploadId: str) -> Dict[str, Any]:
+		self._check_upload("AbortMultipartUpload", Bucket, Key, UploadId)
+		self._drop_upload(UploadId)
+		return {}
+
+	def list_parts(
+		self,
+		*,
+		Bucket: str,
+		Key: str,
+		UploadId: str,
+		PartNumberMarker: Optional[int] = None,
+	) -> Dict[str, Any]:
+		self._check_upload("ListParts", Bucket, Key, UploadId)
+		with self._lock:
+			rows = self._db.execute(
+				"SELECT part_number, etag, size FROM parts WHERE upload_id = ? AND part_number > ?"
+				" ORDER BY part_number LIMIT ?",
+				(UploadId, PartNumberMarker or 0, MAX_LIST_PARTS + 1),
+			).fetchall()
+
+		parts = [{"PartNumber": number, "ETag": etag, "Size": size} for number, etag, size in rows[:MAX_LIST_PARTS]]
+		return {
+			"Parts": parts,
+			"IsTruncated": len(rows) > MAX_LIST_PARTS,
+			"NextPartNumberMarker": parts[-1]["PartNumber"] if parts else 0,
+		}
+
+	def list_objects_v2(
+		self,
+		*,
+		Bucket: str,
+		MaxKeys: int = 1000,
+		Prefix: Optional[str] = None,
+		ContinuationToken: Optional[str] = None,
+		StartAfter: Optional[str] = None,
+	) -> Dict[str, Any]:
+		self._check_bucket("ListObjectsV2", Bucket)
+		prefix = Prefix or ""
+		after = StartAfter or ""
+		if ContinuationToken:
+			after = max(after, base64.urlsafe_b64decode(ContinuationToken.encode("ascii")).decode("utf-8"))
+
+		with self._lock:
+			rows = self._db.execute(
+				"SELECT key, size, etag, last_modified FROM objects"
+				" WHERE key >= ? AND key < ? AND key > ? ORDER BY key LIMIT ?",
+				(prefix, prefix + PREFIX_SENTINEL, after, MaxKeys + 1),
+			).fetchall()
+
+		contents = [
+			{
+				"Key": key,
+				"LastModified": datetime.fromisoformat(last_modified),
+				"ETag": etag,
+				"Size": size,
+			}
+			for key, size, etag, last_modified in rows[:MaxKeys]
+		]
+		response: Dict[str, Any] = {"IsTruncated": len(rows) > MaxKeys, "KeyCount": len(contents)}
+		if contents:
+			response["Contents"] = contents
+		if response["IsTruncated"] and contents:
+			response["NextContinuationToken"] = base64.urlsafe_b64encode(
+				contents[-1]["Key"].encode("utf-8")
+			).decode("ascii")
+		return response
+
+	def delete_objects(self, *, Bucket: str, Delete: Dict[str, Any]) -> Dict[str, Any]:
+		self._check_bucket("DeleteObjects", Bucket)
+		keys = [item["Key"] for item in Delete["Objects"]]
+		placeholders = ", ".join("?" * len(keys))
+		with self._lock:
+			self._db.execute("BEGIN IMMEDIATE")
+			try:
+				paths = [
+					path
+					for (path,) in self._db.execute(
+						f"SELECT path FROM objects WHERE key IN ({placeholders})", keys
+					)
+				]
+				self._db.execute(f"DELETE FROM objects WHERE key IN ({placeholders})", keys)
+				self._db.execute("COMMIT")
+			except BaseException:
+				self._db.execute("ROLLBACK")
+				raise
+		self._unlink([self._absolute(path) for path in paths])
+
+		# Like S3, keys that did not exist count as deleted.
+		return {} if Delete.get("Quiet") else {"Deleted": [{"Key": key} for key in keys]}
+
+	def head_object(self, *, Bucket: str, Key: str) -> Dict[str, Any]:
+		self._check_bucket("HeadObject", Bucket)
+		with self._lock:
+			row = self._row(Key)
+		if row is None:
+			raise client_error("HeadObject", "404", 404, "Not Found")
+		return self._object_response(row)
+
+	def get_object(
+		self,
+		*,
+		Bucket: str,
+		Key: str,
+		Range: Optional[str] = None,
+		IfNoneMatch: Optional[str] = None,
+	) -> Dict[str, Any]:
+		self._check_bucket("GetObject", Bucket)
+		row, file = self._open("GetObject", Key, "NoSuchKey")
+		try:
+			if IfNoneMatch and IfNoneMatch.strip() in {"*", row["etag"], row["etag"].strip('"')}:
+				raise client_error("GetObject", "304", 304, "Not Modified")
+
+			response = self._object_response(row)
+			byte_range = parse_range(Range, row["size"]) if Range else None
+			if byte_range is None:
+				response["Body"] = FileStreamingBody(file, row["size"])
+				return response
+
+			start, end = byte_range
+			file.seek(start)
+			response["ContentLength"] = end - start + 1
+			response["ContentRange"] = f"bytes {start}-{end}/{row['size']}"
+			response["Body"] = FileStreamingBody(file, end - start + 1)
+			return response
+		except BaseException:
+			file.close()
+			raise
+
+	def copy_object(
+		self,
+		*,
+		Bucket: str,
+		Key: str,
+		CopySource: Dict[str, str],
+		MetadataDirective: Optional[str] = None,
+		Metadata: Optional[Dict[str, str]] = None,
+		ContentType: Optional[str] = None,
+		ContentEncoding: Optional[str] = None,
+	) -> Dict[str, Any]:
+		self._check_bucket("CopyObject", Bucket)
+		self._check_bucket("CopyObject", CopySource["Bucket"])
+		row, file = self._open("CopyObject", CopySource["Key"], "NoSuchKey")
+		with file:
+			path, size, digest = self._write(FileStreamingBody(file, row["size"]).iter_chunks())
+
+		metadata = json.loads(row["metadata"])
+		content_type = row["content_type"]
+		content_encoding = row["content_encoding"]
+		if MetadataDirective == "REPLACE":
+			metadata = Metadata or {}
+			content_type = ContentType
+			content_encoding = ContentEncoding
+		etag = f'"{digest.hexdigest()}"'
+		last_modified = self._store(Key, path, size, etag, content_type, content_encoding, metadata)
+		return {"CopyObjectResult": {"ETag": etag, "LastModified": last_modified}}
+
+	def _write(
+		self, chunks: Iterable[bytes], operation: str = "", content_md5: Optional[str] = None
+	) -> Tuple[str, int, "hashlib._Hash"]:
+		"""Write chunks to a new file under objects/ through a staging file and an atomic rename.
+
+		With content_md5, the file is discarded before the rename unless its MD5 matches.
+		Returns the file path relative to the bucket directory, its size and its MD5.
+		"""
+
+		name = uuid.uuid4().hex
+		staging_path = os.path.join(self.staging_dir, name)
+		relative_path = os.path.join("objects", name[:2], name)
+		digest = hashlib.md5()
+		size = 0
+		try:
+			with open(staging_path, "wb") as handle:
+				for chunk in chunks:
+					handle.write(chunk)
+					digest.update(chunk)
+					size += len(chunk)
+				handle.flush()
+				os.fsync(handle.fileno())
+			verify_content_md5(operation, digest.digest(), content_md5)
+			os.makedirs(os.path.dirname(self._absolute(relative_path)), exist_ok=True)
+			os.replace(staging_path, self._absolute(relative_path))
+		except BaseException:
+			self._unlink([staging_path])
+			raise
+		return relative_path, size, digest
+
+	def _store(
+		self,
+		key: str,
+		path: str,
+		size: int,
+		etag: str,
+		content_type: Optional[str],
+		content_encoding: Optional[str],
+		metadata: Optional[Dict[str, str]],
+	) -> datetime:
+		"""Point key at a written file, then remove the file it replaced."""
+
+		last_modified = utc_now()
+		with self._lock:
+			self._db.execute("BEGIN IMMEDIATE")
+			try:
+				previous = self._db.execute("SELECT path FROM objects WHERE key = ?", (key,)).fetchone()
+				self._db.execute(
+					"INSERT OR REPLACE INTO objects"
+					" (key, path, size, etag, content_type, content_encoding, metadata, last_modified)"
+					" VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+					(
+						key,
+						path,
+						size,
+						etag,
+						content_type,
+						content_encoding,
+						json.dumps(metadata or {}),
+						last_modified.isoformat(),
+					),
+				)
+				self._db.execute("COMMIT")
+			except BaseException:
+				self._db.execute("ROLLBACK")
+				self._unlink([self._absolute(path)])
+				raise
+		if previous is not None:
+			self._unlink([self._absolute(previous[0])])
+		return last_modified
+
+	def _store_part(self, upload_id: str, part_number: int, path: str, size: int, etag: str) -> None:
+		with self._lock:
+			self._db.execute("BEGIN IMMEDIATE")
+			try:
+				previous = self._db.execute(
+					"SELECT path FROM parts WHERE upload_id = ? AND part_number = ?", (upload_id, part_number)
+				).fetchone()
+				self._db.execute(
+					"INSERT OR REPLACE INTO parts (upload_id, part_number, path, size, etag) VALUES (?, ?, ?, ?, ?)",
+					(upload_id, part_number, path, size, etag),
+				)
+				self._db.execute("COMMIT")
+			except BaseException:
+				self._db.execute("ROLLBACK")
+				self._unlink([self._absolute(path)])
+				raise
+		if previous is not None:
+			self._unlink([self._absolute(previous[0])])
+
+	def _drop_upload(self, upload_id: str) -> None:
+		with self._lock:
+			self._db.execute("BEGIN IMMEDIATE")
+			try:
+				paths = [
+					path for (path,) in self._db.execute("SELECT path FROM parts WHERE upload_id = ?", (upload_id,))
+				]
+				self._db.execute("DELETE FROM parts WHERE upload_id = ?", (upload_id,))
+				self._db.execute("DELETE FROM uploads WHERE upload_id = ?", (upload_id,))
+				self._db.execute("COMMIT")
+			except BaseException:
+				self._db.execute("ROLLBACK")
+				raise
+		self._unlink([self._absolute(path) for path in paths])
+
+	def _open(self, operation: str, key: str, missing_code: str) -> Tuple[Dict[str, Any], BinaryIO]:
+		"""Return the index row of key and its file, opened before anyone can replace it."""
+
+		while True:
+			with self._lock:
+				row = self._row(key)
+			if row is None:
+				raise client_error(operation, missing_code, 404, "The specified key does not exist.")
+			try:
+				return row, open(self._absolute(row["path"]), "rb")
+			except FileNotFoundError:
+				# Another process replaced or deleted key between the lookup and the open.
+				with self._lock:
+					current = self._row(key)
+				if current is not None and current["path"] != row["path"]:
+					continue
+				raise client_error(operation, missing_code, 404, "The specified key does not exist.")
+
+	def _row(self, key: str) -> Optional[Dict[str, Any]]:
+		cursor = self._db.execute(
+			"SELECT key, path, size, etag, content_type, content_encoding, metadata, last_modified"
+			" FROM objects WHERE key = ?",
+			(key,),
+		)
+		row = cursor.fetchone()
+		if row is None:
+			return None
+		return dict(zip([column[0] for column in cursor.description], row))
+
+	def _check_bucket(self, operation: str, bucket: str) -> None:
+		if bucket != self.bucket:
+			raise client_error(operation, "NoSuchBucket", 404, f"The bucket '{bucket}' does not exist.")
+
+	def _check_upload(self, operation: str, bucket: str, key: str, upload_id: str) -> Dict[str, Any]:
+		self._check_bucket(operation, bucket)
+		with self._lock:
+			row = self._db.execute(
+				"SELECT key, content_type, content_encoding, metadata FROM uploads WHERE upload_id = ?",
+				(upload_id,),
+			).fetchone()
+		if row is None or row[0] != key:
+			raise client_error(operation, "NoSuchUpload", 404, "The specified upload does not exist.")
+		return dict(zip(("key", "content_type", "content_encoding", "metadata"), row))
+
+	def _absolute(self, relative_path: str) -> str:
+		return os.path.join(self.root, relative_path)
+
+	def _remove_stale_staging(self) -> None:
+		cutoff = time.time() - STALE_STAGING_AGE
+		stale = [
+			entry.path
+			for entry in os.scandir(self.staging_dir)
+			if entry.is_file() and entry.stat().st_mtime < cutoff
+		]
+		if stale:
+			logger.info("Eliminando %d archivos temporales abandonados en '%s'", len(stale), self.staging_dir)
+			self._unlink(stale)
+
+	@staticmethod
+	def _unlink(paths: Iterable[str]) -> None:
+		for path in paths:
+			try:
+				os.remove(path)
+			except FileNotFoundError:
+				pass
+
+	@staticmethod
+	def _object_response(row: Dict[str, Any]) -> Dict[str, Any]:
+		response: Dict[str, Any] = {
+			"ContentLength": row["size"],
+			"ContentType": row["content_type"],
+			"ETag": row["etag"],
+			"LastModified": datetime.fromisoformat(row["last_modified"]),
+			"Metadata": json.loads(row["metadata"]),
+		}
+		if row["content_encoding"]:
+			response["ContentEncoding"] = row["content_encoding"]
+		return response
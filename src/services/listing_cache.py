@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import fcntl
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Generation stored as a fixed-width number, rewritten in place so readers never see a partial value.
+GENERATION_WIDTH = 20
+
+
+@dataclass(slots=True)
+class ListingCacheStats:
+	"""Counters of the listing cache since startup."""
+
+	entries: int
+	hits: int
+	misses: int
+	invalidations: int
+
+
+@dataclass(slots=True)
+class _Listing:
+	objects: List[Any]
+	expires_at: float
+
+
+class ListingCache:
+	"""TTL cache of bucket listings keyed by prefix, shared across workers via a generation file.
+
+	Writes through this process drop only the listings whose prefix covers the
+	written keys. Every write also bumps a counter in `generation_path`; when a
+	lookup finds that another process bumped it, the whole cache is discarded,
+	so uvicorn workers on the same host never serve a listing older than their
+	peers' writes. A TTL of 0 disables the cache.
+	"""
+
+	def __init__(self, ttl: float, generation_path: str, *, max_entries: int = 256) -> None:
+		self.ttl = ttl
+		self.generation_path = generation_path
+		self.max_entries = max(1, max_entries)
+		self._entries: "OrderedDict[Tuple[str, int], _Listing]" = OrderedDict()
+		self._hits = 0
+		self._misses = 0
+		self._invalidations = 0
+		self._generation = self._read_generation() if self.enabled else 0
+
+	@property
+	def enabled(self) -> bool:
+		return self.ttl > 0
+
+	def get(self, prefix: str, max_keys: int) -> Optional[List[Any]]:
+		if not self.enabled:
+			return None
+
+		self._sync_generation()
+		entry = self._entries.get((prefix, max_keys))
+		if entry is None or entry.expires_at <= time.monotonic():
+			self._misses += 1
+			return None
+
+		self._hits += 1
+		self._entries.move_to_end((prefix, max_keys))
+		return list(entry.objects)
+
+	def generation(self) -> int:
+		"""Current generation; pass it back to `put` to detect writes racing with a listing."""
+
+		if self.enabled:
+			self._sync_generation()
+		return self._generation
+
+	def put(self, prefix: str, max_keys: int, objects: List[Any], generation: int) -> None:
+		if not self.enabled:
+			return
+
+		self._sync_generation()
+		if generation != self._generation:
+			# Something was written while listing; the result may already be stale.
+			return
+
+		self._entries[(prefix, max_keys)] = _Listing(list(objects), time.monotonic() + self.ttl)
+		self._entries.move_to_end((prefix, max_keys))
+		while len(self._entries) > self.max_entries:
+			self._entries.popitem(last=False)
+
+	def invalidate(self, keys: Iterable[str]) -> None:
+		"""Drop listings that may include any of the written keys and notify other workers."""
+
+		if not self.enabled:
+			return
+
+		keys = list(keys)
+		previous, current = self._bump_generation()
+		if previous != self._generation:
+			# Another worker wrote since our last look: nothing cached can be trusted.
+			self._entries.clear()
+		else:
+			for cache_key in [
+				cache_key
+				for cache_key in self._entries
+				if any(key.startswith(cache_key[0]) for key in keys)
+			]:
+				del self._entries[cache_key]
+		self._generation = current
+		self._invalidations += 1
+
+	def stats(self) -> ListingCacheStats:
+		return ListingCacheStats(
+			entries=len(self._entries),
+			hits=self._hits,
+			misses=self._misses,
+			invalidations=self._invalidations,
+		)
+
+	def _sync_generation(self) -> None:
+		current = self._read_generation()
+		if current != self._generation:
+			self._entries.clear()
+			self._generation = current
+
+	def _read_generation(self) -> int:
+		try:
+			with open(self.generation_path, "rb") as handle:
+				raw = handle.read(GENERATION_WIDTH)
+		except FileNotFoundError:
+			return 0
+		try:
+			return int(raw)
+		except ValueError:
+			return 0
+
+	def _bump_generation(self) -> Tuple[int, int]:
+		directory = os.path.dirname(self.generation_path)
+		if directory:
+			os.makedirs(directory, exist_ok=True)
+
+		fd = os.open(self.generation_path, os.O_RDWR | os.O_CREAT, 0o644)
+		try:
+			fcntl.flock(fd, fcntl.LOCK_EX)
+			raw = os.pread(fd, GENERATION_WIDTH, 0)
+			try:
+				previous = int(raw)
+			except ValueError:
+				previous = 0
+			current = previous + 1
+			os.pwrite(fd, str(current).zfill(GENERATION_WIDTH).encode("ascii"), 0)
+		finally:
+			os.close(fd)
+		return previous, current
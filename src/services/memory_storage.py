@@ -0,0 +1,476 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import bisect
+import hashlib
+import math
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from src.services.filesystem_storage import client_error, parse_range, utc_now, verify_content_md5
+
+MAX_LIST_PARTS = 1000
+# Injected failures look like R2 throttling, so they exercise the retry policy and the circuit breaker.
+INJECTED_ERROR_CODE = "SlowDown"
+# 99th percentile of the standard normal distribution.
+P99_Z_SCORE = 2.3263
+
+
+def _operation_name(operation: str) -> str:
+	return "".join(part.title() for part in operation.split("_"))
+
+
+def _etag(data: bytes) -> str:
+	return f'"{hashlib.md5(data).hexdigest()}"'
+
+
+def _parse_operations(value: str) -> Dict[str, str]:
+	"""Parse "operation=value,..." pairs; "*" stands for every operation not listed."""
+
+	entries: Dict[str, str] = {}
+	for item in value.split(","):
+		if not item.strip():
+			continue
+		operation, separator, setting = item.partition("=")
+		if not separator or not operation.strip() or not setting.strip():
+			raise ValueError(f"se esperaba 'operación=valor' y se recibió '{item.strip()}'")
+		entries[operation.strip()] = setting.strip()
+	return entries
+
+
+@dataclass(slots=True)
+class LatencyDistribution:
+	"""Log-normal latency described by its median and 99th percentile, in seconds."""
+
+	median: float
+	p99: float
+
+	def sample(self, rng: random.Random) -> float:
+		if self.median <= 0:
+			return 0.0
+		if self.p99 <= self.median:
+			return self.median
+		return rng.lognormvariate(math.log(self.median), math.log(self.p99 / self.median) / P99_Z_SCORE)
+
+
+@dataclass(slots=True)
+class FaultProfile:
+	"""Latency, error rates and bandwidth injected by MemoryStorageClient.
+
+	Latencies and error rates are keyed by client operation (e.g. "put_object");
+	"*" applies to the operations without an entry of their own.
+	"""
+
+	latency: Dict[str, LatencyDistribution] = field(default_factory=dict)
+	error_rates: Dict[str, float] = field(default_factory=dict)
+	# Bytes per second shared by every transfer in both directions; 0 means unlimited.
+	bandwidth: int = 0
+
+	@classmethod
+	def parse(cls, latency: str, error_rates: str, bandwidth: int = 0) -> "FaultProfile":
+		"""Build a profile from "operation=median/p99" latencies and "operation=probability" error rates."""
+
+		distributions: Dict[str, LatencyDistribution] = {}
+		for operation, value in _parse_operations(latency).items():
+			median, _, p99 = value.partition("/")
+			try:
+				distributions[operation] = LatencyDistribution(float(median), float(p99 or median))
+			except ValueError:
+				raise ValueError(f"latencia no válida para '{operation}': '{value}'") from None
+
+		rates: Dict[str, float] = {}
+		for operation, value in _parse_operations(error_rates).items():
+			try:
+				rates[operation] = float(value)
+			except ValueError:
+				raise ValueError(f"tasa de error no válida para '{operation}': '{value}'") from None
+			if not 0 <= rates[operation] <= 1:
+				raise ValueError(f"la tasa de error de '{operation}' debe estar entre 0 y 1")
+
+		if bandwidth < 0:
+			raise ValueError("el ancho de banda no puede ser negativo")
+		return cls(latency=distributions, error_rates=rates, bandwidth=bandwidth)
+
+	def latency_for(self, operation: str) -> Optional[LatencyDistribution]:
+		return self.latency.get(operation) or self.latency.get("*")
+
+	def error_rate_for(self, operation: str) -> float:
+		return self.error_rates.get(operation, self.error_rates.get("*", 0.0))
+
+
+class _Link:
+	"""Simulated network link: transfers queue behind each other at a fixed rate."""
+
+	def __init__(self, bandwidth: int) -> None:
+		self.bandwidth = bandwidth
+		self._free_at = 0.0
+
+	async def transfer(self, size: int) -> None:
+		if self.bandwidth <= 0 or size <= 0:
+			return
+		now = time.monotonic()
+		self._free_at = max(now, self._free_at) + size / self.bandwidth
+		await asyncio.sleep(self._free_at - now)
+
+
+@dataclass(slots=True)
+class _StoredObject:
+	data: bytes
+	etag: str
+	content_type: Optional[str]
+	content_encoding: Optional[str]
+	metadata: Dict[str, str]
+	last_modified: datetime
+
+
+@dataclass(slots=True)
+class _Upload:
+	key: str
+	content_type: Optional[str]
+	content_encoding: Optional[str]
+	metadata: Dict[str, str]
+	parts: Dict[int, Tuple[bytes, str]] = field(default_factory=dict)
+
+
+class MemoryStreamingBody:
+	"""Async body over bytes held in memory, paced by the simulated link."""
+
+	def __init__(self, data: bytes, link: _Link) -> None:
+		self._data = memoryview(data)
+		self._offset = 0
+		self._link = link
+
+	async def read(self, amt: Optional[int] = None) -> bytes:
+		end = len(self._data) if amt is None or amt < 0 else min(len(self._data), self._offset + amt)
+		chunk = bytes(self._data[self._offset : end])
+		self._offset = end
+		await self._link.transfer(len(chunk))
+		return chunk
+
+	async def iter_chunks(self, chunk_size: int = 1024 * 1024) -> AsyncIterator[bytes]:
+		while True:
+			chunk = await self.read(chunk_size)
+			if not chunk:
+				break
+			yield chunk
+
+	def close(self) -> None:
+		self._offset = len(self._data)
+
+
+class MemoryStorageClient:
+	"""Asyncio S3-style client keeping a bucket in process memory, with injectable faults.
+
+	Implements the same subset of the boto3 S3 API as FilesystemStorageClient, so
+	ObjectStorageService runs unchanged on top of it. Before every operation it
+	waits for a latency drawn from the profile and may fail it with a SlowDown
+	error; object bodies are paced by the profile's bandwidth. Meant for load
+	tests and benchmarks: contents are lost on restart and are not shared between
+	processes.
+	"""
+
+	def __init__(self, bucket: str, faults: Optional[FaultProfile] = None, *, seed: Optional[int] = None) -> None:
+		self.bucket = bucket
+		self.faults = faults or FaultProfile()
+		self._rng = random.Random(seed)
+		self._link = _Link(self.faults.bandwidth)
+		self._objects: Dict[str, _StoredObject] = {}
+		self._uploads: Dict[str, _Upload] = {}
+		# Listing order; may still hold deleted keys, and keys added since the last listing are pending.
+		self._sorted_keys: List[str] = []
+		self._pending_keys: List[str] = []
+		self._deleted_keys = 0
+
+	async def close(self) -> None:
+		return None
+
+	async def put_object(
+		self,
+		*,
+		Bucket: str,
+		Key: str,
+		Body: bytes,
+		ContentType: Optional[str] = None,
+		Metadata: Optional[Dict[str, str]] = None,
+		ContentEncoding: Optional[str] = None,
+		ContentMD5: Optional[str] = None,
+	) -> Dict[str, Any]:
+		await self._begin("put_object", Bucket)
+		await self._link.transfer(len(Body))
+		verify_content_md5("PutObject", hashlib.md5(Body).digest(), ContentMD5)
+		etag = _etag(Body)
+		self._store(Key, _StoredObject(bytes(Body), etag, ContentType, ContentEncoding, dict(Metadata or {}), utc_now()))
+		return {"ETag": etag}
+
+	async def create_multipart_upload(
+		self,
+		*,
+		Bucket: str,
+		Key: str,
+		ContentType: Optional[str] = None,
+		Metadata: Optional[Dict[str, str]] = None,
+		ContentEncoding: Optional[str] = None,
+	) -> Dict[str, Any]:
+		await self._begin("create_multipart_upload", Bucket)
+		upload_id = uuid.uuid4().hex
+		self._uploads[upload_id] = _Upload(Key, ContentType, ContentEncoding, dict(Metadata or {}))
+		return {"Bucket": Bucket, "Key": Key, "UploadId": upload_id}
+
+	async def upload_part(
+		self,
+		*,
+		Bucket: str,
+		Key: str,
+		UploadId: str,
+		PartNumber: int,
+		Body: bytes,
+		ContentMD5: Optional[str] = None,
+	) -> Dict[str, Any]:
+		await self._begin("upload_part", Bucket)
+		upload = self._upload("upload_part", Key, UploadId)
+		await self._link.transfer(len(Body))
+		verify_content_md5("UploadPart", hashlib.md5(Body).digest(), ContentMD5)
+		etag = _etag(Body)
+		upload.parts[PartNumber] = (bytes(Body), etag)
+		return {"ETag": etag}
+
+	async def upload_part_copy(
+		self,
+		*,
+		Bucket: str,
+		Key: str,
+		UploadId: str,
+		PartNumber: int,
+		CopySource: Dict[str, str],
+		CopySourceRange: str,
+	) -> Dict[str, Any]:
+		await self._begin("upload_part_copy", Bucket)
+		upload = self._upload("upload_part_copy", Key, UploadId)
+		source = self._object("upload_part_copy", CopySource["Bucket"], CopySource["Key"])
+		start, end = parse_range(CopySourceRange, len(source.data)) or (0, len(source.data) - 1)
+		data = source.data[start : end + 1]
+		etag = _etag(data)
+		upload.parts[PartNumber] = (data, etag)
+		return {"CopyPartResult": {"ETag": etag, "LastModified": utc_now()}}
+
+	async def complete_multipart_upload(
+		self,
+		*,
+		Bucket: str,
+		Key: str,
+		UploadId: str,
+		MultipartUpload: Dict[str, Any],
+	) -> Dict[str, Any]:
+		operation = _operation_name("complete_multipart_upload")
+		await self._begin("complete_multipart_upload", Bucket)
+		upload = self._upload("complete_multipart_upload", Key, UploadId)
+
+		requested = MultipartUpload.get("Parts", [])
+		numbers = [part["PartNumber"] for part in requested]
+		if not requested or numbers != sorted(set(numbers)):
+			raise client_error(operation, "InvalidPartOrder", 400, "Parts must be in ascending order")
+		for part in requested:
+			stored = upload.parts.get(part["PartNumber"])
+			if stored is None or stored[1].strip('"') != str(part["ETag"]).strip('"'):
+				raise client_error(operation, "InvalidPart", 400, f"Part {part['PartNumber']} not found")
+
+		data = b"".join(upload.parts[number][0] for number in numbers)
+		combined = hashlib.md5(b"".join(bytes.fromhex(upload.parts[number][1].strip('"')) for number in numbers))
+		etag = f'"{combined.hexdigest()}-{len(numbers)}"'
+		self._store(
+			Key,
+			_StoredObject(data, etag, upload.content_type, upload.content_encoding, upload.metadata, utc_now()),
+		)
+		del self._uploads[UploadId]
+		return {"Bucket": Bucket, "Key": Key, "ETag": etag}
+
+	async def abort_multipart_upload(self, *, Bucket: str, Key: str, UploadId: str) -> Dict[str, Any]:
+		await self._begin("abort_multipart_upload", Bucket)
+		self._upload("abort_multipart_upload", Key, UploadId)
+		del self._uploads[UploadId]
+		return {}
+
+	async def list_parts(
+		self,
+		*,
+		Bucket: str,
+		Key: str,
+		UploadId: str,
+		PartNumberMarker: Optional[int] = None,
+	) -> Dict[str, Any]:
+		await self._begin("list_parts", Bucket)
+		upload = self._upload("list_parts", Key, UploadId)
+		numbers = sorted(number for number in upload.parts if number > (PartNumberMarker or 0))
+		parts = [
+			{"PartNumber": number, "ETag": upload.parts[number][1], "Size": len(upload.parts[number][0])}
+			for number in numbers[:MAX_LIST_PARTS]
+		]
+		return {
+			"Parts": parts,
+			"IsTruncated": len(numbers) > MAX_LIST_PARTS,
+			"NextPartNumberMarker": parts[-1]["PartNumber"] if parts else 0,
+		}
+
+	async def list_objects_v2(
+		self,
+		*,
+		Bucket: str,
+		MaxKeys: int = 1000,
+		Prefix: Optional[str] = None,
+		ContinuationToken: Optional[str] = None,
+		StartAfter: Optional[str] = None,
+	) -> Dict[str, Any]:
+		await self._begin("list_objects_v2", Bucket)
+		prefix = Prefix or ""
+		after = StartAfter or ""
+		if ContinuationToken:
+			after = max(after, base64.urlsafe_b64decode(ContinuationToken.encode("ascii")).decode("utf-8"))
+
+		keys = self._listing_keys()
+		index = bisect.bisect_right(keys, after) if after >= prefix else bisect.bisect_left(keys, prefix)
+		contents: List[Dict[str, Any]] = []
+		truncated = False
+		for key in keys[index:]:
+			if not key.startswith(prefix):
+				break
+			stored = self._objects.get(key)
+			if stored is None:
+				continue
+			if len(contents) == MaxKeys:
+				truncated = True
+				break
+			contents.append(
+				{"Key": key, "LastModified": stored.last_modified, "ETag": stored.etag, "Size": len(stored.data)}
+			)
+
+		response: Dict[str, Any] = {"IsTruncated": truncated, "KeyCount": len(contents)}
+		if contents:
+			response["Contents"] = contents
+		if truncated and contents:
+			response["NextContinuationToken"] = base64.urlsafe_b64encode(
+				contents[-1]["Key"].encode("utf-8")
+			).decode("ascii")
+		return response
+
+	async def delete_objects(self, *, Bucket: str, Delete: Dict[str, Any]) -> Dict[str, Any]:
+		await self._begin("delete_objects", Bucket)
+		keys = [item["Key"] for item in Delete["Objects"]]
+		for key in keys:
+			if self._objects.pop(key, None) is not None:
+				self._deleted_keys += 1
+		# Like S3, keys that did not exist count as deleted.
+		return {} if Delete.get("Quiet") else {"Deleted": [{"Key": key} for key in keys]}
+
+	async def head_object(self, *, Bucket: str, Key: str) -> Dict[str, Any]:
+		await self._begin("head_object", Bucket)
+		stored = self._objects.get(Key)
+		if stored is None:
+			raise client_error("HeadObject", "404", 404, "Not Found")
+		return self._object_response(stored)
+
+	async def get_object(
+		self,
+		*,
+		Bucket: str,
+		Key: str,
+		Range: Optional[str] = None,
+		IfNoneMatch: Optional[str] = None,
+	) -> Dict[str, Any]:
+		await self._begin("get_object", Bucket)
+		stored = self._object("get_object", Bucket, Key)
+		if IfNoneMatch and IfNoneMatch.strip() in {"*", stored.etag, stored.etag.strip('"')}:
+			raise client_error("GetObject", "304", 304, "Not Modified")
+
+		response = self._object_response(stored)
+		byte_range = parse_range(Range, len(stored.data)) if Range else None
+		if byte_range is None:
+			response["Body"] = MemoryStreamingBody(stored.data, self._link)
+			return response
+
+		start, end = byte_range
+		response["ContentLength"] = end - start + 1
+		response["ContentRange"] = f"bytes {start}-{end}/{len(stored.data)}"
+		response["Body"] = MemoryStreamingBody(stored.data[start : end + 1], self._link)
+		return response
+
+	async def copy_object(
+		self,
+		*,
+		Bucket: str,
+		Key: str,
+		CopySource: Dict[str, str],
+		MetadataDirective: Optional[str] = None,
+		Metadata: Optional[Dict[str, str]] = None,
+		ContentType: Optional[str] = None,
+		ContentEncoding: Optional[str] = None,
+	) -> Dict[str, Any]:
+		await self._begin("copy_object", Bucket)
+		source = self._object("copy_object", CopySource["Bucket"], CopySource["Key"])
+		replace = MetadataDirective == "REPLACE"
+		copy = _StoredObject(
+			source.data,
+			_etag(source.data),
+			ContentType if replace else source.content_type,
+			ContentEncoding if replace else source.content_encoding,
+			dict(Metadata or {}) if replace else dict(source.metadata),
+			utc_now(),
+		)
+		self._store(Key, copy)
+		return {"CopyObjectResult": {"ETag": copy.etag, "LastModified": copy.last_modified}}
+
+	async def _begin(self, operation: str, bucket: str) -> None:
+		"""Wait for the injected latency, then fail the call at the configured rate."""
+
+		latency = self.faults.latency_for(operation)
+		if latency is not None:
+			await asyncio.sleep(latency.sample(self._rng))
+		if self._rng.random() < self.faults.error_rate_for(operation):
+			raise client_error(_operation_name(operation), INJECTED_ERROR_CODE, 503, "Please reduce your request rate.")
+		if bucket != self.bucket:
+			raise client_error(_operation_name(operation), "NoSuchBucket", 404, f"The bucket '{bucket}' does not exist.")
+
+	def _store(self, key: str, stored: _StoredObject) -> None:
+		if key not in self._objects:
+			self._pending_keys.append(key)
+		self._objects[key] = stored
+
+	def _listing_keys(self) -> List[str]:
+		# Sorting is deferred to the next listing, so bursts of uploads stay O(1) per key; deleted
+		# keys are skipped while listing and only dropped once they are half of the list.
+		if self._pending_keys or self._deleted_keys * 2 > len(self._sorted_keys):
+			self._sorted_keys = sorted({*self._sorted_keys, *self._pending_keys} & self._objects.keys())
+			self._pending_keys = []
+			self._deleted_keys = 0
+		return self._sorted_keys
+
+	def _object(self, operation: str, bucket: str, key: str) -> _StoredObject:
+		if bucket != self.bucket:
+			raise client_error(_operation_name(operation), "NoSuchBucket", 404, f"The bucket '{bucket}' does not exist.")
+		stored = self._objects.get(key)
+		if stored is None:
+			raise client_error(_operation_name(operation), "NoSuchKey", 404, "The specified key does not exist.")
+		return stored
+
+	def _upload(self, operation: str, key: str, upload_id: str) -> _Upload:
+		upload = self._uploads.get(upload_id)
+		if upload is None or upload.key != key:
+			raise client_error(_operation_name(operation), "NoSuchUpload", 404, "The specified upload does not exist.")
+		return upload
+
+	@staticmethod
+	def _object_response(stored: _StoredObject) -> Dict[str, Any]:
+		response: Dict[str, Any] = {
+			"ContentLength": len(stored.data),
+			"ContentType": stored.content_type,
+			"ETag": stored.etag,
+			"LastModified": stored.last_modified,
+			"Metadata": dict(stored.metadata),
+		}
+		if stored.content_encoding:
+			response["ContentEncoding"] = stored.content_encoding
+		return response
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Awaitable, BinaryIO, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DATA_SUFFIX = ".data"
+META_SUFFIX = ".json"
+TEMP_SUFFIX = ".tmp"
+# Temporary files older than this are left by a crashed fill; younger ones may be another worker's.
+STALE_TEMP_AGE = 24 * 3600
+
+
+@dataclass(slots=True)
+class CachedObject:
+	"""A storage object materialized in the local disk cache."""
+
+	key: str
+	path: str
+	size: int
+	etag: Optional[str]
+	content_type: Optional[str]
+	metadata: Dict[str, str]
+	validated_at: float
+
+
+# Called with the key, the current entry (if any) and a temporary path to write to.
+# Returns an entry describing the content written to the path, or None when the
+# current entry (only passed in when one exists) is still valid.
+CacheFiller = Callable[[str, Optional[CachedObject], str], Awaitable[Optional[CachedObject]]]
+
+
+class ObjectDiskCache:
+	"""Size-bounded LRU cache of storage objects on local disk.
+
+	Fills are written to a temporary file and renamed into place, so readers never
+	see partial content, and concurrent requests for the same key share one fill.
+	Entries are revalidated through the filler (an ETag check) once they are older
+	than `validate_after` seconds.
+
+	The directory may be shared by the workers of a host, each with its own index.
+	Every fill writes a new data file that is never modified, so a worker never
+	serves bytes that do not match its entry. The byte budget covers the whole
+	directory: eviction removes the least recently used data files of any worker,
+	and a worker whose file was evicted by another one refills it on the next open.
+	"""
+
+	def __init__(self, directory: str, max_bytes: int, *, validate_after: float = 30.0) -> None:
+		self.directory = directory
+		self.max_bytes = max(0, max_bytes)
+		self.validate_after = validate_after
+		self.size = 0
+		self._entries: "OrderedDict[str, CachedObject]" = OrderedDict()
+		self._fills: Dict[str, asyncio.Future] = {}
+		self._load()
+
+	async def get(self, key: str, filler: CacheFiller) -> CachedObject:
+		entry = self._entries.get(key)
+		if entry is not None and time.time() - entry.validated_at < self.validate_after:
+			self._entries.move_to_end(key)
+			return entry
+
+		fill = self._fills.get(key)
+		if fill is None:
+			fill = asyncio.ensure_future(self._fill(key, entry, filler))
+			self._fills[key] = fill
+			fill.add_done_callback(lambda _: self._fills.pop(key, None))
+		# Shielded so one cancelled reader does not abort the download for the others.
+		return await asyncio.shield(fill)
+
+	async def open(self, key: str, filler: CacheFiller) -> Tuple[CachedObject, BinaryIO]:
+		"""Return the entry of key and its data file, opened for reading."""
+
+		entry = await self.get(key, filler)
+		try:
+			return entry, self._open_data(entry)
+		except FileNotFoundError:
+			# Evicted or invalidated (by this or another worker) since: forget it and fill again.
+			self._forget(key, entry)
+		entry = await self.get(key, filler)
+		return entry, self._open_data(entry)
+
+	def invalidate(self, key: str) -> None:
+		entry = self._entries.pop(key, None)
+		if entry is not None:
+			self._remove_files(entry)
+
+	async def _fill(self, key: str, current: Optional[CachedObject], filler: CacheFiller) -> CachedObject:
+		os.makedirs(self.directory, exist_ok=True)
+		fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=TEMP_SUFFIX)
+		os.close(fd)
+		try:
+			filled = await filler(key, current, tmp_path)
+			if filled is None:
+				current.validated_at = time.time()
+				self._entries.move_to_end(key)
+				return current
+
+			final_path = self._new_data_path(key)
+			os.replace(tmp_path, final_path)
+		finally:
+			if os.path.exists(tmp_path):
+				os.unlink(tmp_path)
+
+		entry = CachedObject(
+			key=key,
+			path=final_path,
+			size=filled.size,
+			etag=filled.etag,
+			content_type=filled.content_type,
+			metadata=filled.metadata,
+			validated_at=time.time(),
+		)
+		self._write_sidecar(entry)
+
+		previous = self._entries.pop(key, None)
+		if previous is not None:
+			self.size -= previous.size
+			self._remove_data(previous.path)
+		self._entries[key] = entry
+		self.size += entry.size
+		await self._evict(keep=entry.path)
+		return entry
+
+	async def _evict(self, keep: str) -> None:
+		# Scanning a large shared directory blocks, so the victims are chosen in a worker thread.
+		evicted = await asyncio.to_thread(self._evict_files, keep)
+		if not evicted:
+			return
+		for key, entry in list(self._entries.items()):
+			if entry.path in evicted:
+				del self._entries[key]
+				self.size -= entry.size
+				logger.debug("Objeto '%s' expulsado de la caché local", key)
+
+	def _evict_files(self, keep: str) -> Set[str]:
+		"""Delete the least recently used data files of the directory until it fits the budget.
+
+		The file at keep (the newest fill) always stays, even when it alone exceeds the budget.
+		"""
+
+		files: List[Tuple[float, int, str]] = []
+		total = 0
+		with os.scandir(self.directory) as scan:
+			for item in scan:
+				if not item.name.endswith(DATA_SUFFIX):
+					continue
+				try:
+					stat = item.stat()
+				except FileNotFoundError:
+					continue
+				files.append((stat.st_mtime, stat.st_size, item.path))
+				total += stat.st_size
+
+		evicted: Set[str] = set()
+		for _, size, path in sorted(files):
+			if total <= self.max_bytes:
+				break
+			if path == keep:
+				continue
+			self._remove_data(path)
+			self._remove_sidecar_of(path)
+			evicted.add(path)
+			total -= size
+		return evicted
+
+	def _load(self) -> None:
+		"""Rebuild the index from the sidecar files left by a previous process."""
+
+		if not os.path.isdir(self.directory):
+			return
+
+		entries = []
+		for name in os.listdir(self.directory):
+			path = os.path.join(self.directory, name)
+			if name.endswith(TEMP_SUFFIX):
+				self._remove_stale_temp(path)
+				continue
+			if not name.endswith(META_SUFFIX):
+				continue
+			try:
+				with open(path, "r", encoding="utf-8") as handle:
+					entry = CachedObject(**json.load(handle))
+				entries.append((os.path.getmtime(entry.path), entry))
+			except (OSError, ValueError, TypeError):
+				# Another worker sharing the directory may have removed it first.
+				self._remove_data(path)
+
+		for _, entry in sorted(entries, key=lambda item: item[0]):
+			# Revalidate everything restored from a previous run on first use.
+			entry.validated_at = 0.0
+			self._entries[entry.key] = entry
+			self.size += entry.size
+
+	def _open_data(self, entry: CachedObject) -> BinaryIO:
+		file = open(entry.path, "rb")
+		# The mtime orders eviction across workers, so a read marks the file as recently used.
+		os.utime(file.fileno())
+		self._entries.move_to_end(entry.key)
+		return file
+
+	def _forget(self, key: str, entry: CachedObject) -> None:
+		if self._entries.get(key) is entry:
+			del self._entries[key]
+			self.size -= entry.size
+
+	def _write_sidecar(self, entry: CachedObject) -> None:
+		fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=TEMP_SUFFIX)
+		with os.fdopen(fd, "w", encoding="utf-8") as handle:
+			json.dump(asdict(entry), handle)
+		os.replace(tmp_path, self._meta_path(entry.key))
+
+	def _remove_files(self, entry: CachedObject) -> None:
+		for path in (entry.path, self._meta_path(entry.key)):
+			self._remove_data(path)
+
+	@staticmethod
+	def _remove_data(path: str) -> None:
+		try:
+			os.unlink(path)
+		except FileNotFoundError:
+			pass
+
+	def _remove_sidecar_of(self, data_path: str) -> None:
+		meta_path = os.path.join(self.directory, os.path.basename(data_path).split(".", 1)[0] + META_SUFFIX)
+		try:
+			with open(meta_path, "r", encoding="utf-8") as handle:
+				current = json.load(handle).get("path")
+		except (OSError, ValueError):
+			return
+		# Another worker may already have written the sidecar of a newer fill.
+		if current == data_path:
+			self._remove_data(meta_path)
+
+	@staticmethod
+	def _remove_stale_temp(path: str) -> None:
+		try:
+			if time.time() - os.path.getmtime(path) > STALE_TEMP_AGE:
+				os.unlink(path)
+		except FileNotFoundError:
+			pass
+
+	def _new_data_path(self, key: str) -> str:
+		# Unique per fill: a data file is never rewritten while another worker may be reading it.
+		return os.path.join(self.directory, f"{self._digest(key)}.{uuid.uuid4().hex}{DATA_SUFFIX}")
+
+	def _meta_path(self, key: str) -> str:
+		return os.path.join(self.directory, self._digest(key) + META_SUFFIX)
+
+	@staticmethod
+	def _digest(key: str) -> str:
+		return hashlib.sha256(key.encode("utf-8")).hexdigest()
@@ -1,27 +1,96 @@
 from __future__ import annotations
 
 import asyncio
+import base64
+import hashlib
+import inspect
 import logging
+import os
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from functools import lru_cache
-from typing import Dict, Iterable, List, Optional
+from typing import Any, AsyncIterator, Awaitable, BinaryIO, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
 import boto3
-from botocore.client import Config
+from botocore.client import BaseClient, Config
 from botocore.exceptions import ClientError
 from fastapi import UploadFile
 
 from src.core.config import settings
+from src.services.compression import (
+	COMPRESSION_METADATA_KEY,
+	SUPPORTED_ENCODINGS,
+	UNCOMPRESSED_SIZE_METADATA_KEY,
+	StreamCompressor,
+	decompress_bytes,
+	decompress_chunks,
+	decompress_iter,
+	is_available,
+	matches_content_type,
+	parse_content_types,
+)
+from src.services.filesystem_storage import FilesystemStorageClient
+from src.services.listing_cache import ListingCache, ListingCacheStats
+from src.services.memory_storage import FaultProfile, MemoryStorageClient
+from src.services.object_cache import CachedObject, ObjectDiskCache
+from src.services.presign_cache import PresignCacheStats, PresignedUrlCache
+from src.services import checksums, storage_metrics
+from src.services.s3_async_client import AsyncS3Client, S3Presigner, SigV4Signer
+from src.services.storage_resilience import (
+	CircuitBreaker,
+	CircuitOpenError,
+	StorageRetryPolicy,
+	is_transient,
+	retry_after,
+)
+from src.services.storage_executor import StorageExecutorStats, StorageThreadPool
+from src.services.upload_sessions import UploadSession, UploadSessionStore
 
 logger = logging.getLogger(__name__)
 
+# S3/R2 reject multipart parts smaller than 5 MiB (except the last one).
+MIN_MULTIPART_PART_SIZE = 5 * 1024 * 1024
+# S3/R2 CopyObject handles sources up to 5 GiB; larger objects need a multipart copy.
+MAX_COPY_OBJECT_SIZE = 5 * 1024 * 1024 * 1024
+PRESIGNABLE_METHODS = {"get_object", "put_object"}
+READ_CHUNK_SIZE = 1024 * 1024
+# S3/R2 DeleteObjects accepts at most 1000 keys per request.
+MAX_DELETE_BATCH = 1000
+# Document IDs are UUID4, so their first hex digit spreads keys evenly across these shards.
+HEX_SHARDS = tuple("0123456789abcdef")
+# Operations that change what a listing returns; they invalidate the listing cache.
+LISTING_WRITE_OPERATIONS = {"put_object", "complete_multipart_upload", "copy_object", "delete_objects"}
+# Values of STORAGE_BACKEND; "r2" picks its client with R2_CLIENT_BACKEND.
+STORAGE_BACKENDS = {"r2", "filesystem", "memory"}
+# hashlib releases the GIL for large buffers, so big parts are hashed in a worker thread.
+HASH_OFFLOAD_THRESHOLD = 1024 * 1024
+
 
 class ObjectStorageError(Exception):
 	"""Custom exception for object storage operations."""
 
 
+class ObjectStorageNotFoundError(ObjectStorageError):
+	"""Raised when the requested object does not exist in the bucket."""
+
+
+class ObjectStorageInvalidRangeError(ObjectStorageError):
+	"""Raised when a requested byte range cannot be satisfied."""
+
+
+class ObjectStorageUnsupportedError(ObjectStorageError):
+	"""Raised when the configured storage backend cannot perform an operation (e.g. presigning)."""
+
+
+class ObjectStorageUnavailableError(ObjectStorageError):
+	"""Raised when R2 keeps throttling or failing, or the circuit breaker is open."""
+
+	def __init__(self, message: str, *, retry_after: float) -> None:
+		super().__init__(message)
+		self.retry_after = retry_after
+
+
 @dataclass(slots=True)
 class ObjectStorageUploadResult:
 	"""Metadata returned after uploading a file to object storage."""
@@ -31,6 +100,32 @@ class ObjectStorageUploadResult:
 	size: int
 	etag: Optional[str]
 	url: Optional[str]
+	resumed_parts: int = 0
+	sha256: Optional[str] = None
+	md5: Optional[str] = None
+	crc32c: Optional[str] = None
+	deduplicated: bool = False
+	# Bytes actually stored in the bucket; smaller than size when the upload was compressed.
+	stored_size: Optional[int] = None
+	content_encoding: Optional[str] = None
+	# Key holding the bytes when it differs from key (a deduplicated document's shared blob).
+	content_key: Optional[str] = None
+
+
+@dataclass(slots=True)
+class ObjectStorageDeleteResult:
+	"""Outcome of a bulk deletion: keys deleted and the error code of every key that was not."""
+
+	deleted: int = 0
+	errors: Dict[str, str] = field(default_factory=dict)
+
+	@property
+	def failed(self) -> int:
+		return len(self.errors)
+
+	def add(self, other: "ObjectStorageDeleteResult") -> None:
+		self.deleted += other.deleted
+		self.errors.update(other.errors)
 
 
 @dataclass(slots=True)
@@ -41,31 +136,126 @@ class ObjectStorageObject:
 	size: int
 	last_modified: Optional[datetime]
 	url: Optional[str]
+	etag: Optional[str] = None
+	content_type: Optional[str] = None
+	metadata: Dict[str, str] = field(default_factory=dict)
 
 	@property
 	def filename(self) -> str:
 		return self.key.split("/")[-1]
 
 
+@dataclass(slots=True)
+class ObjectStorageReader:
+	"""Read-only handle on an object materialized in the local disk cache."""
+
+	key: str
+	size: int
+	etag: Optional[str]
+	content_type: Optional[str]
+	metadata: Dict[str, str]
+	file: BinaryIO
+
+	async def read(self, size: int = -1) -> bytes:
+		return await asyncio.to_thread(self.file.read, size)
+
+	async def iter_chunks(self, chunk_size: int = READ_CHUNK_SIZE) -> AsyncIterator[bytes]:
+		while True:
+			chunk = await self.read(chunk_size)
+			if not chunk:
+				break
+			yield chunk
+
+	def close(self) -> None:
+		self.file.close()
+
+	async def __aenter__(self) -> "ObjectStorageReader":
+		return self
+
+	async def __aexit__(self, *exc_info: object) -> None:
+		self.close()
+
+
+@dataclass(slots=True)
+class ObjectStorageStream:
+	"""Response of a streamed (optionally ranged or conditional) object read."""
+
+	key: str
+	status: int
+	# None when the object is decompressed on the fly and its final length is unknown.
+	content_length: Optional[int]
+	etag: Optional[str]
+	content_type: Optional[str]
+	last_modified: Optional[datetime]
+	content_range: Optional[str]
+	metadata: Dict[str, str]
+	chunks: AsyncIterator[bytes]
+
+
 class ObjectStorageService:
-	"""Service layer for interacting with Cloudflare R2 (S3-compatible) storage."""
+	"""Service layer for interacting with Cloudflare R2 (S3-compatible) storage.
+
+	The bytes can also live in a local directory (STORAGE_BACKEND="filesystem"),
+	for single-node deployments and offline benchmarks, or in process memory with
+	injected latency and errors (STORAGE_BACKEND="memory") for load tests. Every
+	backend is a client implementing the subset of the boto3 S3 API used here,
+	either blocking (run on the storage thread pool) or with coroutine methods.
+	"""
 
 	def __init__(self) -> None:
 		self._validate_configuration()
 
-		self.bucket: str = settings.R2_BUCKET_NAME or ""
-		self.endpoint_url: str = self._resolve_endpoint_url()
+		local = settings.STORAGE_BACKEND != "r2"
+		self.backend: str = settings.STORAGE_BACKEND if local else settings.R2_CLIENT_BACKEND
+		self.bucket: str = settings.R2_BUCKET_NAME or ("local" if local else "")
+		self.endpoint_url: Optional[str] = None if local else self._resolve_endpoint_url()
 		self.public_base_url: Optional[str] = (
 			settings.R2_PUBLIC_BASE_URL.rstrip("/") if settings.R2_PUBLIC_BASE_URL else None
 		)
 
-		self.client = boto3.client(
-			"s3",
-			region_name="auto",
-			endpoint_url=self.endpoint_url,
-			aws_access_key_id=settings.R2_ACCESS_KEY_ID,
-			aws_secret_access_key=settings.R2_SECRET_ACCESS_KEY,
-			config=Config(signature_version="s3v4"),
+		self.upload_sessions = UploadSessionStore(settings.R2_UPLOAD_SESSION_DIR)
+		self.object_cache = ObjectDiskCache(
+			settings.OBJECT_CACHE_DIR,
+			settings.OBJECT_CACHE_MAX_BYTES,
+			validate_after=settings.OBJECT_CACHE_VALIDATE_AFTER,
+		)
+		self.listing_cache = ListingCache(settings.LIST_CACHE_TTL, settings.LIST_CACHE_GENERATION_PATH)
+		# Presigning is done in-process for both R2 clients: no client call, no thread hop.
+		# Local backends (filesystem, memory) have no URL to sign.
+		self.presigned_urls: Optional[PresignedUrlCache] = None
+		if self.endpoint_url is not None:
+			self.presigned_urls = PresignedUrlCache(
+				S3Presigner(
+					self.endpoint_url,
+					SigV4Signer(settings.R2_ACCESS_KEY_ID or "", settings.R2_SECRET_ACCESS_KEY or "", "auto"),
+				),
+				self.bucket,
+				window=settings.R2_PRESIGN_CACHE_WINDOW,
+				max_entries=settings.R2_PRESIGN_CACHE_MAX_ENTRIES,
+			)
+
+		self.compression: Optional[str] = (
+			None if settings.STORAGE_COMPRESSION == "none" else settings.STORAGE_COMPRESSION
+		)
+		self.compressible_types = parse_content_types(settings.STORAGE_COMPRESSION_CONTENT_TYPES)
+		self.checksum_algorithms = checksums.parse_algorithms(settings.STORAGE_UPLOAD_CHECKSUMS)
+
+		self.retry_policy = StorageRetryPolicy(
+			max_attempts=settings.R2_RETRY_MAX_ATTEMPTS,
+			base_delay=settings.R2_RETRY_BASE_DELAY,
+			max_delay=settings.R2_RETRY_MAX_DELAY,
+			budget_ratio=settings.R2_RETRY_BUDGET_RATIO,
+			budget_min_per_second=settings.R2_RETRY_BUDGET_MIN_PER_SECOND,
+			breaker=CircuitBreaker(settings.R2_CIRCUIT_FAILURE_THRESHOLD, settings.R2_CIRCUIT_RESET_TIMEOUT),
+			on_retry=storage_metrics.record_retry,
+		)
+
+		self.client = self._create_client()
+		# Blocking clients (boto3, filesystem) run on a dedicated pool sized like botocore's connection pool.
+		self.executor: Optional[StorageThreadPool] = (
+			None
+			if inspect.iscoroutinefunction(self.client.get_object)
+			else StorageThreadPool(settings.R2_MAX_POOL_CONNECTIONS)
 		)
 
 		logger.debug("ObjectStorageService initialized for bucket '%s'", self.bucket)
@@ -83,29 +273,626 @@ class ObjectStorageService:
 			raise ObjectStorageError("El archivo proporcionado no tiene nombre válido.")
 
 		key = destination_path or self.build_key(file.filename)
-		safe_metadata = self._prepare_metadata(metadata, original_filename=file.filename)
+		return await self._upload(file, key=key, metadata=metadata)
+
+	async def upload_content_addressed(
+		self,
+		file: UploadFile,
+		*,
+		prefix: str,
+		staging_key: str,
+		metadata: Optional[Dict[str, str]] = None,
+		on_digest: Optional[Callable[[str], Awaitable[None]]] = None,
+	) -> ObjectStorageUploadResult:
+		"""Store an UploadFile under `<prefix>/<sha256>` unless an identical blob already exists.
 
-		content = await file.read()
-		size = len(content)
+		Small files are hashed before the PUT, so duplicates are never sent. Large files
+		are streamed to `staging_key` (which keeps multipart uploads resumable) and then
+		copied server-side to their content address. on_digest is awaited with the
+		SHA-256 as soon as it is known, before checking whether the blob exists.
+		"""
 
-		if size == 0:
-			raise ObjectStorageError("El archivo está vacío. Nada que subir al bucket.")
+		if not file.filename:
+			raise ObjectStorageError("El archivo proporcionado no tiene nombre válido.")
 
-		content_type = file.content_type or "application/octet-stream"
+		return await self._upload(
+			file,
+			key=staging_key,
+			metadata=metadata,
+			content_prefix=prefix.strip("/"),
+			on_digest=on_digest,
+		)
+
+	async def list_objects(
+		self,
+		*,
+		prefix: Optional[str] = None,
+		max_keys: int = 1000,
+		use_cache: bool = True,
+	) -> List[ObjectStorageObject]:
+		"""List objects from the bucket, optionally filtered by prefix.
+
+		Listings may come from the listing cache, which workers on other hosts only
+		see go stale by its TTL; pass use_cache=False when acting on the result
+		(reference counts, deletions, existence checks) needs the bucket's current state.
+		"""
+		effective_max_keys = max(1, min(max_keys, 1000))
+		clean_prefix = prefix.strip("/") if prefix else None
+
+		if use_cache:
+			cached = self.listing_cache.get(clean_prefix or "", max_keys)
+			if cached is not None:
+				return cached
+		generation = self.listing_cache.generation()
+
+		objects: List[ObjectStorageObject] = []
+		async for page in self._iter_pages(clean_prefix, page_size=effective_max_keys):
+			objects.extend(page)
+			if len(objects) >= max_keys:
+				break
+
+		objects = objects[:max_keys]
+		self.listing_cache.put(clean_prefix or "", max_keys, objects, generation)
+		return objects
 
+	async def iter_objects(
+		self,
+		*,
+		prefix: str,
+		shards: Sequence[str] = HEX_SHARDS,
+		concurrency: Optional[int] = None,
+	) -> AsyncIterator[ObjectStorageObject]:
+		"""Yield every object under prefix, listing key ranges concurrently.
+
+		The keys after `prefix/` are split at each shard character into contiguous
+		ranges (so keys outside the shard alphabet are still listed) and up to
+		`concurrency` ranges are paged through at once. Objects are yielded as
+		pages arrive, so the order across shards is not sorted.
+		"""
+
+		clean_prefix = prefix.strip("/") + "/"
+		concurrency = max(1, concurrency or settings.R2_LIST_CONCURRENCY)
+		boundaries = [clean_prefix + shard for shard in sorted(shards)[1:]]
+		# Each range is (start_after, last_key): the boundary key itself belongs to the range before it.
+		ranges = list(zip([None, *boundaries], [*boundaries, None]))
+
+		pages: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+		slots = asyncio.Semaphore(concurrency)
+		finished = object()
+
+		async def list_range(start_after: Optional[str], last_key: Optional[str]) -> None:
+			try:
+				async with slots:
+					async for page in self._iter_pages(clean_prefix, start_after=start_after):
+						in_range = [obj for obj in page if last_key is None or obj.key <= last_key]
+						if in_range:
+							await pages.put(in_range)
+						if len(in_range) < len(page):
+							break
+			except Exception as exc:
+				await pages.put(exc)
+			else:
+				await pages.put(finished)
+
+		tasks = [asyncio.create_task(list_range(start, last)) for start, last in ranges]
 		try:
-			response = await asyncio.to_thread(
-				self.client.put_object,
+			remaining = len(tasks)
+			while remaining:
+				item = await pages.get()
+				if item is finished:
+					remaining -= 1
+				elif isinstance(item, Exception):
+					raise item
+				else:
+					for obj in item:
+						yield obj
+		finally:
+			for task in tasks:
+				task.cancel()
+			await asyncio.gather(*tasks, return_exceptions=True)
+
+	async def delete_objects(self, keys: Iterable[str]) -> ObjectStorageDeleteResult:
+		"""Delete multiple objects from the bucket, in batches of up to 1000 keys.
+
+		Keys R2 refuses to delete are reported in the result instead of raising.
+		"""
+
+		key_list = [key for key in keys if key]
+		if not key_list:
+			return ObjectStorageDeleteResult()
+
+		async def batches() -> AsyncIterator[List[str]]:
+			for start in range(0, len(key_list), MAX_DELETE_BATCH):
+				yield key_list[start : start + MAX_DELETE_BATCH]
+
+		result = await self._delete_batches(batches())
+		logger.info("Eliminados %d objetos del bucket R2 (%d fallidos)", result.deleted, result.failed)
+		return result
+
+	async def delete_prefix(self, prefix: str, *, concurrency: Optional[int] = None) -> ObjectStorageDeleteResult:
+		"""Delete all objects under a given prefix.
+
+		Listing is pipelined with deletion: the next page is fetched while up to
+		`concurrency` batches of the previous ones are being deleted.
+		"""
+
+		normalized_prefix = prefix.strip("/")
+		if not normalized_prefix:
+			raise ObjectStorageError("El prefijo proporcionado no es válido.")
+
+		async def batches() -> AsyncIterator[List[str]]:
+			# Continuation tokens point past the last key listed, so deleting
+			# earlier pages meanwhile does not make the listing skip keys.
+			async for page in self._iter_pages(normalized_prefix, page_size=MAX_DELETE_BATCH):
+				if page:
+					yield [obj.key for obj in page]
+
+		result = await self._delete_batches(batches(), concurrency=concurrency)
+		logger.info(
+			"Eliminados %d objetos con el prefijo '%s' (%d fallidos)",
+			result.deleted,
+			normalized_prefix,
+			result.failed,
+		)
+		return result
+
+	async def generate_presigned_url(
+		self,
+		key: str,
+		expires_in: int = 3600,
+		*,
+		client_method: str = "get_object",
+	) -> str:
+		"""Generate a temporary signed URL for a given object key.
+
+		`client_method` selects the operation the URL authorizes: "get_object" to
+		download, or "put_object" to let a client upload the object directly.
+		"""
+
+		if client_method not in PRESIGNABLE_METHODS:
+			raise ObjectStorageError(f"Operación no soportada para URL presignada: '{client_method}'.")
+		if self.presigned_urls is None:
+			raise self._presign_unsupported()
+
+		with storage_metrics.track("presign"):
+			if client_method == "put_object":
+				# Upload URLs are issued once per new key; caching them would only evict download URLs.
+				return self.presigned_urls.presigner.presign_url(client_method, self.bucket, key, expires_in)
+			return self.presigned_urls.get(key, expires_in)
+
+	async def generate_presigned_urls(self, keys: Iterable[str], expires_in: int = 3600) -> Dict[str, str]:
+		"""Generate download URLs for a batch of keys (e.g. a listing page) in one call.
+
+		URLs come from the presign cache while they still have most of their validity left.
+		Backends without URLs (filesystem) return an empty mapping.
+		"""
+
+		if self.presigned_urls is None:
+			return {}
+		with storage_metrics.track("presign"):
+			return self.presigned_urls.get_many(keys, expires_in)
+
+	async def generate_presigned_post(
+		self,
+		key: str,
+		*,
+		expires_in: int = 3600,
+		max_size: int,
+		content_type: Optional[str] = None,
+	) -> Dict[str, Any]:
+		"""Generate a presigned POST policy restricted to key, returning its url and form fields."""
+
+		if self.presigned_urls is None:
+			raise self._presign_unsupported()
+
+		prefix = key.rsplit("/", 1)[0] + "/" if "/" in key else ""
+		fields: Dict[str, str] = {}
+		conditions: List[Any] = [
+			["starts-with", "$key", prefix],
+			["content-length-range", 1, max_size],
+		]
+		if content_type:
+			fields["Content-Type"] = content_type
+			conditions.append({"Content-Type": content_type})
+
+		try:
+			return await self._call(
+				"generate_presigned_post",
+				Bucket=self.bucket,
+				Key=key,
+				Fields=fields,
+				Conditions=conditions,
+				ExpiresIn=expires_in,
+			)
+		except ClientError as exc:
+			logger.exception("No se pudo generar la política POST presignada para '%s'", key)
+			raise ObjectStorageError(str(exc)) from exc
+
+	async def head_object(self, key: str) -> Optional[ObjectStorageObject]:
+		"""Return the metadata of an object, or None if it does not exist."""
+
+		try:
+			response = await self._call("head_object", Bucket=self.bucket, Key=key)
+		except ClientError as exc:
+			if self._error_code(exc) in {"404", "NoSuchKey", "NotFound"}:
+				return None
+			logger.exception("No se pudo consultar el objeto '%s'", key)
+			raise ObjectStorageError(str(exc)) from exc
+
+		return ObjectStorageObject(
+			key=key,
+			size=response.get("ContentLength", 0),
+			last_modified=response.get("LastModified"),
+			url=self._build_public_url(key),
+			etag=response.get("ETag"),
+			content_type=response.get("ContentType"),
+			metadata=response.get("Metadata") or {},
+		)
+
+	async def put_object(
+		self,
+		key: str,
+		body: bytes,
+		*,
+		content_type: str = "application/octet-stream",
+		metadata: Optional[Dict[str, str]] = None,
+	) -> Optional[str]:
+		"""Store a small in-memory payload and return its ETag."""
+
+		try:
+			response = await self._call(
+				"put_object",
 				Bucket=self.bucket,
 				Key=key,
-				Body=content,
+				Body=body,
 				ContentType=content_type,
-				Metadata=safe_metadata,
+				Metadata=self._prepare_metadata(metadata),
 			)
 		except ClientError as exc:
-			logger.exception("Error subiendo archivo '%s' al bucket.", key)
+			logger.exception("Error guardando el objeto '%s' en el bucket.", key)
 			raise ObjectStorageError(str(exc)) from exc
 
+		return response.get("ETag")
+
+	async def open_object(self, key: str) -> ObjectStorageReader:
+		"""Open an object for reading through the local disk cache.
+
+		The object is downloaded once into the cache (concurrent readers share the
+		download) and revalidated against its ETag before being served again.
+		"""
+
+		entry, file = await self.object_cache.open(key, self._download_to_cache)
+		return ObjectStorageReader(
+			key=key,
+			size=entry.size,
+			etag=entry.etag,
+			content_type=entry.content_type,
+			metadata=entry.metadata,
+			file=file,
+		)
+
+	async def get_object(self, key: str, *, chunk_size: int = READ_CHUNK_SIZE) -> AsyncIterator[bytes]:
+		"""Stream an object's content in chunks, served from the local disk cache."""
+
+		async with await self.open_object(key) as reader:
+			async for chunk in reader.iter_chunks(chunk_size):
+				yield chunk
+
+	async def stream_object(
+		self,
+		key: str,
+		*,
+		byte_range: Optional[str] = None,
+		if_none_match: Optional[str] = None,
+		chunk_size: int = READ_CHUNK_SIZE,
+	) -> ObjectStorageStream:
+		"""Stream an object straight from the bucket without buffering it.
+
+		`byte_range` is an HTTP Range value (e.g. "bytes=0-1023") forwarded to R2, and
+		`if_none_match` an ETag; a match yields a 304 stream without body.
+		"""
+
+		request_params: Dict[str, Any] = {"Bucket": self.bucket, "Key": key}
+		if byte_range:
+			request_params["Range"] = byte_range
+		if if_none_match:
+			request_params["IfNoneMatch"] = if_none_match
+
+		try:
+			response = await self._call("get_object", **request_params)
+			encoding = self._content_encoding(response)
+			if encoding and byte_range:
+				# A range would address the compressed bytes; send the whole document instead.
+				response["Body"].close()
+				del request_params["Range"]
+				response = await self._call("get_object", **request_params)
+		except ClientError as exc:
+			code = self._error_code(exc)
+			if code in {"304", "NotModified"}:
+				return ObjectStorageStream(
+					key=key,
+					status=304,
+					content_length=0,
+					etag=if_none_match,
+					content_type=None,
+					last_modified=None,
+					content_range=None,
+					metadata={},
+					chunks=self._empty_chunks(),
+				)
+			if code in {"404", "NoSuchKey", "NotFound"}:
+				raise ObjectStorageNotFoundError(f"El objeto '{key}' no existe.") from exc
+			if code in {"416", "InvalidRange"}:
+				raise ObjectStorageInvalidRangeError(f"Rango no válido para '{key}': {byte_range}") from exc
+			logger.exception("No se pudo leer el objeto '%s'", key)
+			raise ObjectStorageError(str(exc)) from exc
+
+		chunks = self._iter_body(response["Body"], chunk_size)
+		if encoding:
+			chunks = decompress_chunks(chunks, encoding)
+
+		return ObjectStorageStream(
+			key=key,
+			status=206 if response.get("ContentRange") else 200,
+			content_length=None if encoding else response.get("ContentLength", 0),
+			etag=response.get("ETag"),
+			content_type=response.get("ContentType"),
+			last_modified=response.get("LastModified"),
+			content_range=response.get("ContentRange"),
+			metadata=response.get("Metadata") or {},
+			chunks=chunks,
+		)
+
+	async def read_object(self, key: str) -> bytes:
+		"""Read a whole (small) object into memory."""
+
+		try:
+			response = await self._call("get_object", Bucket=self.bucket, Key=key)
+			body = response["Body"]
+			if self.executor is None:
+				content = await body.read()
+			else:
+				content = await self.executor.run(body.read)
+		except ClientError as exc:
+			logger.exception("No se pudo leer el objeto '%s'", key)
+			raise ObjectStorageError(str(exc)) from exc
+
+		encoding = self._content_encoding(response)
+		return decompress_bytes(content, encoding) if encoding else content
+
+	async def copy_object(
+		self,
+		source_key: str,
+		destination_key: str,
+		*,
+		size: int,
+		metadata: Optional[Dict[str, str]] = None,
+	) -> Optional[str]:
+		"""Copy an object inside the bucket without moving its bytes through this process.
+
+		Entries of metadata are added to the source's user metadata on the copy.
+		"""
+
+		copy_source = {"Bucket": self.bucket, "Key": source_key}
+		source = None
+		# Replacing the metadata also replaces the content headers, so they are read first.
+		if metadata or size > MAX_COPY_OBJECT_SIZE:
+			source = await self.head_object(source_key)
+			if source is None:
+				raise ObjectStorageError(f"El objeto de origen '{source_key}' no existe.")
+		encoding = source.metadata.get(COMPRESSION_METADATA_KEY) if source is not None else None
+
+		try:
+			if size <= MAX_COPY_OBJECT_SIZE:
+				replace_params: Dict[str, Any] = {}
+				if source is not None:
+					replace_params = {
+						"MetadataDirective": "REPLACE",
+						"Metadata": {**source.metadata, **metadata},
+						"ContentType": source.content_type or "application/octet-stream",
+						**({"ContentEncoding": encoding} if encoding else {}),
+					}
+				response = await self._call(
+					"copy_object",
+					Bucket=self.bucket,
+					Key=destination_key,
+					CopySource=copy_source,
+					**replace_params,
+				)
+				return response["CopyObjectResult"].get("ETag")
+		except ClientError as exc:
+			logger.exception("No se pudo copiar '%s' a '%s'", source_key, destination_key)
+			raise ObjectStorageError(str(exc)) from exc
+
+		part_size = MAX_COPY_OBJECT_SIZE // 10
+
+		try:
+			created = await self._call(
+				"create_multipart_upload",
+				Bucket=self.bucket,
+				Key=destination_key,
+				ContentType=source.content_type or "application/octet-stream",
+				Metadata={**source.metadata, **(metadata or {})},
+				**({"ContentEncoding": encoding} if encoding else {}),
+			)
+			upload_id = created["UploadId"]
+		except ClientError as exc:
+			logger.exception("No se pudo iniciar la copia multiparte de '%s'", source_key)
+			raise ObjectStorageError(str(exc)) from exc
+
+		try:
+			completed_parts = []
+			for part_number, start in enumerate(range(0, size, part_size), start=1):
+				byte_range = f"bytes={start}-{min(start + part_size, size) - 1}"
+				part = await self._call(
+					"upload_part_copy",
+					Bucket=self.bucket,
+					Key=destination_key,
+					UploadId=upload_id,
+					PartNumber=part_number,
+					CopySource=copy_source,
+					CopySourceRange=byte_range,
+				)
+				completed_parts.append({"PartNumber": part_number, "ETag": part["CopyPartResult"]["ETag"]})
+
+			response = await self._complete_multipart_upload(destination_key, upload_id, completed_parts)
+		except BaseException as exc:
+			await self._abort_multipart_upload(destination_key, upload_id)
+			if isinstance(exc, ClientError):
+				logger.exception("Error copiando '%s' a '%s'", source_key, destination_key)
+				raise ObjectStorageError(str(exc)) from exc
+			raise
+
+		return response.get("ETag")
+
+	async def close(self) -> None:
+		"""Release network resources held by the underlying client."""
+
+		if self.executor is None:
+			await self.client.close()
+		else:
+			self.executor.shutdown()
+			if isinstance(self.client, FilesystemStorageClient):
+				self.client.close()
+
+	def executor_stats(self) -> Optional[StorageExecutorStats]:
+		"""Return counters of the storage thread pool, or None for the native asyncio client."""
+
+		return self.executor.stats() if self.executor is not None else None
+
+	def listing_cache_stats(self) -> ListingCacheStats:
+		"""Return hit/miss counters of the list_objects cache."""
+
+		return self.listing_cache.stats()
+
+	def circuit_state(self) -> str:
+		"""State of the circuit breaker in front of R2: closed, open or half_open."""
+
+		return self.retry_policy.breaker.state
+
+	def presign_cache_stats(self) -> PresignCacheStats:
+		"""Return hit/miss counters of the presigned URL cache."""
+
+		if self.presigned_urls is None:
+			return PresignCacheStats(entries=0, hits=0, misses=0)
+		return self.presigned_urls.stats()
+
+	def build_key(self, filename: str, prefix: Optional[str] = None) -> str:
+		"""Build a storage key applying optional prefix and sanitizing the filename."""
+
+		safe_name = self._sanitize_filename(filename)
+		if prefix:
+			clean_prefix = prefix.strip("/")
+			return f"{clean_prefix}/{safe_name}"
+		return safe_name
+
+	def build_public_url(self, key: str) -> Optional[str]:
+		"""Return the public URL of a key when R2_PUBLIC_BASE_URL is configured."""
+
+		return self._build_public_url(key)
+
+	async def _upload(
+		self,
+		file: UploadFile,
+		*,
+		key: str,
+		metadata: Optional[Dict[str, str]],
+		content_prefix: Optional[str] = None,
+		on_digest: Optional[Callable[[str], Awaitable[None]]] = None,
+	) -> ObjectStorageUploadResult:
+		safe_metadata = self._prepare_metadata(metadata, original_filename=file.filename)
+		content_type = file.content_type or "application/octet-stream"
+		part_size = max(settings.R2_MULTIPART_PART_SIZE, MIN_MULTIPART_PART_SIZE)
+		# Every digest is computed in the same pass that streams the file to the bucket.
+		digests = checksums.StreamDigests(self.checksum_algorithms)
+		chunks = self._hash_parts(self._iter_file_parts(file, part_size), digests)
+
+		compressor = self._compressor_for(content_type)
+		encoding_params: Dict[str, str] = {}
+		if compressor is not None:
+			# The digests cover the original bytes, so dedupe does not depend on the codec.
+			chunks = compressor.compress_parts(chunks, part_size)
+			safe_metadata[COMPRESSION_METADATA_KEY] = compressor.encoding
+			encoding_params["ContentEncoding"] = compressor.encoding
+
+		# Buffer up to the threshold: small files keep the single PUT fast path.
+		buffered: List[bytes] = []
+		buffered_size = 0
+		async for chunk in chunks:
+			buffered.append(chunk)
+			buffered_size += len(chunk)
+			if buffered_size > settings.R2_MULTIPART_THRESHOLD:
+				break
+
+		if buffered_size == 0 or (compressor is not None and compressor.bytes_in == 0):
+			raise ObjectStorageError("El archivo está vacío. Nada que subir al bucket.")
+
+		resumed_parts = 0
+		deduplicated = False
+		if buffered_size <= settings.R2_MULTIPART_THRESHOLD:
+			size = buffered_size
+			sha256 = digests.sha256
+			existing = None
+			if content_prefix:
+				key = f"{content_prefix}/{sha256}"
+				if on_digest is not None:
+					await on_digest(sha256)
+				existing = await self.head_object(key)
+
+			if existing is not None:
+				deduplicated = True
+				etag = existing.etag
+			else:
+				body = b"".join(buffered)
+				# R2 rejects the PUT with BadDigest if the bytes it received differ.
+				body_md5 = None
+				if digests.md5 is not None:
+					body_md5 = checksums.content_md5(body) if compressor else digests.content_md5
+				if compressor is not None:
+					# A listing reports the stored size; this keeps the original one recoverable.
+					safe_metadata[UNCOMPRESSED_SIZE_METADATA_KEY] = str(compressor.bytes_in)
+				try:
+					response = await self._call(
+						"put_object",
+						Bucket=self.bucket,
+						Key=key,
+						Body=body,
+						ContentType=content_type,
+						Metadata={**safe_metadata, **digests.metadata()},
+						**encoding_params,
+						**({"ContentMD5": body_md5} if body_md5 else {}),
+					)
+				except ClientError as exc:
+					logger.exception("Error subiendo archivo '%s' al bucket.", key)
+					raise ObjectStorageError(str(exc)) from exc
+				etag = response.get("ETag")
+		else:
+			response, size, resumed_parts = await self._multipart_upload(
+				key,
+				self._chain_parts(buffered, chunks),
+				content_type=content_type,
+				metadata=safe_metadata,
+				part_size=part_size,
+				content_encoding=compressor.encoding if compressor else None,
+				content_md5=digests.md5 is not None,
+			)
+			etag = response.get("ETag")
+			sha256 = digests.sha256
+
+			if content_prefix:
+				staging_key = key
+				key = f"{content_prefix}/{sha256}"
+				if on_digest is not None:
+					await on_digest(sha256)
+				existing = await self.head_object(key)
+				if existing is not None:
+					deduplicated = True
+					etag = existing.etag
+				else:
+					# The digests are only known now; the copy to the content address records them.
+					etag = await self.copy_object(staging_key, key, size=size, metadata=digests.metadata())
+				await self.delete_objects([staging_key])
+
 		try:
 			await file.seek(0)
 		except Exception:
@@ -115,133 +902,527 @@ class ObjectStorageService:
 		upload_result = ObjectStorageUploadResult(
 			key=key,
 			bucket=self.bucket,
-			size=size,
-			etag=response.get("ETag"),
+			size=compressor.bytes_in if compressor else size,
+			etag=etag,
 			url=self._build_public_url(key),
+			resumed_parts=resumed_parts,
+			sha256=sha256,
+			md5=digests.md5,
+			crc32c=digests.crc32c,
+			deduplicated=deduplicated,
+			stored_size=size,
+			content_encoding=compressor.encoding if compressor else None,
 		)
 
-		logger.info(
-			"Archivo '%s' subido correctamente a R2 (bucket=%s, size=%s bytes)",
-			key,
-			self.bucket,
-			size,
-		)
+		if deduplicated:
+			logger.info("Archivo '%s' ya existía en R2 (sha256=%s); no se almacena de nuevo", key, sha256)
+		else:
+			logger.info(
+				"Archivo '%s' subido correctamente a R2 (bucket=%s, size=%s bytes)",
+				key,
+				self.bucket,
+				size,
+			)
+		if compressor is not None:
+			logger.debug(
+				"Archivo '%s' comprimido con %s: %d -> %d bytes",
+				key,
+				compressor.encoding,
+				compressor.bytes_in,
+				size,
+			)
 
 		return upload_result
 
-	async def list_objects(
+	def _create_client(self) -> Union[BaseClient, AsyncS3Client, FilesystemStorageClient, MemoryStorageClient]:
+		if self.backend == "filesystem":
+			return FilesystemStorageClient(settings.STORAGE_FILESYSTEM_PATH, self.bucket)
+
+		if self.backend == "memory":
+			try:
+				faults = FaultProfile.parse(
+					settings.STORAGE_MEMORY_LATENCY,
+					settings.STORAGE_MEMORY_ERROR_RATES,
+					settings.STORAGE_MEMORY_BANDWIDTH,
+				)
+			except ValueError as exc:
+				raise ObjectStorageError(f"Configuración no válida del backend 'memory': {exc}") from exc
+			return MemoryStorageClient(self.bucket, faults, seed=settings.STORAGE_MEMORY_SEED)
+
+		if self.backend == "aiohttp":
+			return AsyncS3Client(
+				endpoint_url=self.endpoint_url,
+				access_key=settings.R2_ACCESS_KEY_ID or "",
+				secret_key=settings.R2_SECRET_ACCESS_KEY or "",
+				max_connections=settings.R2_MAX_POOL_CONNECTIONS,
+			)
+
+		return boto3.client(
+			"s3",
+			region_name="auto",
+			endpoint_url=self.endpoint_url,
+			aws_access_key_id=settings.R2_ACCESS_KEY_ID,
+			aws_secret_access_key=settings.R2_SECRET_ACCESS_KEY,
+			config=Config(
+				signature_version="s3v4",
+				max_pool_connections=settings.R2_MAX_POOL_CONNECTIONS,
+				# Retries are done by retry_policy, which adds budgets and a circuit breaker.
+				retries={"total_max_attempts": 1},
+			),
+		)
+
+	async def _call(self, operation: str, **params: Any) -> Any:
+		"""Invoke an S3 operation on the configured client without blocking the event loop."""
+
+		try:
+			return await self.retry_policy.call(operation, lambda: self._invoke(operation, params))
+		except CircuitOpenError as exc:
+			raise ObjectStorageUnavailableError(
+				"El almacenamiento no está disponible temporalmente.", retry_after=exc.retry_after
+			) from exc
+		except Exception as exc:
+			if not is_transient(exc):
+				raise
+			logger.warning("R2 sigue sin responder a '%s' tras los reintentos: %s", operation, exc)
+			raise ObjectStorageUnavailableError(
+				str(exc), retry_after=retry_after(exc) or settings.R2_RETRY_MAX_DELAY
+			) from exc
+		finally:
+			# Also on failure: a failed batch delete may still have removed some keys.
+			if operation in LISTING_WRITE_OPERATIONS:
+				self.listing_cache.invalidate(self._written_keys(operation, params))
+
+	async def _invoke(self, operation: str, params: Dict[str, Any]) -> Any:
+		"""One attempt of an S3 operation, measured for /metrics."""
+
+		with storage_metrics.track(operation, sent=storage_metrics.payload_size(params)) as received:
+			if self.executor is None:
+				response = await getattr(self.client, operation)(**params)
+			else:
+				response = await self.executor.run(getattr(self.client, operation), **params)
+			received(response)
+			return response
+
+	async def _delete_batches(
 		self,
+		batches: AsyncIterator[List[str]],
 		*,
-		prefix: Optional[str] = None,
-		max_keys: int = 1000,
-	) -> List[ObjectStorageObject]:
-		"""List objects from the bucket, optionally filtered by prefix."""
-		effective_max_keys = max(1, min(max_keys, 1000))
-		clean_prefix = prefix.strip("/") if prefix else None
+		concurrency: Optional[int] = None,
+	) -> ObjectStorageDeleteResult:
+		"""Delete batches of keys as they are produced, with up to `concurrency` requests in flight."""
 
-		objects: List[ObjectStorageObject] = []
-		continuation_token: Optional[str] = None
+		slots = asyncio.Semaphore(max(1, concurrency or settings.R2_DELETE_CONCURRENCY))
+		pending: List[asyncio.Task] = []
+		result = ObjectStorageDeleteResult()
 
-		while True:
-			request_params = {"Bucket": self.bucket, "MaxKeys": effective_max_keys}
-			if clean_prefix:
-				request_params["Prefix"] = clean_prefix
-			if continuation_token:
-				request_params["ContinuationToken"] = continuation_token
+		async def delete_batch(keys: List[str]) -> None:
+			try:
+				result.add(await self._delete_batch(keys))
+			finally:
+				slots.release()
+
+		try:
+			async for keys in batches:
+				# Waiting for a slot before pulling the next batch bounds memory and backs off the lister.
+				await slots.acquire()
+				pending.append(asyncio.create_task(delete_batch(keys)))
+			await asyncio.gather(*pending)
+		except BaseException as exc:
+			if isinstance(exc, asyncio.CancelledError):
+				for task in pending:
+					task.cancel()
+			# Otherwise let the batches already sent finish before raising.
+			await asyncio.gather(*pending, return_exceptions=True)
+			raise
+
+		return result
+
+	async def _delete_batch(self, keys: List[str]) -> ObjectStorageDeleteResult:
+		try:
+			response = await self._call(
+				"delete_objects",
+				Bucket=self.bucket,
+				Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},
+			)
+		except ClientError as exc:
+			code = self._error_code(exc) or "ClientError"
+			logger.error("No se pudo eliminar un lote de %d objetos: %s", len(keys), exc)
+			return ObjectStorageDeleteResult(errors={key: code for key in keys})
+
+		# In quiet mode only the keys that could not be deleted are listed.
+		errors = {item["Key"]: item.get("Code") or "Unknown" for item in response.get("Errors", [])}
+		for key in keys:
+			if key not in errors:
+				self.object_cache.invalidate(key)
+		if errors:
+			logger.warning("%d objetos no se pudieron eliminar, p. ej. '%s'", len(errors), next(iter(errors)))
+		return ObjectStorageDeleteResult(deleted=len(keys) - len(errors), errors=errors)
+
+	async def _iter_pages(
+		self,
+		prefix: Optional[str],
+		*,
+		page_size: int = 1000,
+		start_after: Optional[str] = None,
+	) -> AsyncIterator[List[ObjectStorageObject]]:
+		"""Walk the continuation tokens of a listing, one page at a time."""
 
+		request_params: Dict[str, Any] = {"Bucket": self.bucket, "MaxKeys": page_size}
+		if prefix:
+			request_params["Prefix"] = prefix
+		if start_after:
+			request_params["StartAfter"] = start_after
+
+		while True:
 			try:
-				response = await asyncio.to_thread(self.client.list_objects_v2, **request_params)
+				response = await self._call("list_objects_v2", **request_params)
 			except ClientError as exc:
 				logger.exception("No se pudo listar objetos con el prefijo '%s'", prefix)
 				raise ObjectStorageError(str(exc)) from exc
 
-			for item in response.get("Contents", []):
-				key = item["Key"]
-				objects.append(
-					ObjectStorageObject(
-						key=key,
-						size=item.get("Size", 0),
-						last_modified=item.get("LastModified"),
-						url=self._build_public_url(key),
-					)
+			yield [
+				ObjectStorageObject(
+					key=item["Key"],
+					size=item.get("Size", 0),
+					last_modified=item.get("LastModified"),
+					url=self._build_public_url(item["Key"]),
+					etag=item.get("ETag"),
 				)
+				for item in response.get("Contents", [])
+			]
 
-			if not response.get("IsTruncated") or len(objects) >= max_keys:
+			if not response.get("IsTruncated"):
 				break
+			request_params["ContinuationToken"] = response.get("NextContinuationToken")
 
-			continuation_token = response.get("NextContinuationToken")
-
-		return objects[:max_keys]
+	@staticmethod
+	def _written_keys(operation: str, params: Dict[str, Any]) -> List[str]:
+		if operation == "delete_objects":
+			return [item["Key"] for item in params["Delete"]["Objects"]]
+		return [params["Key"]]
 
-	async def delete_objects(self, keys: Iterable[str]) -> int:
-		"""Delete multiple objects from the bucket."""
+	async def _download_to_cache(
+		self, key: str, cached: Optional[CachedObject], path: str
+	) -> Optional[CachedObject]:
+		"""Cache filler: download key into path unless the cached copy's ETag is still current."""
 
-		key_list = [key for key in keys if key]
-		if not key_list:
-			return 0
+		request_params: Dict[str, Any] = {"Bucket": self.bucket, "Key": key}
+		if cached is not None and cached.etag:
+			request_params["IfNoneMatch"] = cached.etag
 
-		delete_payload = {"Objects": [{"Key": key} for key in key_list], "Quiet": True}
+		try:
+			response = await self._call("get_object", **request_params)
+		except ClientError as exc:
+			code = self._error_code(exc)
+			if cached is not None and code in {"304", "NotModified"}:
+				return None
+			if code in {"404", "NoSuchKey", "NotFound"}:
+				self.object_cache.invalidate(key)
+				raise ObjectStorageNotFoundError(f"El objeto '{key}' no existe.") from exc
+			logger.exception("No se pudo descargar el objeto '%s'", key)
+			raise ObjectStorageError(str(exc)) from exc
 
+		body = response["Body"]
+		# Compressed objects are cached decompressed, so readers get the original bytes.
+		encoding = self._content_encoding(response)
 		try:
-			await asyncio.to_thread(
-				self.client.delete_objects,
-				Bucket=self.bucket,
-				Delete=delete_payload,
-			)
+			if self.executor is None:
+				chunks = body.iter_chunks(READ_CHUNK_SIZE)
+				if encoding:
+					chunks = decompress_chunks(chunks, encoding)
+				with open(path, "wb") as handle:
+					async for chunk in chunks:
+						handle.write(chunk)
+			else:
+				await self.executor.run(self._write_body, body, path, encoding)
 		except ClientError as exc:
-			logger.exception("No se pudieron eliminar los objetos: %s", key_list)
+			logger.exception("Error descargando el objeto '%s'", key)
 			raise ObjectStorageError(str(exc)) from exc
 
-		logger.info("Eliminados %d objetos del bucket R2", len(key_list))
-		return len(key_list)
+		return CachedObject(
+			key=key,
+			path=path,
+			size=os.path.getsize(path),
+			etag=response.get("ETag"),
+			content_type=response.get("ContentType"),
+			metadata=response.get("Metadata") or {},
+			validated_at=0.0,
+		)
 
-	async def delete_prefix(self, prefix: str) -> int:
-		"""Delete all objects under a given prefix."""
+	async def _iter_body(self, body: Any, chunk_size: int) -> AsyncIterator[bytes]:
+		if self.executor is None:
+			async for chunk in body.iter_chunks(chunk_size):
+				yield chunk
+			return
 
-		normalized_prefix = prefix.strip("/")
-		if not normalized_prefix:
-			raise ObjectStorageError("El prefijo proporcionado no es válido.")
+		try:
+			while True:
+				chunk = await self.executor.run(body.read, chunk_size)
+				if not chunk:
+					break
+				yield chunk
+		finally:
+			body.close()
 
-		total_deleted = 0
+	@staticmethod
+	async def _empty_chunks() -> AsyncIterator[bytes]:
+		return
+		yield
 
-		while True:
-			objects = await self.list_objects(prefix=normalized_prefix, max_keys=1000)
-			if not objects:
-				break
+	@staticmethod
+	def _write_body(body: Any, path: str, encoding: Optional[str] = None) -> None:
+		chunks = body.iter_chunks(READ_CHUNK_SIZE)
+		if encoding:
+			chunks = decompress_iter(chunks, encoding)
+		with open(path, "wb") as handle:
+			for chunk in chunks:
+				handle.write(chunk)
+
+	async def _multipart_upload(
+		self,
+		key: str,
+		parts: AsyncIterator[bytes],
+		*,
+		content_type: str,
+		metadata: Dict[str, str],
+		part_size: int,
+		content_encoding: Optional[str] = None,
+		content_md5: bool = False,
+	) -> Tuple[Dict[str, str], int, int]:
+		"""Upload a stream of parts concurrently as an S3 multipart upload.
+
+		The upload ID and the ETag of every finished part are persisted, so if the
+		same key is uploaded again after an interruption the parts already stored
+		in R2 are skipped and the upload resumes from the first missing part.
+		With content_md5, every part is sent with its Content-MD5 so R2 verifies it.
+		Returns the completion response, the total size and the number of reused parts.
+		"""
+
+		session = await self._resume_upload_session(key, part_size)
+		if session is None:
+			try:
+				created = await self._call(
+					"create_multipart_upload",
+					Bucket=self.bucket,
+					Key=key,
+					ContentType=content_type,
+					Metadata=metadata,
+					**({"ContentEncoding": content_encoding} if content_encoding else {}),
+				)
+			except ClientError as exc:
+				logger.exception("No se pudo iniciar la subida multiparte de '%s'.", key)
+				raise ObjectStorageError(str(exc)) from exc
 
-			total_deleted += await self.delete_objects(obj.key for obj in objects)
+			session = UploadSession(key=key, upload_id=created["UploadId"], part_size=part_size)
+			self.upload_sessions.save(session)
 
-			if len(objects) < 1000:
-				break
+		concurrency = max(1, settings.R2_MULTIPART_CONCURRENCY)
+		slots = asyncio.Semaphore(concurrency)
+		pending: List[asyncio.Task] = []
+		reused_parts = 0
+		size = 0
+
+		async def send_part(part_number: int, body: bytes, md5: Optional[bytes]) -> None:
+			try:
+				part = await self._call(
+					"upload_part",
+					Bucket=self.bucket,
+					Key=key,
+					UploadId=session.upload_id,
+					PartNumber=part_number,
+					Body=body,
+					**({"ContentMD5": base64.b64encode(md5).decode("ascii")} if md5 else {}),
+				)
+				session.parts[part_number] = part["ETag"]
+				self.upload_sessions.save(session)
+			finally:
+				slots.release()
+
+		try:
+			part_number = 0
+			async for body in parts:
+				part_number += 1
+				size += len(body)
+
+				stored_etag = session.parts.get(part_number)
+				md5 = None
+				if content_md5 or stored_etag:
+					# One hash serves both the resume check and the part's Content-MD5.
+					md5 = (await asyncio.to_thread(hashlib.md5, body)).digest()
+				if stored_etag and stored_etag.strip('"') == md5.hex():
+					reused_parts += 1
+					continue
+
+				# Waiting for a free slot before reading on keeps memory at concurrency * part_size.
+				await slots.acquire()
+				for task in pending:
+					# exception() of a cancelled part raises CancelledError, hiding the real failure;
+					# cancelled parts still fail the upload in the gather below.
+					if task.done() and not task.cancelled() and task.exception() is not None:
+						slots.release()
+						raise task.exception()
+				pending.append(asyncio.create_task(send_part(part_number, body, md5 if content_md5 else None)))
+
+			await asyncio.gather(*pending)
+
+			response = await self._complete_multipart_upload(
+				key,
+				session.upload_id,
+				[{"PartNumber": number, "ETag": session.parts[number]} for number in range(1, part_number + 1)],
+			)
+		except BaseException as exc:
+			if isinstance(exc, asyncio.CancelledError):
+				for task in pending:
+					task.cancel()
+			# Let in-flight parts settle so their ETags are persisted for the retry.
+			await asyncio.gather(*pending, return_exceptions=True)
+			# The session is kept so a retry of the same key can resume the upload.
+			if isinstance(exc, ClientError):
+				logger.exception("Error en la subida multiparte de '%s'.", key)
+				raise ObjectStorageError(str(exc)) from exc
+			raise
+
+		self.upload_sessions.delete(key)
+		logger.debug(
+			"Subida multiparte de '%s' completada en %d partes (%d reutilizadas)",
+			key,
+			part_number,
+			reused_parts,
+		)
+		return response, size, reused_parts
+
+	async def _resume_upload_session(self, key: str, part_size: int) -> Optional[UploadSession]:
+		"""Return a persisted session for key, reconciled with the parts R2 actually holds."""
 
-		return total_deleted
+		session = self.upload_sessions.load(key)
+		if session is None:
+			return None
 
-	async def generate_presigned_url(self, key: str, expires_in: int = 3600) -> str:
-		"""Generate a temporary signed URL for a given object key."""
+		if session.part_size != part_size:
+			await self._abort_multipart_upload(key, session.upload_id)
+			self.upload_sessions.delete(key)
+			return None
 
+		stored_parts: Dict[int, str] = {}
+		request_params = {"Bucket": self.bucket, "Key": key, "UploadId": session.upload_id}
 		try:
-			url = await asyncio.to_thread(
-				self.client.generate_presigned_url,
-				"get_object",
-				Params={"Bucket": self.bucket, "Key": key},
-				ExpiresIn=expires_in,
+			while True:
+				response = await self._call("list_parts", **request_params)
+				for part in response.get("Parts", []):
+					stored_parts[part["PartNumber"]] = part["ETag"]
+				if not response.get("IsTruncated"):
+					break
+				request_params["PartNumberMarker"] = response["NextPartNumberMarker"]
+		except ClientError:
+			logger.info("La sesión de subida de '%s' ya no existe en R2; se reinicia", key)
+			self.upload_sessions.delete(key)
+			return None
+
+		session.parts = stored_parts
+		logger.info("Reanudando subida multiparte de '%s' con %d partes ya almacenadas", key, len(stored_parts))
+		return session
+
+	async def _complete_multipart_upload(self, key: str, upload_id: str, parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+		"""Complete a multipart upload, recognising a retry of a completion that already went through.
+
+		R2 forgets the upload ID once completed, so a retried complete whose first
+		attempt succeeded fails with NoSuchUpload. The object is then HEADed and
+		accepted if its ETag is the one S3 derives from exactly these parts.
+		"""
+
+		try:
+			return await self._call(
+				"complete_multipart_upload",
+				Bucket=self.bucket,
+				Key=key,
+				UploadId=upload_id,
+				MultipartUpload={"Parts": parts},
 			)
 		except ClientError as exc:
-			logger.exception("No se pudo generar URL presignada para '%s'", key)
-			raise ObjectStorageError(str(exc)) from exc
+			if self._error_code(exc) != "NoSuchUpload":
+				raise
+			combined = hashlib.md5(b"".join(bytes.fromhex(str(part["ETag"]).strip('"')) for part in parts))
+			expected_etag = f"{combined.hexdigest()}-{len(parts)}"
+			stored = await self.head_object(key)
+			if stored is None or (stored.etag or "").strip('"') != expected_etag:
+				raise
+			logger.info("La subida multiparte '%s' de '%s' ya estaba completada", upload_id, key)
+			return {"Bucket": self.bucket, "Key": key, "ETag": stored.etag}
+
+	async def _abort_multipart_upload(self, key: str, upload_id: str) -> None:
+		try:
+			await self._call(
+				"abort_multipart_upload",
+				Bucket=self.bucket,
+				Key=key,
+				UploadId=upload_id,
+			)
+		except ClientError:
+			logger.warning("No se pudo abortar la subida multiparte '%s' de '%s'", upload_id, key)
 
-		return url
+	@staticmethod
+	async def _iter_file_parts(file: UploadFile, part_size: int) -> AsyncIterator[bytes]:
+		"""Read an UploadFile in fixed-size parts so memory stays bounded by part_size."""
 
-	def build_key(self, filename: str, prefix: Optional[str] = None) -> str:
-		"""Build a storage key applying optional prefix and sanitizing the filename."""
+		buffer = bytearray()
+		while True:
+			chunk = await file.read(part_size - len(buffer))
+			if not chunk:
+				break
+			buffer.extend(chunk)
+			if len(buffer) >= part_size:
+				yield bytes(buffer)
+				buffer.clear()
+		if buffer:
+			yield bytes(buffer)
 
-		safe_name = self._sanitize_filename(filename)
-		if prefix:
-			clean_prefix = prefix.strip("/")
-			return f"{clean_prefix}/{safe_name}"
-		return safe_name
+	@staticmethod
+	async def _hash_parts(parts: AsyncIterator[bytes], digests: checksums.StreamDigests) -> AsyncIterator[bytes]:
+		"""Feed every part into digests as it streams past, hashing large parts off the event loop."""
+
+		async for part in parts:
+			if len(part) >= HASH_OFFLOAD_THRESHOLD:
+				await asyncio.to_thread(digests.update, part)
+			else:
+				digests.update(part)
+			yield part
+
+	@staticmethod
+	async def _chain_parts(head: List[bytes], rest: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+		# Pop buffered parts so they can be released once uploaded.
+		while head:
+			yield head.pop(0)
+		async for part in rest:
+			yield part
+
+	def _compressor_for(self, content_type: str) -> Optional[StreamCompressor]:
+		if self.compression is None or not matches_content_type(content_type, self.compressible_types):
+			return None
+		return StreamCompressor(self.compression, level=settings.STORAGE_COMPRESSION_LEVEL)
+
+	@staticmethod
+	def _content_encoding(response: Dict[str, Any]) -> Optional[str]:
+		"""Encoding applied by this service on upload, which the read path must undo."""
+
+		return (response.get("Metadata") or {}).get(COMPRESSION_METADATA_KEY)
+
+	@staticmethod
+	def _error_code(exc: ClientError) -> str:
+		return str(exc.response.get("Error", {}).get("Code", ""))
 
 	def _validate_configuration(self) -> None:
+		if settings.STORAGE_BACKEND not in STORAGE_BACKENDS:
+			raise ObjectStorageError(
+				"STORAGE_BACKEND debe ser 'r2', 'filesystem' o 'memory'; valor recibido: "
+				f"'{settings.STORAGE_BACKEND}'."
+			)
+
+		self._validate_compression()
+		self._validate_checksums()
+		if settings.STORAGE_BACKEND != "r2":
+			# Everything stays on this node: no credentials or endpoint to check.
+			return
+
 		required_fields = {
 			"R2_ACCESS_KEY_ID": settings.R2_ACCESS_KEY_ID,
 			"R2_SECRET_ACCESS_KEY": settings.R2_SECRET_ACCESS_KEY,
@@ -254,11 +1435,49 @@ class ObjectStorageService:
 				"Faltan variables de entorno necesarias para R2: " + ", ".join(missing)
 			)
 
+		if settings.R2_CLIENT_BACKEND not in {"boto3", "aiohttp"}:
+			raise ObjectStorageError(
+				"R2_CLIENT_BACKEND debe ser 'boto3' o 'aiohttp'; valor recibido: "
+				f"'{settings.R2_CLIENT_BACKEND}'."
+			)
+
 		if not settings.R2_ENDPOINT_URL and not settings.R2_ACCOUNT_ID:
 			raise ObjectStorageError(
 				"Debes definir R2_ACCOUNT_ID o proporcionar R2_ENDPOINT_URL para construir el endpoint de R2."
 			)
 
+	@staticmethod
+	def _validate_compression() -> None:
+		if settings.STORAGE_COMPRESSION == "none":
+			return
+		if settings.STORAGE_COMPRESSION not in SUPPORTED_ENCODINGS:
+			raise ObjectStorageError(
+				"STORAGE_COMPRESSION debe ser 'none', 'gzip' o 'zstd'; valor recibido: "
+				f"'{settings.STORAGE_COMPRESSION}'."
+			)
+		if not is_available(settings.STORAGE_COMPRESSION):
+			raise ObjectStorageError(
+				"STORAGE_COMPRESSION='zstd' requiere el paquete 'zstandard' instalado."
+			)
+
+	@staticmethod
+	def _validate_checksums() -> None:
+		for algorithm in checksums.parse_algorithms(settings.STORAGE_UPLOAD_CHECKSUMS):
+			if algorithm not in checksums.SUPPORTED_ALGORITHMS:
+				raise ObjectStorageError(
+					"STORAGE_UPLOAD_CHECKSUMS solo admite 'md5', 'sha256' y 'crc32c'; valor recibido: "
+					f"'{algorithm}'."
+				)
+			if not checksums.is_available(algorithm):
+				raise ObjectStorageError(
+					"STORAGE_UPLOAD_CHECKSUMS con 'crc32c' requiere el paquete 'google-crc32c' instalado."
+				)
+
+	def _presign_unsupported(self) -> ObjectStorageUnsupportedError:
+		return ObjectStorageUnsupportedError(
+			f"El backend de almacenamiento '{self.backend}' no admite URLs presignadas."
+		)
+
 	def _resolve_endpoint_url(self) -> str:
 		if settings.R2_ENDPOINT_URL:
 			return settings.R2_ENDPOINT_URL.rstrip("/")
@@ -291,3 +1510,20 @@ def get_object_storage_service() -> ObjectStorageService:
 	"""Return a singleton instance of the object storage service."""
 
 	return ObjectStorageService()
+
+
+async def close_object_storage_service() -> None:
+	"""Close the singleton storage service if it was ever created."""
+
+	if get_object_storage_service.cache_info().currsize:
+		await get_object_storage_service().close()
+
+
+def _current_object_storage_service() -> Optional[ObjectStorageService]:
+	# Scrapes must not create the service (and validate R2 settings) as a side effect.
+	if get_object_storage_service.cache_info().currsize:
+		return get_object_storage_service()
+	return None
+
+
+storage_metrics.register_stats_collector(_current_object_storage_service)
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Tuple
+
+from src.services.s3_async_client import S3Presigner
+
+
+@dataclass(slots=True)
+class PresignCacheStats:
+	"""Counters of the presigned URL cache since startup."""
+
+	entries: int
+	hits: int
+	misses: int
+
+
+class PresignedUrlCache:
+	"""Presigned URLs cached per (method, key, expiry, time window).
+
+	URLs are signed as of the start of a `window`-second slot, so every caller in
+	the same slot gets the very same URL (which browsers and CDNs can cache too)
+	and a URL served from the cache always has at least `expires_in - window`
+	seconds of validity left. The window shrinks to half of `expires_in` for
+	short-lived URLs. A window of 0 disables caching.
+	"""
+
+	def __init__(self, presigner: S3Presigner, bucket: str, *, window: int, max_entries: int = 10_000) -> None:
+		self.presigner = presigner
+		self.bucket = bucket
+		self.window = window
+		self.max_entries = max(1, max_entries)
+		self._entries: "OrderedDict[Tuple[str, str, int, int], str]" = OrderedDict()
+		self._hits = 0
+		self._misses = 0
+
+	def get(self, key: str, expires_in: int, *, client_method: str = "get_object") -> str:
+		return self.get_many([key], expires_in, client_method=client_method)[key]
+
+	def get_many(
+		self,
+		keys: Iterable[str],
+		expires_in: int,
+		*,
+		client_method: str = "get_object",
+	) -> Dict[str, str]:
+		"""Presign several keys at once; all of them share one signing time."""
+
+		now = time.time()
+		window = min(self.window, expires_in // 2)
+		if window <= 0:
+			signed_at = datetime.fromtimestamp(now, timezone.utc)
+			return {
+				key: self.presigner.presign_url(client_method, self.bucket, key, expires_in, now=signed_at)
+				for key in keys
+			}
+
+		slot = int(now // window)
+		signed_at = datetime.fromtimestamp(slot * window, timezone.utc)
+		urls: Dict[str, str] = {}
+		for key in keys:
+			cache_key = (client_method, key, expires_in, slot)
+			url = self._entries.get(cache_key)
+			if url is None:
+				self._misses += 1
+				url = self.presigner.presign_url(client_method, self.bucket, key, expires_in, now=signed_at)
+				self._entries[cache_key] = url
+				if len(self._entries) > self.max_entries:
+					# Entries of past slots are never hit again, so they age out first.
+					self._entries.popitem(last=False)
+			else:
+				self._hits += 1
+				self._entries.move_to_end(cache_key)
+			urls[key] = url
+		return urls
+
+	def stats(self) -> PresignCacheStats:
+		return PresignCacheStats(entries=len(self._entries), hits=self._hits, misses=self._misses)
@@ -0,0 +1,718 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import quote
+
+import aiohttp
+from botocore.exceptions import ClientError
+from yarl import URL
+
+logger = logging.getLogger(__name__)
+
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+EMPTY_PAYLOAD_SHA256 = hashlib.sha256(b"").hexdigest()
+PRESIGN_METHODS = {"get_object": "GET", "put_object": "PUT", "head_object": "HEAD"}
+
+
+def _uri_encode(value: str, *, safe: str = "-_.~") -> str:
+	return quote(value, safe=safe)
+
+
+def _canonical_query(params: Mapping[str, str]) -> str:
+	return "&".join(
+		f"{_uri_encode(name)}={_uri_encode(value)}" for name, value in sorted(params.items())
+	)
+
+
+def _local_name(element: ET.Element) -> str:
+	return element.tag.rsplit("}", 1)[-1]
+
+
+def _child_text(element: ET.Element, name: str) -> Optional[str]:
+	for child in element:
+		if _local_name(child) == name:
+			return child.text
+	return None
+
+
+def _children(element: ET.Element, name: str) -> List[ET.Element]:
+	return [child for child in element if _local_name(child) == name]
+
+
+def _parse_xml(content: bytes) -> ET.Element:
+	if not content:
+		return ET.Element("Empty")
+	try:
+		return ET.fromstring(content)
+	except ET.ParseError:
+		return ET.Element("Empty")
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+	if not value:
+		return None
+	return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class SigV4Signer:
+	"""AWS Signature Version 4 signer for S3-compatible endpoints."""
+
+	def __init__(self, access_key: str, secret_key: str, region: str, service: str = "s3") -> None:
+		self.access_key = access_key
+		self.secret_key = secret_key
+		self.region = region
+		self.service = service
+		self._signing_keys: Dict[str, bytes] = {}
+
+	def sign_headers(
+		self,
+		method: str,
+		host: str,
+		path: str,
+		query: Mapping[str, str],
+		headers: Dict[str, str],
+		payload_hash: str,
+		*,
+		now: Optional[datetime] = None,
+	) -> Dict[str, str]:
+		"""Return headers including the Authorization header for the request."""
+
+		now = now or datetime.now(timezone.utc)
+		amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+		date_stamp = amz_date[:8]
+
+		signed = {name.lower(): str(value).strip() for name, value in headers.items()}
+		signed["host"] = host
+		signed["x-amz-date"] = amz_date
+		signed["x-amz-content-sha256"] = payload_hash
+
+		signed_header_names = ";".join(sorted(signed))
+		canonical_headers = "".join(f"{name}:{signed[name]}\n" for name in sorted(signed))
+		canonical_request = "\n".join(
+			[
+				method,
+				path,
+				_canonical_query(query),
+				canonical_headers,
+				signed_header_names,
+				payload_hash,
+			]
+		)
+
+		scope = self._scope(date_stamp)
+		signature = self._signature(date_stamp, amz_date, scope, canonical_request)
+		signed["authorization"] = (
+			f"AWS4-HMAC-SHA256 Credential={self.access_key}/{scope}, "
+			f"SignedHeaders={signed_header_names}, Signature={signature}"
+		)
+		signed.pop("host")
+		return signed
+
+	def presign_query(
+		self,
+		method: str,
+		host: str,
+		path: str,
+		query: Mapping[str, str],
+		expires_in: int,
+		*,
+		now: Optional[datetime] = None,
+	) -> Dict[str, str]:
+		"""Return the query parameters of a presigned URL for the request."""
+
+		now = now or datetime.now(timezone.utc)
+		amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+		date_stamp = amz_date[:8]
+		scope = self._scope(date_stamp)
+
+		params = dict(query)
+		params.update(
+			{
+				"X-Amz-Algorithm": "AWS4-HMAC-SHA256",
+				"X-Amz-Credential": f"{self.access_key}/{scope}",
+				"X-Amz-Date": amz_date,
+				"X-Amz-Expires": str(expires_in),
+				"X-Amz-SignedHeaders": "host",
+			}
+		)
+		canonical_request = "\n".join(
+			[method, path, _canonical_query(params), f"host:{host}\n", "host", UNSIGNED_PAYLOAD]
+		)
+		params["X-Amz-Signature"] = self._signature(date_stamp, amz_date, scope, canonical_request)
+		return params
+
+	def sign_post_policy(
+		self,
+		conditions: List[Any],
+		expires_in: int,
+		*,
+		now: Optional[datetime] = None,
+	) -> Dict[str, str]:
+		"""Return the form fields that authorize a browser-style POST upload."""
+
+		now = now or datetime.now(timezone.utc)
+		amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+		date_stamp = amz_date[:8]
+		credential = f"{self.access_key}/{self._scope(date_stamp)}"
+		fields = {
+			"x-amz-algorithm": "AWS4-HMAC-SHA256",
+			"x-amz-credential": credential,
+			"x-amz-date": amz_date,
+		}
+		policy = {
+			"expiration": (now + timedelta(seconds=expires_in)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+			"conditions": [*conditions, *({name: value} for name, value in fields.items())],
+		}
+		encoded_policy = base64.b64encode(json.dumps(policy).encode("utf-8")).decode("ascii")
+		fields["policy"] = encoded_policy
+		fields["x-amz-signature"] = hmac.new(
+			self._signing_key(date_stamp), encoded_policy.encode("utf-8"), hashlib.sha256
+		).hexdigest()
+		return fields
+
+	def _scope(self, date_stamp: str) -> str:
+		return f"{date_stamp}/{self.region}/{self.service}/aws4_request"
+
+	def _signature(self, date_stamp: str, amz_date: str, scope: str, canonical_request: str) -> str:
+		string_to_sign = "\n".join(
+			[
+				"AWS4-HMAC-SHA256",
+				amz_date,
+				scope,
+				hashlib.sha256(canonical_request.encode("utf-8")).hexdigest(),
+			]
+		)
+		return hmac.new(self._signing_key(date_stamp), string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+
+	def _signing_key(self, date_stamp: str) -> bytes:
+		key = self._signing_keys.get(date_stamp)
+		if key is None:
+			key = ("AWS4" + self.secret_key).encode("utf-8")
+			for part in (date_stamp, self.region, self.service, "aws4_request"):
+				key = hmac.new(key, part.encode("utf-8"), hashlib.sha256).digest()
+			self._signing_keys = {date_stamp: key}
+		return key
+
+
+class S3Presigner:
+	"""Builds presigned path-style object URLs in-process; signing is pure CPU work."""
+
+	def __init__(self, endpoint_url: str, signer: SigV4Signer) -> None:
+		self.endpoint = URL(endpoint_url.rstrip("/"))
+		self.signer = signer
+
+	@property
+	def host(self) -> str:
+		port = self.endpoint.explicit_port
+		return f"{self.endpoint.host}:{port}" if port else self.endpoint.host
+
+	def presign_url(
+		self,
+		client_method: str,
+		bucket: str,
+		key: str,
+		expires_in: int,
+		*,
+		now: Optional[datetime] = None,
+	) -> str:
+		if client_method not in PRESIGN_METHODS:
+			raise ValueError(f"Unsupported presign method: {client_method}")
+
+		path = AsyncS3Client._path(bucket, key)
+		query = self.signer.presign_query(PRESIGN_METHODS[client_method], self.host, path, {}, expires_in, now=now)
+		# Path and query are already canonically encoded; yarl must not re-encode them.
+		return str(URL(f"{self.endpoint}{path}?{_canonical_query(query)}", encoded=True))
+
+
+class AsyncStreamingBody:
+	"""Async counterpart of botocore's StreamingBody over an open aiohttp response."""
+
+	def __init__(self, response: aiohttp.ClientResponse) -> None:
+		self._response = response
+
+	async def read(self, amt: Optional[int] = None) -> bytes:
+		if amt is not None:
+			return await self._response.content.read(amt)
+		try:
+			return await self._response.read()
+		finally:
+			self.close()
+
+	async def iter_chunks(self, chunk_size: int = 1024 * 1024) -> AsyncIterator[bytes]:
+		try:
+			async for chunk in self._response.content.iter_chunked(chunk_size):
+				yield chunk
+		finally:
+			self.close()
+
+	def close(self) -> None:
+		self._response.release()
+
+
+class AsyncS3Client:
+	"""Minimal asyncio-native S3 client built on aiohttp.
+
+	Implements the subset of the boto3 S3 client used by ObjectStorageService with
+	the same parameter names and response shapes, and raises botocore's ClientError
+	on error responses so callers can treat both clients interchangeably.
+	"""
+
+	def __init__(
+		self,
+		*,
+		endpoint_url: str,
+		access_key: str,
+		secret_key: str,
+		region: str = "auto",
+		max_connections: int = 50,
+		timeout: float = 60.0,
+	) -> None:
+		self.endpoint = URL(endpoint_url.rstrip("/"))
+		self.signer = SigV4Signer(access_key, secret_key, region)
+		self.presigner = S3Presigner(endpoint_url, self.signer)
+		self.max_connections = max_connections
+		self.timeout = aiohttp.ClientTimeout(total=timeout)
+		self._session: Optional[aiohttp.ClientSession] = None
+		self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+	@property
+	def host(self) -> str:
+		port = self.endpoint.explicit_port
+		return f"{self.endpoint.host}:{port}" if port else self.endpoint.host
+
+	async def close(self) -> None:
+		if self._session is not None and not self._session.closed:
+			await self._session.close()
+		self._session = None
+
+	async def put_object(
+		self,
+		*,
+		Bucket: str,
+		Key: str,
+		Body: bytes,
+		ContentType: Optional[str] = None,
+		ContentEncoding: Optional[str] = None,
+		Metadata: Optional[Dict[str, str]] = None,
+		ContentMD5: Optional[str] = None,
+	) -> Dict[str, Any]:
+		headers = self._object_headers(ContentType, Metadata, ContentEncoding)
+		if ContentMD5:
+			headers["Content-MD5"] = ContentMD5
+		status, response_headers, _ = await self._request(
+			"PutObject", "PUT", Bucket, Key, headers=headers, body=Body
+		)
+		return {"ETag": response_headers.get("ETag")}
+
+	async def create_multipart_upload(
+		self,
+		*,
+		Bucket: str,
+		Key: str,
+		ContentType: Optional[str] = None,
+		ContentEncoding: Optional[str] = None,
+		Metadata: Optional[Dict[str, str]] = None,
+	) -> Dict[str, Any]:
+		headers = self._object_headers(ContentType, Metadata, ContentEncoding)
+		_, _, root = await self._request(
+			"CreateMultipartUpload", "POST", Bucket, Key, query={"uploads": ""}, headers=headers
+		)
+		return {"Bucket": Bucket, "Key": Key, "UploadId": _child_text(root, "UploadId")}
+
+	async def upload_part(
+		self,
+		*,
+		Bucket: str,
+		Key: str,
+		UploadId: str,
+		PartNumber: int,
+		Body: bytes,
+		ContentMD5: Optional[str] = None,
+	) -> Dict[str, Any]:
+		_, response_headers, _ = await self._request(
+			"UploadPart",
+			"PUT",
+			Bucket,
+			Key,
+			query={"partNumber": str(PartNumber), "uploadId": UploadId},
+			headers={"Content-MD5": ContentMD5} if ContentMD5 else None,
+			body=Body,
+		)
+		return {"ETag": response_headers.get("ETag")}
+
+	async def complete_multipart_upload(
+		self,
+		*,
+		Bucket: str,
+		Key: str,
+		UploadId: str,
+		MultipartUpload: Dict[str, List[Dict[str, Any]]],
+	) -> Dict[str, Any]:
+		parts = "".join(
+			f"<Part><PartNumber>{part['PartNumber']}</PartNumber><ETag>{_xml_escape(part['ETag'])}</ETag></Part>"
+			for part in MultipartUpload["Parts"]
+		)
+		body = f"<CompleteMultipartUpload>{parts}</CompleteMultipartUpload>".encode("utf-8")
+		_, _, root = await self._request(
+			"CompleteMultipartUpload",
+			"POST",
+			Bucket,
+			Key,
+			query={"uploadId": UploadId},
+			body=body,
+			sign_payload=True,
+		)
+		return {
+			"Bucket": Bucket,
+			"Key": Key,
+			"ETag": _child_text(root, "ETag"),
+			"Location": _child_text(root, "Location"),
+		}
+
+	async def abort_multipart_upload(self, *, Bucket: str, Key: str, UploadId: str) -> Dict[str, Any]:
+		await self._request("AbortMultipartUpload", "DELETE", Bucket, Key, query={"uploadId": UploadId})
+		return {}
+
+	async def list_parts(
+		self,
+		*,
+		Bucket: str,
+		Key: str,
+		UploadId: str,
+		PartNumberMarker: Optional[int] = None,
+	) -> Dict[str, Any]:
+		query = {"uploadId": UploadId}
+		if PartNumberMarker is not None:
+			query["part-number-marker"] = str(PartNumberMarker)
+		_, _, root = await self._request("ListParts", "GET", Bucket, Key, query=query)
+		return {
+			"Parts": [
+				{
+					"PartNumber": int(_child_text(part, "PartNumber") or 0),
+					"ETag": _child_text(part, "ETag"),
+					"Size": int(_child_text(part, "Size") or 0),
+				}
+				for part in _children(root, "Part")
+			],
+			"IsTruncated": _child_text(root, "IsTruncated") == "true",
+			"NextPartNumberMarker": int(_child_text(root, "NextPartNumberMarker") or 0),
+		}
+
+	async def list_objects_v2(
+		self,
+		*,
+		Bucket: str,
+		MaxKeys: int = 1000,
+		Prefix: Optional[str] = None,
+		ContinuationToken: Optional[str] = None,
+		StartAfter: Optional[str] = None,
+		Delimiter: Optional[str] = None,
+	) -> Dict[str, Any]:
+		query = {"list-type": "2", "max-keys": str(MaxKeys)}
+		if Prefix:
+			query["prefix"] = Prefix
+		if ContinuationToken:
+			query["continuation-token"] = ContinuationToken
+		if StartAfter:
+			query["start-after"] = StartAfter
+		if Delimiter:
+			query["delimiter"] = Delimiter
+
+		_, _, root = await self._request("ListObjectsV2", "GET", Bucket, query=query)
+		response: Dict[str, Any] = {
+			"IsTruncated": _child_text(root, "IsTruncated") == "true",
+			"KeyCount": int(_child_text(root, "KeyCount") or 0),
+		}
+		contents = [
+			{
+				"Key": _child_text(item, "Key"),
+				"LastModified": _parse_timestamp(_child_text(item, "LastModified")),
+				"ETag": _child_text(item, "ETag"),
+				"Size": int(_child_text(item, "Size") or 0),
+			}
+			for item in _children(root, "Contents")
+		]
+		if contents:
+			response["Contents"] = contents
+		common_prefixes = [
+			{"Prefix": _child_text(item, "Prefix")} for item in _children(root, "CommonPrefixes")
+		]
+		if common_prefixes:
+			response["CommonPrefixes"] = common_prefixes
+		next_token = _child_text(root, "NextContinuationToken")
+		if next_token:
+			response["NextContinuationToken"] = next_token
+		return response
+
+	async def delete_objects(self, *, Bucket: str, Delete: Dict[str, Any]) -> Dict[str, Any]:
+		objects = "".join(
+			f"<Object><Key>{_xml_escape(item['Key'])}</Key></Object>" for item in Delete["Objects"]
+		)
+		quiet = "<Quiet>true</Quiet>" if Delete.get("Quiet") else ""
+		body = f"<Delete>{quiet}{objects}</Delete>".encode("utf-8")
+		headers = {"Content-MD5": base64.b64encode(hashlib.md5(body).digest()).decode("ascii")}
+		_, _, root = await self._request(
+			"DeleteObjects",
+			"POST",
+			Bucket,
+			query={"delete": ""},
+			headers=headers,
+			body=body,
+			sign_payload=True,
+		)
+		response: Dict[str, Any] = {}
+		deleted = [{"Key": _child_text(item, "Key")} for item in _children(root, "Deleted")]
+		if deleted:
+			response["Deleted"] = deleted
+		errors = [
+			{
+				"Key": _child_text(item, "Key"),
+				"Code": _child_text(item, "Code"),
+				"Message": _child_text(item, "Message"),
+			}
+			for item in _children(root, "Error")
+		]
+		if errors:
+			response["Errors"] = errors
+		return response
+
+	async def head_object(self, *, Bucket: str, Key: str) -> Dict[str, Any]:
+		response = await self._send("HeadObject", "HEAD", Bucket, Key)
+		response.release()
+		return _object_response(response.headers)
+
+	async def get_object(
+		self,
+		*,
+		Bucket: str,
+		Key: str,
+		Range: Optional[str] = None,
+		IfNoneMatch: Optional[str] = None,
+	) -> Dict[str, Any]:
+		headers: Dict[str, str] = {}
+		if Range:
+			headers["Range"] = Range
+		if IfNoneMatch:
+			headers["If-None-Match"] = IfNoneMatch
+		response = await self._send("GetObject", "GET", Bucket, Key, headers=headers)
+		result = _object_response(response.headers)
+		result["Body"] = AsyncStreamingBody(response)
+		return result
+
+	async def copy_object(
+		self,
+		*,
+		Bucket: str,
+		Key: str,
+		CopySource: Dict[str, str],
+		MetadataDirective: Optional[str] = None,
+		Metadata: Optional[Dict[str, str]] = None,
+		ContentType: Optional[str] = None,
+		ContentEncoding: Optional[str] = None,
+	) -> Dict[str, Any]:
+		headers = self._object_headers(ContentType, Metadata, ContentEncoding)
+		headers["x-amz-copy-source"] = self._copy_source(CopySource)
+		if MetadataDirective:
+			headers["x-amz-metadata-directive"] = MetadataDirective
+		_, _, root = await self._request("CopyObject", "PUT", Bucket, Key, headers=headers)
+		return {"CopyObjectResult": {"ETag": _child_text(root, "ETag")}}
+
+	async def upload_part_copy(
+		self,
+		*,
+		Bucket: str,
+		Key: str,
+		UploadId: str,
+		PartNumber: int,
+		CopySource: Dict[str, str],
+		CopySourceRange: str,
+	) -> Dict[str, Any]:
+		headers = {
+			"x-amz-copy-source": self._copy_source(CopySource),
+			"x-amz-copy-source-range": CopySourceRange,
+		}
+		_, _, root = await self._request(
+			"UploadPartCopy",
+			"PUT",
+			Bucket,
+			Key,
+			query={"partNumber": str(PartNumber), "uploadId": UploadId},
+			headers=headers,
+		)
+		return {"CopyPartResult": {"ETag": _child_text(root, "ETag")}}
+
+	async def generate_presigned_url(
+		self,
+		ClientMethod: str,
+		Params: Dict[str, str],
+		ExpiresIn: int = 3600,
+	) -> str:
+		return self.presigner.presign_url(ClientMethod, Params["Bucket"], Params["Key"], ExpiresIn)
+
+	async def generate_presigned_post(
+		self,
+		Bucket: str,
+		Key: str,
+		Fields: Optional[Dict[str, str]] = None,
+		Conditions: Optional[List[Any]] = None,
+		ExpiresIn: int = 3600,
+	) -> Dict[str, Any]:
+		fields = dict(Fields or {})
+		fields["key"] = Key
+		conditions = [{"bucket": Bucket}, *(Conditions or [])]
+		if "${filename}" not in Key:
+			conditions.append({"key": Key})
+		fields.update(self.signer.sign_post_policy(conditions, ExpiresIn))
+		return {"url": f"{self.endpoint}{self._path(Bucket, None)}", "fields": fields}
+
+	async def _request(
+		self,
+		operation: str,
+		method: str,
+		bucket: str,
+		key: Optional[str] = None,
+		**kwargs: Any,
+	) -> Tuple[int, Mapping[str, str], ET.Element]:
+		response = await self._send(operation, method, bucket, key, **kwargs)
+		async with response:
+			content = await response.read()
+
+		root = _parse_xml(content)
+		if _local_name(root) == "Error":
+			# Some operations (CompleteMultipartUpload, CopyObject) report errors with a 200.
+			raise _client_error(operation, response.status, response.headers, root)
+		return response.status, response.headers, root
+
+	async def _send(
+		self,
+		operation: str,
+		method: str,
+		bucket: str,
+		key: Optional[str] = None,
+		*,
+		query: Optional[Dict[str, str]] = None,
+		headers: Optional[Dict[str, str]] = None,
+		body: Optional[bytes] = None,
+		sign_payload: bool = False,
+	) -> aiohttp.ClientResponse:
+		"""Send a signed request and return the unread response, raising ClientError on errors."""
+
+		query = query or {}
+		path = self._path(bucket, key)
+		if body is None:
+			payload_hash = EMPTY_PAYLOAD_SHA256
+		elif sign_payload:
+			payload_hash = hashlib.sha256(body).hexdigest()
+		else:
+			# Object payloads are not hashed to keep large parts off the CPU; TLS covers integrity.
+			payload_hash = UNSIGNED_PAYLOAD
+
+		request_headers = self.signer.sign_headers(
+			method, self.host, path, query, dict(headers or {}), payload_hash
+		)
+		session = self._get_session()
+		response = await session.request(
+			method, self._url(path, query), headers=request_headers, data=body
+		)
+		if response.status >= 300:
+			async with response:
+				content = await response.read()
+			raise _client_error(operation, response.status, response.headers, _parse_xml(content))
+		return response
+
+	def _get_session(self) -> aiohttp.ClientSession:
+		loop = asyncio.get_running_loop()
+		if self._session is None or self._session.closed or self._loop is not loop:
+			# Sessions are bound to the loop that created them.
+			self._loop = loop
+			connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=30)
+			self._session = aiohttp.ClientSession(
+				connector=connector,
+				timeout=self.timeout,
+				skip_auto_headers=("Content-Type", "Accept-Encoding"),
+				# Object bodies are returned exactly as stored, even when they carry a Content-Encoding.
+				auto_decompress=False,
+			)
+		return self._session
+
+	def _url(self, path: str, query: Mapping[str, str]) -> URL:
+		# Path and query are already canonically encoded; yarl must not re-encode them.
+		url = f"{self.endpoint}{path}"
+		if query:
+			url = f"{url}?{_canonical_query(query)}"
+		return URL(url, encoded=True)
+
+	@staticmethod
+	def _path(bucket: str, key: Optional[str]) -> str:
+		if key is None:
+			return f"/{_uri_encode(bucket)}"
+		return f"/{_uri_encode(bucket)}/{_uri_encode(key, safe='/-_.~')}"
+
+	@staticmethod
+	def _copy_source(source: Dict[str, str]) -> str:
+		return f"/{_uri_encode(source['Bucket'])}/{_uri_encode(source['Key'], safe='/-_.~')}"
+
+	@staticmethod
+	def _object_headers(
+		content_type: Optional[str],
+		metadata: Optional[Dict[str, str]],
+		content_encoding: Optional[str] = None,
+	) -> Dict[str, str]:
+		headers: Dict[str, str] = {}
+		if content_type:
+			headers["Content-Type"] = content_type
+		if content_encoding:
+			headers["Content-Encoding"] = content_encoding
+		for name, value in (metadata or {}).items():
+			headers[f"x-amz-meta-{name.lower()}"] = value
+		return headers
+
+
+def _client_error(
+	operation: str, status: int, headers: Mapping[str, str], root: ET.Element
+) -> ClientError:
+	return ClientError(
+		{
+			"Error": {
+				"Code": _child_text(root, "Code") or str(status),
+				"Message": _child_text(root, "Message") or "",
+			},
+			"ResponseMetadata": {"HTTPStatusCode": status, "HTTPHeaders": dict(headers)},
+		},
+		operation,
+	)
+
+
+def _object_response(headers: Mapping[str, str]) -> Dict[str, Any]:
+	last_modified = headers.get("Last-Modified")
+	response: Dict[str, Any] = {
+		"ContentLength": int(headers.get("Content-Length", 0)),
+		"ContentType": headers.get("Content-Type"),
+		"ETag": headers.get("ETag"),
+		"LastModified": parsedate_to_datetime(last_modified) if last_modified else None,
+		"Metadata": {
+			name.lower()[len("x-amz-meta-"):]: value
+			for name, value in headers.items()
+			if name.lower().startswith("x-amz-meta-")
+		},
+	}
+	for header, field_name in (
+		("Content-Range", "ContentRange"),
+		("Content-Encoding", "ContentEncoding"),
+	):
+		if header in headers:
+			response[field_name] = headers[header]
+	return response
+
+
+def _xml_escape(value: str) -> str:
+	return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, List, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class StorageExecutorStats:
+	"""Point-in-time counters of the storage thread pool."""
+
+	max_workers: int
+	active_threads: int
+	queued_calls: int
+	submitted_total: int
+	exhausted_total: int
+	queue_wait_seconds_total: float
+	queue_wait_seconds_max: float
+
+
+class StorageThreadPool:
+	"""Bounded thread pool dedicated to blocking storage SDK calls.
+
+	Keeping storage I/O off the default executor means a burst of uploads cannot
+	starve other `asyncio.to_thread` users, and the counters show whether calls
+	are waiting for a free thread (queue wait) or the pool is saturated.
+	"""
+
+	def __init__(self, max_workers: int) -> None:
+		self.max_workers = max(1, max_workers)
+		self._executor = ThreadPoolExecutor(
+			max_workers=self.max_workers,
+			thread_name_prefix="storage-io",
+		)
+		self._lock = threading.Lock()
+		self._active = 0
+		self._queued = 0
+		self._submitted_total = 0
+		self._exhausted_total = 0
+		self._queue_wait_total = 0.0
+		self._queue_wait_max = 0.0
+
+	async def run(self, func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+		"""Run func in the pool, like asyncio.to_thread but on the dedicated executor."""
+
+		loop = asyncio.get_running_loop()
+		context = contextvars.copy_context()
+		call = functools.partial(context.run, func, *args, **kwargs)
+		submitted_at = time.perf_counter()
+
+		with self._lock:
+			self._submitted_total += 1
+			if self._active + self._queued >= self.max_workers:
+				self._exhausted_total += 1
+				logger.debug("Pool de almacenamiento saturado (%d hilos ocupados)", self._active)
+			self._queued += 1
+
+		started = [False]
+		try:
+			return await loop.run_in_executor(self._executor, self._track, call, submitted_at, started)
+		except asyncio.CancelledError:
+			# A call cancelled while still queued never reaches _track.
+			with self._lock:
+				if not started[0]:
+					self._queued -= 1
+					started[0] = True
+			raise
+
+	def stats(self) -> StorageExecutorStats:
+		with self._lock:
+			return StorageExecutorStats(
+				max_workers=self.max_workers,
+				active_threads=self._active,
+				queued_calls=self._queued,
+				submitted_total=self._submitted_total,
+				exhausted_total=self._exhausted_total,
+				queue_wait_seconds_total=self._queue_wait_total,
+				queue_wait_seconds_max=self._queue_wait_max,
+			)
+
+	def shutdown(self) -> None:
+		self._executor.shutdown(wait=False, cancel_futures=True)
+
+	def _track(self, call: Callable[[], T], submitted_at: float, started: List[bool]) -> T:
+		waited = time.perf_counter() - submitted_at
+		with self._lock:
+			if started[0]:
+				raise asyncio.CancelledError()
+			started[0] = True
+			self._queued -= 1
+			self._active += 1
+			self._queue_wait_total += waited
+			self._queue_wait_max = max(self._queue_wait_max, waited)
+		try:
+			return call()
+		finally:
+			with self._lock:
+				self._active -= 1
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from botocore.exceptions import ClientError
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+# R2 calls range from a few ms (presign, HEAD) to tens of seconds (multipart parts on slow links).
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+OPERATION_SECONDS = Histogram(
+	"storage_operation_duration_seconds",
+	"Latency of object storage operations",
+	["operation"],
+	buckets=LATENCY_BUCKETS,
+)
+OPERATION_ERRORS = Counter(
+	"storage_operation_errors_total",
+	"Object storage operations that failed, by error code",
+	["operation", "code"],
+)
+OPERATIONS_IN_FLIGHT = Gauge(
+	"storage_operations_in_flight",
+	"Object storage operations currently running",
+	["operation"],
+)
+OPERATION_RETRIES = Counter(
+	"storage_operation_retries_total",
+	"Object storage operations retried after a transient failure, by error code",
+	["operation", "code"],
+)
+BYTES_SENT = Counter(
+	"storage_bytes_sent_total",
+	"Payload bytes sent to object storage",
+	["operation"],
+)
+BYTES_RECEIVED = Counter(
+	"storage_bytes_received_total",
+	"Payload bytes announced by object storage responses (Content-Length)",
+	["operation"],
+)
+
+
+@contextmanager
+def track(operation: str, *, sent: int = 0) -> Iterator[Callable[[Any], None]]:
+	"""Time an operation and count it as in flight; failures are counted by error code.
+
+	Yields a callback that records the bytes received from the operation's response.
+	"""
+
+	def received(response: Any) -> None:
+		if isinstance(response, dict) and response.get("ContentLength"):
+			BYTES_RECEIVED.labels(operation).inc(response["ContentLength"])
+
+	in_flight = OPERATIONS_IN_FLIGHT.labels(operation)
+	in_flight.inc()
+	started = time.perf_counter()
+	try:
+		yield received
+	except ClientError as exc:
+		OPERATION_ERRORS.labels(operation, exc.response.get("Error", {}).get("Code") or "ClientError").inc()
+		raise
+	except Exception as exc:
+		OPERATION_ERRORS.labels(operation, type(exc).__name__).inc()
+		raise
+	else:
+		if sent:
+			BYTES_SENT.labels(operation).inc(sent)
+	finally:
+		OPERATION_SECONDS.labels(operation).observe(time.perf_counter() - started)
+		in_flight.dec()
+
+
+def record_retry(operation: str, exc: BaseException) -> None:
+	code = exc.response.get("Error", {}).get("Code") if isinstance(exc, ClientError) else None
+	OPERATION_RETRIES.labels(operation, code or type(exc).__name__).inc()
+
+
+def payload_size(params: Dict[str, Any]) -> int:
+	body = params.get("Body")
+	return len(body) if isinstance(body, (bytes, bytearray, memoryview)) else 0
+
+
+class StorageStatsCollector(Collector):
+	"""Exports the thread pool and cache counters of the storage service at scrape time."""
+
+	def __init__(self, service_getter: Callable[[], Optional[Any]]) -> None:
+		self.service_getter = service_getter
+
+	def collect(self) -> Iterator[Any]:
+		service = self.service_getter()
+		if service is None:
+			return
+
+		executor = service.executor_stats()
+		if executor is not None:
+			yield _gauge("storage_executor_max_workers", "Size of the storage thread pool", executor.max_workers)
+			yield _gauge("storage_executor_active_threads", "Threads running a storage call", executor.active_threads)
+			yield _gauge("storage_executor_queued_calls", "Calls waiting for a free thread", executor.queued_calls)
+			yield _counter("storage_executor_submitted", "Calls submitted to the pool", executor.submitted_total)
+			yield _counter("storage_executor_exhausted", "Calls submitted with every thread busy", executor.exhausted_total)
+			yield _counter(
+				"storage_executor_queue_wait_seconds", "Time calls waited for a thread", executor.queue_wait_seconds_total
+			)
+
+		circuit_open = float(service.circuit_state() == "open")
+		yield _gauge("storage_circuit_open", "1 while the circuit breaker rejects storage calls", circuit_open)
+
+		listing = service.listing_cache_stats()
+		yield _gauge("storage_listing_cache_entries", "Listings currently cached", listing.entries)
+		yield _counter("storage_listing_cache_hits", "Listings served from the cache", listing.hits)
+		yield _counter("storage_listing_cache_misses", "Listings fetched from the bucket", listing.misses)
+		yield _counter("storage_listing_cache_invalidations", "Writes that invalidated listings", listing.invalidations)
+
+		presign = service.presign_cache_stats()
+		yield _gauge("storage_presign_cache_entries", "Presigned URLs currently cached", presign.entries)
+		yield _counter("storage_presign_cache_hits", "Presigned URLs served from the cache", presign.hits)
+		yield _counter("storage_presign_cache_misses", "Presigned URLs that had to be signed", presign.misses)
+
+
+def register_stats_collector(service_getter: Callable[[], Optional[Any]]) -> None:
+	"""Export the counters of whichever service `service_getter` returns (None before it exists)."""
+
+	REGISTRY.register(StorageStatsCollector(service_getter))
+
+
+def _gauge(name: str, documentation: str, value: float) -> GaugeMetricFamily:
+	return GaugeMetricFamily(name, documentation, value=value)
+
+
+def _counter(name: str, documentation: str, value: float) -> CounterMetricFamily:
+	return CounterMetricFamily(name, documentation, value=value)
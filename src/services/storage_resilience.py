@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+import aiohttp
+from botocore.exceptions import ClientError, ConnectionError as BotoConnectionError, HTTPClientError
+from tenacity import AsyncRetrying, RetryCallState, retry_if_exception, stop_after_attempt
+from tenacity.wait import wait_base
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Error codes R2/S3 use for throttling and transient server faults.
+TRANSIENT_ERROR_CODES = frozenset(
+	{
+		"SlowDown",
+		"TooManyRequests",
+		"Throttling",
+		"ThrottlingException",
+		"RequestLimitExceeded",
+		"RequestTimeout",
+		"InternalError",
+		"ServiceUnavailable",
+		# Bare status codes, used when the error response has no XML body.
+		"429",
+		"500",
+		"502",
+		"503",
+		"504",
+	}
+)
+TRANSIENT_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+TRANSIENT_EXCEPTIONS = (BotoConnectionError, HTTPClientError, aiohttp.ClientConnectionError, asyncio.TimeoutError)
+
+# Throttles and unavailability answered before the request was processed.
+UNPROCESSED_ERROR_CODES = frozenset(
+	{
+		"SlowDown",
+		"TooManyRequests",
+		"Throttling",
+		"ThrottlingException",
+		"RequestLimitExceeded",
+		"RequestTimeout",
+		"ServiceUnavailable",
+		"429",
+		"503",
+	}
+)
+UNPROCESSED_STATUS_CODES = frozenset({429, 503})
+
+# Operations that must not run twice: a create whose response was lost leaves an orphan
+# upload behind, and a complete that went through answers a retry with NoSuchUpload. They
+# are only retried after failures known to leave the request unprocessed.
+NON_IDEMPOTENT_OPERATIONS = frozenset({"create_multipart_upload", "complete_multipart_upload"})
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+	"""Raised without calling the backend while the circuit breaker is open."""
+
+	def __init__(self, retry_after: float) -> None:
+		super().__init__(f"Circuit open; retry in {retry_after:.0f}s")
+		self.retry_after = retry_after
+
+
+def is_transient(exc: BaseException) -> bool:
+	"""Whether exc is a throttle, a 5xx or a network failure worth retrying."""
+
+	if isinstance(exc, ClientError):
+		code = exc.response.get("Error", {}).get("Code")
+		status = exc.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+		return code in TRANSIENT_ERROR_CODES or status in TRANSIENT_STATUS_CODES
+	return isinstance(exc, TRANSIENT_EXCEPTIONS)
+
+
+def is_unprocessed(exc: BaseException) -> bool:
+	"""Whether exc is a throttle or an unavailability the backend answered without acting on the request."""
+
+	if not isinstance(exc, ClientError):
+		return False
+	code = exc.response.get("Error", {}).get("Code")
+	status = exc.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+	return code in UNPROCESSED_ERROR_CODES or status in UNPROCESSED_STATUS_CODES
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+	"""Seconds the backend asked us to wait (Retry-After header), if any."""
+
+	if not isinstance(exc, ClientError):
+		return None
+	headers = exc.response.get("ResponseMetadata", {}).get("HTTPHeaders", {})
+	for name, value in headers.items():
+		if name.lower() == "retry-after":
+			try:
+				return max(0.0, float(value))
+			except ValueError:
+				return None
+	return None
+
+
+class DecorrelatedJitterWait(wait_base):
+	"""Decorrelated jitter: each sleep is drawn from [base, 3 * previous sleep], capped.
+
+	Spreads out clients that failed together better than plain exponential
+	backoff. A Retry-After sent by the backend is honoured up to the cap.
+	"""
+
+	def __init__(self, base: float, cap: float) -> None:
+		self.base = base
+		self.cap = cap
+
+	def __call__(self, retry_state: RetryCallState) -> float:
+		previous = retry_state.upcoming_sleep or self.base
+		delay = min(self.cap, random.uniform(self.base, previous * 3))
+		if retry_state.outcome is not None and retry_state.outcome.failed:
+			requested = retry_after(retry_state.outcome.exception())
+			if requested is not None:
+				delay = max(delay, min(requested, self.cap))
+		return delay
+
+
+class RetryBudget:
+	"""Token bucket limiting retries to a fraction of the calls of one operation.
+
+	Every call deposits `ratio` tokens and every retry spends one, so under a
+	sustained outage retries add at most `ratio` extra load instead of
+	multiplying it. `min_per_second` tokens are refilled over time so that rare
+	calls can still be retried.
+	"""
+
+	def __init__(self, ratio: float, min_per_second: float, *, capacity: float = 100.0) -> None:
+		self.ratio = ratio
+		self.min_per_second = min_per_second
+		self.capacity = capacity
+		self._tokens = capacity
+		self._updated = time.monotonic()
+
+	def deposit(self) -> None:
+		self._refill()
+		self._tokens = min(self.capacity, self._tokens + self.ratio)
+
+	def try_spend(self) -> bool:
+		self._refill()
+		if self._tokens < 1:
+			return False
+		self._tokens -= 1
+		return True
+
+	def _refill(self) -> None:
+		now = time.monotonic()
+		self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.min_per_second)
+		self._updated = now
+
+
+class CircuitBreaker:
+	"""Fails calls fast after `failure_threshold` consecutive transient failures.
+
+	Once open, calls are rejected for `reset_timeout` seconds; then a single
+	probe call is let through (half-open) and its outcome closes or reopens
+	the circuit.
+	"""
+
+	def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+		self.failure_threshold = max(1, failure_threshold)
+		self.reset_timeout = reset_timeout
+		self._failures = 0
+		self._opened_at: Optional[float] = None
+		self._probing = False
+
+	@property
+	def state(self) -> str:
+		if self._opened_at is None:
+			return CIRCUIT_CLOSED
+		if time.monotonic() - self._opened_at >= self.reset_timeout:
+			return CIRCUIT_HALF_OPEN
+		return CIRCUIT_OPEN
+
+	def before_call(self) -> None:
+		state = self.state
+		if state == CIRCUIT_OPEN or (state == CIRCUIT_HALF_OPEN and self._probing):
+			raise CircuitOpenError(self.retry_after())
+		if state == CIRCUIT_HALF_OPEN:
+			self._probing = True
+
+	def retry_after(self) -> float:
+		if self._opened_at is None:
+			return 0.0
+		return max(1.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+	def record_success(self) -> None:
+		if self._opened_at is not None:
+			logger.info("Circuito de almacenamiento cerrado: R2 vuelve a responder")
+		self._failures = 0
+		self._opened_at = None
+		self._probing = False
+
+	def release_probe(self) -> None:
+		self._probing = False
+
+	def record_failure(self) -> None:
+		self._failures += 1
+		if self._probing or (self._opened_at is None and self._failures >= self.failure_threshold):
+			logger.warning(
+				"Circuito de almacenamiento abierto tras %d fallos transitorios; se rechazan llamadas durante %.0fs",
+				self._failures,
+				self.reset_timeout,
+			)
+			self._opened_at = time.monotonic()
+		self._probing = False
+
+
+class StorageRetryPolicy:
+	"""Retries transient storage failures under per-operation budgets and a shared circuit breaker.
+
+	NON_IDEMPOTENT_OPERATIONS are only retried after throttles and unavailability,
+	never after transport failures or other 5xx, which leave unknown whether they ran.
+	"""
+
+	def __init__(
+		self,
+		*,
+		max_attempts: int,
+		base_delay: float,
+		max_delay: float,
+		budget_ratio: float,
+		budget_min_per_second: float,
+		breaker: CircuitBreaker,
+		on_retry: Optional[Callable[[str, BaseException], None]] = None,
+	) -> None:
+		self.max_attempts = max(1, max_attempts)
+		self.wait = DecorrelatedJitterWait(base_delay, max_delay)
+		self.budget_ratio = budget_ratio
+		self.budget_min_per_second = budget_min_per_second
+		self.breaker = breaker
+		self.on_retry = on_retry
+		self._budgets: Dict[str, RetryBudget] = {}
+
+	def budget(self, operation: str) -> RetryBudget:
+		budget = self._budgets.get(operation)
+		if budget is None:
+			budget = self._budgets[operation] = RetryBudget(self.budget_ratio, self.budget_min_per_second)
+		return budget
+
+	async def call(self, operation: str, func: Callable[[], Awaitable[T]]) -> T:
+		"""Run func, retrying transient failures; raises CircuitOpenError while the backend is unhealthy."""
+
+		budget = self.budget(operation)
+		budget.deposit()
+		retryable = is_unprocessed if operation in NON_IDEMPOTENT_OPERATIONS else is_transient
+
+		def should_retry(exc: BaseException) -> bool:
+			if not retryable(exc) or self.breaker.state != CIRCUIT_CLOSED:
+				return False
+			if not budget.try_spend():
+				logger.debug("Presupuesto de reintentos agotado para '%s'", operation)
+				return False
+			if self.on_retry is not None:
+				self.on_retry(operation, exc)
+			return True
+
+		async for attempt in AsyncRetrying(
+			stop=stop_after_attempt(self.max_attempts),
+			wait=self.wait,
+			retry=retry_if_exception(should_retry),
+			reraise=True,
+		):
+			with attempt:
+				self.breaker.before_call()
+				try:
+					result = await func()
+				except Exception as exc:
+					if is_transient(exc):
+						self.breaker.record_failure()
+					else:
+						# A 404 or a validation error still proves the backend is answering.
+						self.breaker.record_success()
+					raise
+				except BaseException:
+					# Cancelled: the outcome says nothing about the backend.
+					self.breaker.release_probe()
+					raise
+				self.breaker.record_success()
+				return result
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from src.core.config import settings
+from src.utils.concurrency import ByteSemaphore
+
+logger = logging.getLogger(__name__)
+
+REJECTED_QUEUE_FULL = "queue_full"
+REJECTED_TIMEOUT = "timeout"
+
+QUEUE_DEPTH = Gauge("upload_admission_queue_depth", "Uploads waiting for admission")
+REJECTIONS = Counter(
+	"upload_admission_rejections_total",
+	"Uploads rejected with 503, by reason (queue_full, timeout)",
+	["reason"],
+)
+WAIT_SECONDS = Histogram(
+	"upload_admission_wait_seconds",
+	"Time admitted uploads spent queued",
+	buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+IN_FLIGHT_UPLOADS = Gauge("upload_admission_in_flight_uploads", "Uploads currently admitted")
+IN_FLIGHT_BYTES = Gauge("upload_admission_in_flight_bytes", "Bytes of the uploads currently admitted")
+
+
+class UploadRejectedError(Exception):
+	"""Raised when an upload cannot be admitted; clients should retry after `retry_after` seconds."""
+
+	def __init__(self, message: str, *, reason: str, retry_after: float) -> None:
+		super().__init__(message)
+		self.reason = reason
+		self.retry_after = retry_after
+
+
+class UploadAdmissionController:
+	"""Per-worker gate in front of the upload path.
+
+	An upload is admitted while both the number of admitted uploads and their
+	total declared size stay under the ceilings; otherwise it waits in a FIFO
+	queue. Uploads that find the queue full, or are still queued after
+	`timeout` seconds, are rejected so the client can back off and retry.
+	"""
+
+	def __init__(self, max_bytes: int, max_uploads: int, *, max_queue: int, timeout: float) -> None:
+		self.max_queue = max(0, max_queue)
+		self.timeout = max(0.0, timeout)
+		self.queued = 0
+		self._slots = ByteSemaphore(max_bytes, max_holders=max_uploads)
+
+	@property
+	def retry_after(self) -> float:
+		# An upload that waited the whole timeout saw no room; asking again sooner rarely helps.
+		return max(1.0, self.timeout)
+
+	@asynccontextmanager
+	async def admit(self, size: int) -> AsyncIterator[None]:
+		"""Hold an admission of size bytes for the duration of the block."""
+
+		weight = self._slots.try_acquire(size)
+		if weight is None:
+			weight = await self._wait(size)
+
+		IN_FLIGHT_UPLOADS.inc()
+		IN_FLIGHT_BYTES.inc(weight)
+		try:
+			yield
+		finally:
+			self._slots.release(weight)
+			IN_FLIGHT_UPLOADS.dec()
+			IN_FLIGHT_BYTES.dec(weight)
+
+	async def _wait(self, size: int) -> int:
+		# Counted here rather than with the semaphore's waiters, which only join once wait_for runs them.
+		if self.queued >= self.max_queue:
+			raise self._reject(REJECTED_QUEUE_FULL, "Cola de subidas llena")
+
+		self.queued += 1
+		QUEUE_DEPTH.inc()
+		started = time.monotonic()
+		try:
+			weight = await asyncio.wait_for(self._slots.acquire(size), self.timeout)
+		except asyncio.TimeoutError:
+			raise self._reject(
+				REJECTED_TIMEOUT, f"Subida no admitida tras esperar {self.timeout:g}s en la cola"
+			) from None
+		finally:
+			self.queued -= 1
+			QUEUE_DEPTH.dec()
+		WAIT_SECONDS.observe(time.monotonic() - started)
+		return weight
+
+	def _reject(self, reason: str, message: str) -> UploadRejectedError:
+		REJECTIONS.labels(reason).inc()
+		logger.warning(
+			"%s (%d subidas y %d bytes en curso)", message, self._slots.holders, self._slots.in_flight
+		)
+		return UploadRejectedError(message, reason=reason, retry_after=self.retry_after)
+
+
+@lru_cache(maxsize=1)
+def get_upload_admission_controller() -> UploadAdmissionController:
+	"""Return the singleton admission controller of this worker process."""
+
+	return UploadAdmissionController(
+		settings.UPLOAD_MAX_INFLIGHT_BYTES,
+		settings.UPLOAD_MAX_CONCURRENT,
+		max_queue=settings.UPLOAD_ADMISSION_MAX_QUEUE,
+		timeout=settings.UPLOAD_ADMISSION_TIMEOUT,
+	)
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class UploadSession:
+	"""State of an in-progress multipart upload that can be resumed."""
+
+	key: str
+	upload_id: str
+	part_size: int
+	parts: Dict[int, str] = field(default_factory=dict)
+
+
+class UploadSessionStore:
+	"""Persist multipart upload sessions as small JSON files, one per object key."""
+
+	def __init__(self, directory: str) -> None:
+		self.directory = directory
+
+	def load(self, key: str) -> Optional[UploadSession]:
+		path = self._path(key)
+		try:
+			with open(path, "r", encoding="utf-8") as handle:
+				raw = json.load(handle)
+		except FileNotFoundError:
+			return None
+		except (OSError, ValueError):
+			logger.warning("Sesión de subida corrupta para '%s'; se descarta", key)
+			self.delete(key)
+			return None
+
+		return UploadSession(
+			key=raw["key"],
+			upload_id=raw["upload_id"],
+			part_size=raw["part_size"],
+			parts={int(number): etag for number, etag in raw.get("parts", {}).items()},
+		)
+
+	def save(self, session: UploadSession) -> None:
+		os.makedirs(self.directory, exist_ok=True)
+		fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+		try:
+			with os.fdopen(fd, "w", encoding="utf-8") as handle:
+				json.dump(asdict(session), handle)
+			os.replace(tmp_path, self._path(session.key))
+		except BaseException:
+			try:
+				os.unlink(tmp_path)
+			except OSError:
+				pass
+			raise
+
+	def delete(self, key: str) -> None:
+		try:
+			os.unlink(self._path(key))
+		except FileNotFoundError:
+			pass
+
+	def _path(self, key: str) -> str:
+		digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+		return os.path.join(self.directory, f"{digest}.json")
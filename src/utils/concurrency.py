@@ -0,0 +1,94 @@
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Optional, Tuple
+
+
+class ByteSemaphore:
+    """Semaphore weighted by bytes, bounding the total size of work in flight.
+
+    Waiters are served in FIFO order so a large request is not starved by a
+    stream of small ones. A request larger than the capacity is clamped to it,
+    which lets it run alone instead of waiting forever. `max_holders`, when set,
+    also caps how many reservations may be held at once, whatever their size.
+    """
+
+    def __init__(self, capacity: int, max_holders: Optional[int] = None):
+        self.capacity = max(1, capacity)
+        self.max_holders = max(1, max_holders) if max_holders is not None else None
+        self.in_flight = 0
+        self.holders = 0
+        self._waiters: Deque[Tuple[int, asyncio.Future]] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def weight(self, size: int) -> int:
+        return min(max(size, 0), self.capacity)
+
+    def try_acquire(self, size: int) -> Optional[int]:
+        """Reserve size bytes only if that needs no waiting; returns the amount reserved or None."""
+        weight = self.weight(size)
+        if self._waiters or not self._fits(weight):
+            return None
+        self._take(weight)
+        return weight
+
+    async def acquire(self, size: int) -> int:
+        """Wait until size bytes fit in the budget and return the amount reserved."""
+        weight = self.try_acquire(size)
+        if weight is not None:
+            return weight
+
+        weight = self.weight(size)
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (weight, waiter)
+        self._waiters.append(entry)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Budget was granted just before the cancellation; hand it back.
+                self.release(weight)
+            else:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                self._wake_waiters()
+            raise
+        return weight
+
+    def release(self, weight: int) -> None:
+        self.in_flight -= weight
+        self.holders -= 1
+        self._wake_waiters()
+
+    @asynccontextmanager
+    async def reserve(self, size: int) -> AsyncIterator[int]:
+        weight = await self.acquire(size)
+        try:
+            yield weight
+        finally:
+            self.release(weight)
+
+    def _fits(self, weight: int) -> bool:
+        if self.max_holders is not None and self.holders >= self.max_holders:
+            return False
+        return self.in_flight + weight <= self.capacity
+
+    def _take(self, weight: int) -> None:
+        self.in_flight += weight
+        self.holders += 1
+
+    def _wake_waiters(self) -> None:
+        while self._waiters:
+            weight, waiter = self._waiters[0]
+            if waiter.done():
+                # Cancelled while queued; skip it.
+                self._waiters.popleft()
+                continue
+            if not self._fits(weight):
+                break
+            self._waiters.popleft()
+            self._take(weight)
+            waiter.set_result(None)